@@ -11,13 +11,32 @@ APP_DISPLAY_NAME = 'WoW Token Price Checker'
 APP_ORG = 'Caprine Logic'
 APP_USER_MODEL_ID = u'CaprineLogic.Wtpc'
 
+REGIONS = {
+    'dynamic-us': 'North America',
+    'dynamic-eu': 'Europe',
+    'dynamic-kr': 'Korea',
+    'dynamic-tw': 'Taiwan',
+}
+
+API_HOSTS = {
+    'dynamic-us': 'us.api.blizzard.com',
+    'dynamic-eu': 'eu.api.blizzard.com',
+    'dynamic-kr': 'kr.api.blizzard.com',
+    'dynamic-tw': 'tw.api.blizzard.com',
+}
+
 BINARY_DIR = Path(__file__).parent.parent.absolute()
 APPDATA_DIR = Path(QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppLocalDataLocation))
 DATA_DIR = APPDATA_DIR / APP_ORG / APP_NAME
 APP_SETTINGS_FILE_PATH = DATA_DIR / 'app.settings'
 USER_SETTINGS_FILE_PATH = DATA_DIR / 'user.settings'
+PRICE_HISTORY_FILE_PATH = DATA_DIR / 'price_history.csv'
 NOTIFICATION_HERO_PATH = DATA_DIR / 'background.webp'
 NOTIFICATION_ICON_PATH = DATA_DIR / 'icon.ico'
+NOTIFICATION_LOG_PATH = DATA_DIR / 'notifications.log'
+WEBHOOK_QUEUE_PATH = DATA_DIR / 'webhook_queue.jsonl'
+EVENT_LOG_DUMP_DIR = DATA_DIR / 'event_logs'
+MEMORY_PROFILE_PATH = DATA_DIR / 'memory_profile.jsonl'
 
 NOTIFICATION_ASSETS = {
     NOTIFICATION_HERO_PATH: ':images/background.webp',
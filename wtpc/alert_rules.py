@@ -0,0 +1,321 @@
+import re
+import math
+from collections import deque
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+from wtpc.price_history import PriceSeries
+
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+DEFAULT_ALERT_RULES = ['change']
+
+class AlertRule(ABC):
+    """
+    A condition evaluated against each new price sample of a single region.
+
+    Rules keep only as much state as they need to evaluate the next sample in constant or amortized constant time.
+    """
+    # How far back, in seconds, the samples that affect the rule's next evaluation can go
+    lookback = 0.0
+
+    @abstractmethod
+    def evaluate(self, timestamp: float, price: int) -> Optional[str]:
+        """
+        Feeds the next sample to the rule, returning an alert message if the rule fired.
+        """
+
+class PriceChangedRule(AlertRule):
+    def __init__(self):
+        self._last_price: Optional[int] = None
+
+    def evaluate(self, timestamp: float, price: int) -> Optional[str]:
+        last_price = self._last_price
+        self._last_price = price
+        if last_price is None or last_price == price:
+            return None
+
+        return f'Current Price: {price:,}'
+
+class ThresholdRule(AlertRule):
+    """
+    Fires when the price crosses above `above` or below `below`.
+    """
+    def __init__(self, *, above: Optional[int] = None, below: Optional[int] = None):
+        self.above = above
+        self.below = below
+
+        self._was_above: Optional[bool] = None
+        self._was_below: Optional[bool] = None
+
+    def evaluate(self, timestamp: float, price: int) -> Optional[str]:
+        message = None
+        if self.above is not None:
+            is_above = price > self.above
+            if is_above and self._was_above is False:
+                message = f'Price rose above {self.above:,}: {price:,}'
+            self._was_above = is_above
+
+        if self.below is not None:
+            is_below = price < self.below
+            if is_below and self._was_below is False:
+                message = f'Price fell below {self.below:,}: {price:,}'
+            self._was_below = is_below
+
+        return message
+
+class RollingExtremes:
+    """
+    The minimum and maximum of the samples within a sliding time window, maintained with monotonic deques.
+    """
+    def __init__(self, window: float):
+        self.window = window
+
+        self._minimums: deque[tuple[float, int]] = deque()
+        self._maximums: deque[tuple[float, int]] = deque()
+
+    @property
+    def minimum(self) -> Optional[int]:
+        return self._minimums[0][1] if self._minimums else None
+
+    @property
+    def maximum(self) -> Optional[int]:
+        return self._maximums[0][1] if self._maximums else None
+
+    def expire(self, now: float) -> None:
+        cutoff = now - self.window
+        while self._minimums and self._minimums[0][0] < cutoff:
+            self._minimums.popleft()
+        while self._maximums and self._maximums[0][0] < cutoff:
+            self._maximums.popleft()
+
+    def push(self, timestamp: float, price: int) -> None:
+        while self._minimums and self._minimums[-1][1] >= price:
+            self._minimums.pop()
+        self._minimums.append((timestamp, price))
+
+        while self._maximums and self._maximums[-1][1] <= price:
+            self._maximums.pop()
+        self._maximums.append((timestamp, price))
+
+    def clear(self) -> None:
+        self._minimums.clear()
+        self._maximums.clear()
+
+class PercentMoveRule(AlertRule):
+    """
+    Fires when the price has moved by at least `percent` from the lowest or highest price within the last `window`
+    seconds. The window starts over once the rule fires so a single move only fires once.
+    """
+    def __init__(self, percent: float, window: float):
+        self.percent = percent
+        self.window = window
+        self.lookback = window
+
+        self._extremes = RollingExtremes(window)
+
+    def evaluate(self, timestamp: float, price: int) -> Optional[str]:
+        extremes = self._extremes
+        extremes.expire(timestamp)
+
+        low = extremes.minimum
+        high = extremes.maximum
+
+        message = None
+        if low is not None and low > 0 and (price - low) * 100 >= self.percent * low:
+            message = f'Price rose {(price - low) * 100 / low:.1f}% to {price:,}'
+        elif high is not None and high > 0 and (high - price) * 100 >= self.percent * high:
+            message = f'Price fell {(high - price) * 100 / high:.1f}% to {price:,}'
+
+        if message is not None:
+            extremes.clear()
+
+        extremes.push(timestamp, price)
+
+        return message
+
+class NewExtremeRule(AlertRule):
+    """
+    Fires when the price is a new high or low (or either) compared to every sample within the last `window` seconds.
+    It only fires once the rule has seen a full window of samples.
+    """
+    def __init__(self, window: float, *, highs: bool = True, lows: bool = True):
+        self.window = window
+        self.highs = highs
+        self.lows = lows
+        self.lookback = window
+
+        self._extremes = RollingExtremes(window)
+        self._first_timestamp: Optional[float] = None
+
+    def evaluate(self, timestamp: float, price: int) -> Optional[str]:
+        if self._first_timestamp is None:
+            self._first_timestamp = timestamp
+
+        extremes = self._extremes
+        extremes.expire(timestamp)
+
+        message = None
+        if timestamp - self._first_timestamp >= self.window:
+            days = self.window / DURATION_UNITS['d']
+            hours = self.window / DURATION_UNITS['h']
+            period = f'{days:g}-day' if days >= 1 else f'{hours:g}-hour'
+            if self.highs and extremes.maximum is not None and price > extremes.maximum:
+                message = f'New {period} high: {price:,}'
+            elif self.lows and extremes.minimum is not None and price < extremes.minimum:
+                message = f'New {period} low: {price:,}'
+
+        extremes.push(timestamp, price)
+
+        return message
+
+class RollingAverage:
+    """
+    The mean of the samples within a sliding time window, maintained with a running sum.
+    """
+    def __init__(self, window: float):
+        self.window = window
+
+        self._samples: deque[tuple[float, int]] = deque()
+        self._sum = 0
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._sum / len(self._samples) if self._samples else None
+
+    def push(self, timestamp: float, price: int) -> None:
+        self._samples.append((timestamp, price))
+        self._sum += price
+
+        cutoff = timestamp - self.window
+        while self._samples[0][0] < cutoff:
+            self._sum -= self._samples.popleft()[1]
+
+class MovingAverageCrossRule(AlertRule):
+    """
+    Fires when the moving average over `short_window` seconds crosses the one over `long_window` seconds.
+    """
+    def __init__(self, short_window: float, long_window: float):
+        self.short_average = RollingAverage(short_window)
+        self.long_average = RollingAverage(long_window)
+        self.lookback = max(short_window, long_window)
+
+        self._was_above: Optional[bool] = None
+
+    def evaluate(self, timestamp: float, price: int) -> Optional[str]:
+        self.short_average.push(timestamp, price)
+        self.long_average.push(timestamp, price)
+
+        short_value = self.short_average.value
+        long_value = self.long_average.value
+        if short_value == long_value:
+            return None
+
+        is_above = short_value > long_value
+        was_above = self._was_above
+        self._was_above = is_above
+        if was_above is None or was_above == is_above:
+            return None
+
+        direction = 'above' if is_above else 'below'
+        return f'Short-term average crossed {direction} the long-term average at {price:,}'
+
+class AlertEngine:
+    """
+    Evaluates a set of rules against each new sample of every region, creating each region's rule instances the first
+    time the region is seen.
+    """
+    def __init__(self, rule_factories: list[Callable[[], AlertRule]]):
+        self.rule_factories = rule_factories
+
+        self._rules: dict[str, list[AlertRule]] = {}
+        self._last_timestamps: dict[str, float] = {}
+
+    def has_seen(self, region: str) -> bool:
+        return region in self._rules
+
+    def warm_up(self, region: str, series: PriceSeries, before: float) -> None:
+        """
+        Feeds the stored samples older than `before` that the region's rules can still see to the rules, discarding any
+        alerts.
+        """
+        rules = self._get_rules(region)
+        lookback = max((rule.lookback for rule in rules), default=0.0)
+
+        # Always include the sample just before the lookback window so rules comparing against the previous sample
+        # have one
+        first, last = series.index_range(before - lookback, before)
+        if last > 0 and series.timestamps[last - 1] == before:
+            last -= 1
+
+        for i in range(max(first - 1, 0), last):
+            self.evaluate(region, series.timestamps[i], series.prices[i])
+
+    def evaluate(self, region: str, timestamp: float, price: int) -> list[str]:
+        """
+        Feeds a sample to every rule of the region, returning the messages of the rules that fired. Samples that aren't
+        newer than the last sample of the region are ignored.
+        """
+        rules = self._get_rules(region)
+        if timestamp <= self._last_timestamps.get(region, float('-inf')):
+            return []
+
+        self._last_timestamps[region] = timestamp
+
+        messages = []
+        for rule in rules:
+            message = rule.evaluate(timestamp, price)
+            if message is not None:
+                messages.append(message)
+
+        return messages
+
+    def _get_rules(self, region: str) -> list[AlertRule]:
+        rules = self._rules.get(region)
+        if rules is None:
+            rules = self._rules[region] = [factory() for factory in self.rule_factories]
+
+        return rules
+
+def parse_duration(text: str) -> float:
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([smhd])', text.strip())
+    if match is None:
+        raise ValueError(f'Invalid duration: {text}')
+
+    return float(match[1]) * DURATION_UNITS[match[2]]
+
+def parse_rule(spec: str) -> Callable[[], AlertRule]:
+    """
+    Parses a rule specification into a factory of rule instances. Supported specifications are:
+
+    - `change`: the price changed
+    - `above:300000` and `below:250000`: the price crossed a threshold
+    - `move:5%:24h`: the price moved 5% within 24 hours
+    - `high:7d`, `low:7d` and `extreme:7d`: a new 7-day high, low or either
+    - `ma:6h:24h`: the 6-hour moving average crossed the 24-hour moving average
+    """
+    kind, *args = spec.strip().lower().split(':')
+    match kind, args:
+        case 'change', []:
+            return PriceChangedRule
+        case 'above', [threshold]:
+            threshold = int(threshold)
+            return lambda: ThresholdRule(above=threshold)
+        case 'below', [threshold]:
+            threshold = int(threshold)
+            return lambda: ThresholdRule(below=threshold)
+        case 'move', [percent, window]:
+            percent = float(percent.rstrip('%'))
+            window = parse_duration(window)
+            if not math.isfinite(percent) or percent <= 0:
+                raise ValueError(f'Invalid alert rule: {spec}')
+            return lambda: PercentMoveRule(percent, window)
+        case 'high' | 'low' | 'extreme', [window]:
+            window = parse_duration(window)
+            return lambda: NewExtremeRule(window, highs=kind != 'low', lows=kind != 'high')
+        case 'ma', [short_window, long_window]:
+            short_window = parse_duration(short_window)
+            long_window = parse_duration(long_window)
+            if short_window >= long_window:
+                raise ValueError(f'Invalid alert rule: {spec}')
+            return lambda: MovingAverageCrossRule(short_window, long_window)
+
+    raise ValueError(f'Invalid alert rule: {spec}')
@@ -0,0 +1,279 @@
+from pathlib import Path
+from typing import Optional
+from argparse import ArgumentParser
+from wtpc.clock import system_clock
+from wtpc.event_log import event_log
+from wtpc.tracing import span_collector
+from wtpc.watchdog import STALL_THRESHOLD, StallWatchdog
+from wtpc.server.log_api import LogApi
+from wtpc.price_alerter import PriceAlerter
+from wtpc.webhook_sink import WebhookSink
+from wtpc.recording import ReplayTransport, load_exchanges
+from wtpc.server.price_api import PriceApi
+from wtpc.server.token_proxy import TokenProxy
+from wtpc.server.event_stream import EventStream
+from wtpc.server.metrics_api import MetricsApi
+from wtpc.server.http_server import HttpServer
+from wtpc.memory_profiler import MemoryProfiler
+from wtpc.windows.main_window import MainWindow
+from contextlib import contextmanager
+from PySide6.QtWidgets import QDialog, QApplication
+from wtpc.price_check_worker import PriceCheckWorker
+from PySide6.QtCore import QFile, QTimer, QSharedMemory
+from wtpc.resource_usage import current_rss, WakeupCounter
+from wtpc.notification_dispatcher import notification_dispatcher
+from wtpc.tray import TrayIcon, register_window_resources, unregister_window_resources
+from wtpc.windows.settings_window import SettingsWindow
+from wtpc.settings import user_settings, UserSettingsKeys
+from wtpc.notifier import install_aumid, is_aumid_installed, clear_notifications
+from wtpc import (
+    APP_ORG,
+    APP_NAME,
+    DATA_DIR,
+    VERSION_STRING,
+    APP_DISPLAY_NAME,
+    MEMORY_PROFILE_PATH,
+    NOTIFICATION_ASSETS
+)
+
+def _parse_args(args: list[str]) -> tuple[dict, list[str]]:
+    parser = ArgumentParser(prog=APP_NAME, description=APP_DISPLAY_NAME)
+    parser.add_argument('--tray', action='store_true', help='run in the system tray, only opening the main window on demand')
+    parser.add_argument(
+        '--measure-idle',
+        type=float,
+        metavar='SECONDS',
+        help='print the resident memory and timer wakeups after running for SECONDS and exit'
+    )
+    parser.add_argument(
+        '--http-port',
+        type=int,
+        metavar='PORT',
+        help='serve the current price, price history and metrics over HTTP on PORT'
+    )
+    parser.add_argument(
+        '--proxy',
+        action='store_true',
+        help='also serve a Battle.net compatible /data/wow/token/index for other instances to use as their API URL'
+    )
+    parser.add_argument(
+        '--api-url',
+        metavar='URL',
+        help='get prices from URL, such as another instance running with --proxy, instead of Battle.net'
+    )
+    parser.add_argument(
+        '--trace-file',
+        type=Path,
+        metavar='PATH',
+        help='append a span with the timing of each phase of every Battle.net request to PATH as JSON Lines'
+    )
+    parser.add_argument(
+        '--capture',
+        type=Path,
+        metavar='PATH',
+        help='record every Battle.net request and response to PATH as gzipped JSON Lines, without credentials'
+    )
+    parser.add_argument(
+        '--replay',
+        type=Path,
+        metavar='PATH',
+        help='answer requests with the responses recorded to PATH with --capture instead of the network'
+    )
+    parser.add_argument(
+        '--replay-speed',
+        type=float,
+        default=1.0,
+        metavar='FACTOR',
+        help='how many times faster than recorded to replay responses, or inf for instantly (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--log-file',
+        type=Path,
+        metavar='PATH',
+        help='also append every event log record to PATH as JSON Lines, rotating it once it reaches 1 MiB'
+    )
+    parser.add_argument(
+        '--stall-threshold',
+        type=int,
+        metavar='MS',
+        help=f'report the GUI thread blocking for longer than MS milliseconds, or 0 to disable '
+             f'(default: {round(STALL_THRESHOLD * 1000)}, or 0 with --tray)'
+    )
+    parser.add_argument(
+        '--memprofile',
+        nargs='?',
+        type=float,
+        const=15.0,
+        metavar='MINUTES',
+        help='trace allocations and append the code and Qt objects that grew to memory_profile.jsonl in the data '
+             'directory every MINUTES (default: 15)'
+    )
+    parser.add_argument(
+        '--http-host',
+        default='127.0.0.1',
+        metavar='HOST',
+        help='the address to serve HTTP on (default: %(default)s)'
+    )
+
+    # Unknown arguments are left for Qt to handle
+    options, qt_args = parser.parse_known_args(args[1:])
+
+    # The heartbeat wakes the app up several times a second, which is what tray mode is meant to avoid
+    if options.stall_threshold is None:
+        options.stall_threshold = 0 if options.tray else round(STALL_THRESHOLD * 1000)
+
+    # Check the options before anything is started, so bad ones don't leave a half-started app behind
+    if options.memprofile is not None and options.memprofile <= 0:
+        parser.error('--memprofile must be above 0')
+    if options.replay_speed <= 0:
+        parser.error('--replay-speed must be above 0')
+
+    options.exchanges = None
+    if options.replay is not None:
+        try:
+            options.exchanges = load_exchanges(options.replay)
+        except OSError as e:
+            parser.error(f'could not read {options.replay}: {e}')
+        except ValueError as e:
+            parser.error(str(e))
+
+    return vars(options), args[:1] + qt_args
+
+def start(args: list[str]) -> int:
+    options, qt_args = _parse_args(args)
+    is_tray_mode = options['tray']
+
+    with _single_instance():
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+
+        app = QApplication(qt_args)
+        app.setApplicationName(APP_NAME)
+        app.setApplicationDisplayName(APP_DISPLAY_NAME)
+        app.setApplicationVersion(VERSION_STRING)
+        app.setOrganizationName(APP_ORG)
+        app.aboutToQuit.connect(lambda: notification_dispatcher.stop())
+        app.aboutToQuit.connect(lambda: clear_notifications())
+
+        if options['trace_file'] is not None:
+            span_collector.export_to(options['trace_file'])
+            app.aboutToQuit.connect(lambda: span_collector.close())
+
+        if options['log_file'] is not None:
+            event_log.stream_to(options['log_file'])
+            app.aboutToQuit.connect(lambda: event_log.close())
+
+        if options['stall_threshold'] > 0:
+            watchdog = StallWatchdog(app, threshold=options['stall_threshold'] / 1000)
+            watchdog.start()
+            app.aboutToQuit.connect(lambda: watchdog.stop())
+
+        # noinspection PyUnresolvedReferences
+        import wtpc.icons
+
+        # Fonts and images are only needed while a window is open, in tray mode they're registered on demand
+        register_window_resources()
+
+        # Copy some resources to the disk so we can use them in toast notifications.
+        for asset_path, resource_name in NOTIFICATION_ASSETS.items():
+            if not asset_path.exists():
+                hero_resource = QFile(resource_name)
+                hero_resource.copy(asset_path)
+
+        # Add the app's AUMID to the registry
+        if not is_aumid_installed():
+            install_aumid()
+
+        transport = None
+        if options['exchanges'] is not None:
+            transport = ReplayTransport(options['exchanges'], system_clock, speed=options['replay_speed'])
+
+        # Show the settings dialog if either client credential is missing
+        has_credentials = options['api_url'] is not None or transport is not None or None not in [
+            user_settings.value(UserSettingsKeys.CLIENT_ID, None),
+            user_settings.value(UserSettingsKeys.CLIENT_SECRET, None)
+        ]
+        if not has_credentials:
+            # Set some default settings
+            user_settings.setValue(UserSettingsKeys.REGION, 'dynamic-us')
+            user_settings.setValue(UserSettingsKeys.SEND_NOTIFICATIONS, False)
+            sw = SettingsWindow(is_intro=True)
+            if sw.exec() == QDialog.DialogCode.Rejected:
+                # Rejected, in this case, means that the dialog was closed without clicking the save button
+                app.quit()
+                return 0
+
+        # The alerter and webhook sink are parented to the worker, which keeps them alive
+        worker = PriceCheckWorker(base_url=options['api_url'], transport=transport, capture=options['capture'])
+        app.aboutToQuit.connect(lambda: worker.transport.close())
+        PriceAlerter(worker)
+        WebhookSink(worker)
+
+        if options['http_port'] is not None:
+            server = HttpServer(worker)
+            PriceApi(server, worker)
+            MetricsApi(server)
+            LogApi(server)
+            EventStream(server, worker)
+            if options['proxy']:
+                TokenProxy(server, worker)
+            if not server.start(options['http_host'], options['http_port']):
+                print(f'Could not serve HTTP on {options["http_host"]}:{options["http_port"]}: {server.errorString()}')
+                event_log.error(
+                    'http_server_failed',
+                    host=options['http_host'],
+                    port=options['http_port'],
+                    error=server.errorString()
+                )
+
+        mw: Optional[MainWindow] = None
+        tray: Optional[TrayIcon] = None
+        if is_tray_mode:
+            unregister_window_resources()
+            app.setQuitOnLastWindowClosed(False)
+            tray = TrayIcon(worker)
+            tray.show()
+        else:
+            mw = MainWindow(worker)
+            mw.show()
+
+        if options['memprofile'] is not None:
+            memory_profiler = MemoryProfiler(
+                MEMORY_PROFILE_PATH,
+                lambda: [app, worker, *app.topLevelWidgets(), *([tray] if tray is not None else [])],
+                app,
+                interval=options['memprofile'] * 60
+            )
+            memory_profiler.start()
+            app.aboutToQuit.connect(lambda: memory_profiler.stop())
+
+        if options['measure_idle'] is not None:
+            _measure_idle(app, options['measure_idle'])
+
+        # Call the initial price check
+        worker.check_price()
+
+        return app.exec()
+
+def _measure_idle(app: QApplication, seconds: float):
+    wakeup_counter = WakeupCounter(app)
+    app.installEventFilter(wakeup_counter)
+
+    def report():
+        rss = current_rss()
+        print(f'rss_bytes={rss if rss is not None else "unknown"}')
+        print(f'timer_wakeups={wakeup_counter.timer_events}')
+        print(f'timer_wakeups_per_second={wakeup_counter.timer_events / seconds:.2f}')
+        app.quit()
+
+    QTimer.singleShot(int(seconds * 1000), app, report)
+
+@contextmanager
+def _single_instance():
+    shared_mem = QSharedMemory('wtpc_mutex')
+    if not shared_mem.create(1):
+        QApplication.quit()
+        return
+    try:
+        yield
+    finally:
+        shared_mem.detach()
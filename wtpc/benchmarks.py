@@ -0,0 +1,352 @@
+import sys
+import platform
+from timeit import Timer
+from pathlib import Path
+from statistics import median
+from json import dumps, loads
+from typing import Callable, Optional
+from argparse import ArgumentParser
+from datetime import timedelta
+from tempfile import TemporaryDirectory
+from wtpc.cli import ExitCode
+from wtpc.clock import SimulatedClock
+from wtpc.price_history import PriceHistory
+from wtpc.toast_templates import get_toast_template
+from wtpc.transport import Request, Response, Transport
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QObject, QSettings
+from PySide6 import __version__ as PYSIDE_VERSION
+from wtpc.price_check_worker import PriceCheckWorker
+from wtpc.settings import AppSettingsKeys, UserSettingsKeys
+from wtpc import APP_NAME, API_HOSTS, NOTIFICATION_HERO_PATH
+
+BASELINE_PATH = Path(__file__).with_name('benchmark_baseline.json')
+
+DEFAULT_ROUNDS = 7
+DEFAULT_TOLERANCE = 0.5
+
+PRICE_BODY = (
+    f'{{"_links":{{"self":{{"href":"https://{API_HOSTS["dynamic-eu"]}/data/wow/token/?namespace=dynamic-eu"}}}},'
+    f'"last_updated_timestamp":1700000000000,"price":2453150000}}'
+).encode('utf-8')
+
+class NullTransport(Transport):
+    """
+    Drops every request, so benchmarks of the worker measure building requests rather than answering them.
+    """
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+
+        self.sent = 0
+
+    def send(self, request: Request) -> None:
+        self.sent += 1
+
+class BenchmarkResult:
+    __slots__ = ('name', 'seconds', 'relative', 'number', 'rounds', 'baseline', 'tolerance')
+
+    def __init__(
+            self,
+            name: str,
+            timings: list[float],
+            reference_timings: list[float],
+            number: int,
+            reference_number: int,
+            *,
+            baseline: Optional[float] = None,
+            tolerance: float = DEFAULT_TOLERANCE
+    ):
+        self.name = name
+        self.seconds = median(timings) / number
+        # Each round is timed right after a round of the reference workload, so the ratio of the two cancels out how
+        # fast the machine is and how fast it happened to be running at the time
+        self.relative = median(
+            (timing / number) / (reference_timing / reference_number)
+            for timing, reference_timing in zip(timings, reference_timings)
+        )
+        self.number = number
+        self.rounds = len(timings)
+        self.baseline = baseline
+        self.tolerance = tolerance
+
+    @property
+    def change(self) -> Optional[float]:
+        """
+        How much slower relative to the reference workload than the baseline this run was, as a fraction of the
+        baseline.
+        """
+        return self.relative / self.baseline - 1 if self.baseline else None
+
+    @property
+    def passed(self) -> Optional[bool]:
+        """
+        Whether this run was within the tolerance of the baseline, or `None` without a baseline to compare to.
+        """
+        change = self.change
+        return change <= self.tolerance if change is not None else None
+
+    def to_dict(self) -> dict:
+        change = self.change
+
+        return {
+            'seconds': self.seconds,
+            'relative': self.relative,
+            'number': self.number,
+            'rounds': self.rounds,
+            'baseline': self.baseline,
+            'tolerance': self.tolerance,
+            'change': round(change, 4) if change is not None else None,
+            'passed': self.passed,
+        }
+
+def bench(args: list[str]) -> int:
+    """
+    Times the code that runs on every poll, price update, countdown tick and notification, prints the time per call
+    and compares it to the committed baseline. Returns `ExitCode.CheckFailed` if any benchmark got slower than its
+    baseline by more than its tolerance.
+
+    Timings are compared as multiples of the time a fixed reference workload takes on the same machine, so the
+    baseline applies anywhere. Everything runs offline against a `NullTransport` and a `SimulatedClock`, with settings
+    and price history kept in a temporary directory rather than the user's data directory.
+    """
+    parser = ArgumentParser(
+        prog=f'{APP_NAME} bench',
+        description='Time the hot paths of polling and the main window and compare them to a baseline'
+    )
+    parser.add_argument('name', nargs='*', help=f'the benchmarks to run (default: all of {", ".join(BENCHMARKS)})')
+    parser.add_argument(
+        '--rounds',
+        type=int,
+        default=DEFAULT_ROUNDS,
+        help='how many times to time each benchmark (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--baseline',
+        type=Path,
+        default=BASELINE_PATH,
+        metavar='PATH',
+        help='the baseline to compare to (default: the one committed with the app)'
+    )
+    parser.add_argument(
+        '--save-baseline',
+        action='store_true',
+        help='write the results to the baseline instead of failing on regressions, keeping existing tolerances'
+    )
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        metavar='FRACTION',
+        help='how much slower than the baseline a benchmark without its own tolerance may get (default: %(default)s)'
+    )
+    parser.add_argument('--format', choices=('text', 'json'), default='text', help='the output format')
+
+    options = parser.parse_args(args)
+
+    unknown_names = [name for name in options.name if name not in BENCHMARKS]
+    if unknown_names or options.rounds < 1:
+        parser.print_usage(sys.stderr)
+        error = f'unknown benchmark {", ".join(unknown_names)}' if unknown_names else '--rounds must be at least 1'
+        print(f'{parser.prog}: error: {error}', file=sys.stderr)
+        return ExitCode.Usage
+
+    # Only recorded to tell apart baselines, the timings are relative to the reference workload
+    environment = {
+        'python': platform.python_version(),
+        'pyside': PYSIDE_VERSION,
+    }
+
+    baseline = {}
+    if options.baseline.exists():
+        try:
+            baseline_file = loads(options.baseline.read_text(encoding='utf-8'))
+            baseline = baseline_file['benchmarks']
+            differences = [
+                f'{key} {baseline_file.get(key)}'
+                for key, value in environment.items() if baseline_file.get(key) != value
+            ]
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            print(f'{parser.prog}: error: invalid baseline {options.baseline}: {e}', file=sys.stderr)
+            return ExitCode.Usage
+
+        if differences and not options.save_baseline:
+            print(
+                f'{parser.prog}: warning: {options.baseline} was recorded with {", ".join(differences)}, '
+                f'so the results may differ more than the tolerances allow.',
+                file=sys.stderr
+            )
+
+    app = QApplication.instance() or QApplication([APP_NAME])
+
+    reference_timer = Timer(_reference_workload)
+    reference_number, _ = reference_timer.autorange()
+
+    results: list[BenchmarkResult] = []
+    with TemporaryDirectory(prefix=f'{APP_NAME}-bench-') as directory:
+        for name in options.name or BENCHMARKS:
+            function = BENCHMARKS[name](Path(directory) / name)
+            timer = Timer(function)
+            # Each round makes enough calls to take at least 0.2 seconds, which keeps timer resolution out of it
+            number, _ = timer.autorange()
+            timings = []
+            reference_timings = []
+            for _ in range(options.rounds):
+                reference_timings.append(reference_timer.timeit(reference_number))
+                timings.append(timer.timeit(number))
+
+            entry = baseline.get(name, {})
+            results.append(BenchmarkResult(
+                name,
+                timings,
+                reference_timings,
+                number,
+                reference_number,
+                baseline=entry.get('relative'),
+                tolerance=entry.get('tolerance', options.tolerance)
+            ))
+
+        app.processEvents()
+
+    if options.save_baseline:
+        benchmarks = {name: dict(entry) for name, entry in baseline.items()}
+        for result in results:
+            benchmarks[result.name] = {'relative': float(f'{result.relative:.4g}'), 'tolerance': result.tolerance}
+
+        options.baseline.write_text(dumps({**environment, 'benchmarks': benchmarks}, indent=4) + '\n', encoding='utf-8')
+
+    if options.format == 'json':
+        print(dumps({**environment, 'results': {result.name: result.to_dict() for result in results}}))
+    else:
+        for result in results:
+            detail = (
+                f'{_format_duration(result.seconds)} per call, {result.relative:,.3g}x the reference '
+                f'({result.number:,} calls x {result.rounds})'
+            )
+            if result.baseline is not None:
+                detail += f', {result.change:+.1%} against {result.baseline:,.3g}x (tolerance {result.tolerance:+.0%})'
+            else:
+                detail += ', no baseline'
+            verdict = 'SKIP' if result.passed is None else 'PASS' if result.passed else 'FAIL'
+            print(f'{verdict} {result.name}: {detail}')
+
+        if options.save_baseline:
+            print(f'Saved the baseline to {options.baseline}')
+
+    if options.save_baseline:
+        return ExitCode.Success
+
+    return ExitCode.Success if all(result.passed is not False for result in results) else ExitCode.CheckFailed
+
+def _reference_workload() -> None:
+    """
+    A fixed mix of what the benchmarked code spends its time on: Python calls, dictionary and attribute lookups,
+    string formatting and parsing, which the benchmarks are timed against.
+    """
+    prices = {}
+    for i in range(50):
+        prices[f'region-{i % 5}'] = int(f'{245_315 + i * 7:d}')
+
+    sorted(prices.items(), key=lambda item: item[1])
+    ', '.join(f'{region}: {price:,}' for region, price in prices.items())
+
+def _create_worker(directory: Path) -> tuple[PriceCheckWorker, SimulatedClock]:
+    """
+    Creates a worker that polls `dynamic-us` and `dynamic-eu` with a valid access token, on a clock that only moves
+    when the benchmark moves it.
+    """
+    clock = SimulatedClock()
+
+    app_settings = QSettings(str(directory / 'app.settings'), QSettings.Format.IniFormat)
+    app_settings.setValue(AppSettingsKeys.ACCESS_TOKEN, 'benchmark')
+    app_settings.setValue(AppSettingsKeys.ACCESS_TOKEN_EXPIRES, clock.now() + timedelta(days=365))
+    user_settings = QSettings(str(directory / 'user.settings'), QSettings.Format.IniFormat)
+    user_settings.setValue(UserSettingsKeys.REGION, 'dynamic-us')
+    user_settings.setValue(UserSettingsKeys.TRACKED_REGIONS, ['dynamic-eu'])
+
+    worker = PriceCheckWorker(
+        clock=clock,
+        transport=NullTransport(),
+        history=PriceHistory(directory / 'price_history.csv'),
+        settings=(app_settings, user_settings)
+    )
+    worker.timer.stop()
+
+    return worker, clock
+
+def _bench_check_price(directory: Path) -> Callable[[], None]:
+    worker, _ = _create_worker(directory)
+    return worker.check_price
+
+def _bench_get_token_price(directory: Path) -> Callable[[], None]:
+    worker, _ = _create_worker(directory)
+    return lambda: worker._get_token_price('dynamic-eu')
+
+def _bench_decode_price_response(directory: Path) -> Callable[[], None]:
+    worker, _ = _create_worker(directory)
+    url = f'https://{API_HOSTS["dynamic-eu"]}/data/wow/token/index'
+    request = Request('GET', url, {'Battlenet-Namespace': 'dynamic-eu'})
+    response = Response(request, 200, headers={'content-type': 'application/json;charset=UTF-8'}, body=PRICE_BODY)
+
+    # Only the first response is a new price, the rest are decoded and found to be already recorded like most polls
+    return lambda: worker._on_transport_finished(response)
+
+def _bench_update_price_labels(directory: Path) -> Callable[[], None]:
+    # noinspection PyUnresolvedReferences
+    import wtpc.icons
+    from wtpc.windows.main_window import MainWindow
+
+    worker, clock = _create_worker(directory)
+    window = MainWindow(worker)
+    window.next_update_timer.stop()
+
+    # Labels skip setting the text they already show, so alternate between two prices like polling would
+    updates = [(245_315, int(clock.time())), (245_320, int(clock.time()) + 1_200)]
+    index = 0
+
+    def update():
+        nonlocal index
+        index ^= 1
+        window._on_token_price_updated(*updates[index])
+
+    return update
+
+def _bench_countdown(directory: Path) -> Callable[[], None]:
+    # noinspection PyUnresolvedReferences
+    import wtpc.icons
+    from wtpc.windows.main_window import MainWindow
+
+    worker, clock = _create_worker(directory)
+    window = MainWindow(worker)
+    window.next_update_timer.stop()
+
+    # An update far in the future keeps the countdown running however many times it ticks
+    window._on_token_price_updated(245_315, int(clock.time()) + 10 ** 9)
+
+    def tick():
+        clock.advance(1.0)
+        window._on_next_update_timer_timeout()
+
+    return tick
+
+def _bench_toast_xml(directory: Path) -> Callable[[], None]:
+    title = 'Price dropped 5% to 245,315 gold'
+    message = 'North America\nBelow 250,000 gold'
+
+    return lambda: get_toast_template(has_message=True, image_path=NOTIFICATION_HERO_PATH).render(title, message)
+
+BENCHMARKS: dict[str, Callable[[Path], Callable[[], None]]] = {
+    'check_price': _bench_check_price,
+    'get_token_price': _bench_get_token_price,
+    'decode_price_response': _bench_decode_price_response,
+    'update_price_labels': _bench_update_price_labels,
+    'countdown': _bench_countdown,
+    'toast_xml': _bench_toast_xml,
+}
+
+def _format_duration(seconds: float) -> str:
+    if seconds < 1e-6:
+        return f'{seconds * 1e9:,.0f} ns'
+    if seconds < 1e-3:
+        return f'{seconds * 1e6:,.2f} µs'
+
+    return f'{seconds * 1e3:,.2f} ms'
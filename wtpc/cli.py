@@ -0,0 +1,190 @@
+import sys
+from enum import IntEnum
+from base64 import b64encode
+from time import perf_counter
+from typing import cast, Optional
+from argparse import ArgumentParser
+from datetime import datetime, timedelta
+from urllib.request import Request, urlopen
+from urllib.error import URLError, HTTPError
+from wtpc import APP_NAME, REGIONS, API_HOSTS
+from json import dumps, loads, JSONDecodeError
+from concurrent.futures import ThreadPoolExecutor
+from wtpc.settings import app_settings, user_settings, AppSettingsKeys, UserSettingsKeys
+
+OAUTH_URL = 'https://oauth.battle.net/token'
+
+class ExitCode(IntEnum):
+    Success = 0
+    FetchFailed = 1
+    Usage = 2
+    AuthFailed = 3
+    CheckFailed = 4
+
+class FetchResult:
+    __slots__ = ('region', 'price', 'last_updated', 'status', 'error')
+
+    def __init__(
+            self,
+            region: str,
+            *,
+            price: Optional[int] = None,
+            last_updated: Optional[float] = None,
+            status: Optional[int] = None,
+            error: Optional[str] = None
+    ):
+        self.region = region
+        self.price = price
+        self.last_updated = last_updated
+        self.status = status
+        self.error = error
+
+    def to_dict(self) -> dict:
+        if self.error is not None:
+            return {'region': self.region, 'error': self.error, 'status': self.status}
+
+        return {'region': self.region, 'price': self.price, 'last_updated': self.last_updated}
+
+def fetch(args: list[str]) -> int:
+    """
+    Fetches the current price of one or more regions, prints them and returns the process exit code.
+
+    Nothing but the settings is loaded, so there's no QApplication, no resources and no notification setup. A cached
+    access token that is still valid is reused, and the regions are fetched concurrently.
+    """
+    started_at = perf_counter()
+
+    parser = ArgumentParser(prog=f'{APP_NAME} fetch', description='Print the current WoW Token price and exit')
+    parser.add_argument(
+        '--region',
+        help='comma-separated regions to fetch, such as us,eu (default: the region selected in the settings)'
+    )
+    parser.add_argument('--format', choices=('text', 'json'), default='text', help='the output format')
+    parser.add_argument(
+        '--api-url',
+        metavar='URL',
+        help='get prices from URL, such as an instance running with --proxy, instead of Battle.net'
+    )
+    parser.add_argument('--timeout', type=float, default=10.0, metavar='SECONDS', help='the timeout of each request')
+
+    options = parser.parse_args(args)
+
+    regions = parse_regions(options.region or user_settings.value(UserSettingsKeys.REGION, 'dynamic-us'))
+    if regions is None:
+        parser.print_usage(sys.stderr)
+        print(f'{parser.prog}: error: unknown region in {options.region}', file=sys.stderr)
+        return ExitCode.Usage
+
+    access_token = None
+    if options.api_url is None:
+        access_token = _get_cached_access_token() or _get_access_token(options.timeout)
+        if access_token is None:
+            print('Could not get an access token, check the client credentials in the settings', file=sys.stderr)
+            return ExitCode.AuthFailed
+
+    results = _fetch_regions(regions, access_token, options.api_url, options.timeout)
+
+    # A cached token may have been revoked, so get a new one and retry once
+    if access_token is not None and any(result.status == 401 for result in results):
+        access_token = _get_access_token(options.timeout)
+        if access_token is None:
+            print('Could not get an access token, check the client credentials in the settings', file=sys.stderr)
+            return ExitCode.AuthFailed
+
+        results = _fetch_regions(regions, access_token, options.api_url, options.timeout)
+
+    elapsed = perf_counter() - started_at
+    if options.format == 'json':
+        print(dumps({'regions': [result.to_dict() for result in results], 'elapsed': round(elapsed, 4)}))
+    else:
+        for result in results:
+            region_name = REGIONS.get(result.region, result.region)
+            if result.error is not None:
+                print(f'{region_name}: {result.error}')
+            else:
+                last_updated = datetime.fromtimestamp(result.last_updated).strftime('%x %X')
+                print(f'{region_name}: {result.price:,} (updated {last_updated})')
+
+        print(f'Fetched {len(results)} region(s) in {elapsed:.3f}s', file=sys.stderr)
+
+    return ExitCode.FetchFailed if any(result.error is not None for result in results) else ExitCode.Success
+
+def parse_regions(value: str) -> Optional[list[str]]:
+    """
+    Parses comma-separated regions such as `us,eu` into namespaces, returning `None` if any region is unknown.
+    """
+    regions = []
+    for region in value.split(','):
+        region = region.strip().lower()
+        if not region.startswith('dynamic-'):
+            region = f'dynamic-{region}'
+        if region not in REGIONS:
+            return None
+        if region not in regions:
+            regions.append(region)
+
+    return regions
+
+def _get_cached_access_token() -> Optional[str]:
+    access_token = cast(Optional[str], app_settings.value(AppSettingsKeys.ACCESS_TOKEN, None))
+    access_token_expires = cast(Optional[datetime], app_settings.value(AppSettingsKeys.ACCESS_TOKEN_EXPIRES, None))
+    if access_token is None or access_token_expires is None or access_token_expires < datetime.now():
+        return None
+
+    return access_token
+
+def _get_access_token(timeout: float) -> Optional[str]:
+    client_id = user_settings.value(UserSettingsKeys.CLIENT_ID, None)
+    client_secret = user_settings.value(UserSettingsKeys.CLIENT_SECRET, None)
+    if client_id is None or client_secret is None:
+        return None
+
+    auth = b64encode(f'{client_id}:{client_secret}'.encode('utf-8')).decode('utf-8')
+    request = Request(OAUTH_URL, data=b'grant_type=client_credentials', headers={
+        'Authorization': f'Basic {auth}',
+        'Content-Type': 'application/x-www-form-urlencoded',
+    })
+    try:
+        with urlopen(request, timeout=timeout) as response:
+            json = loads(response.read())
+        access_token = cast(str, json['access_token'])
+        expires_in = cast(int, json['expires_in'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+    # Share the token with the app and later runs
+    app_settings.setValue(AppSettingsKeys.ACCESS_TOKEN, access_token)
+    app_settings.setValue(AppSettingsKeys.ACCESS_TOKEN_EXPIRES, datetime.now() + timedelta(seconds=expires_in))
+    app_settings.sync()
+
+    return access_token
+
+def _fetch_regions(
+        regions: list[str],
+        access_token: Optional[str],
+        base_url: Optional[str],
+        timeout: float
+) -> list[FetchResult]:
+    with ThreadPoolExecutor(max_workers=len(regions)) as executor:
+        return list(executor.map(lambda region: _fetch_region(region, access_token, base_url, timeout), regions))
+
+def _fetch_region(region: str, access_token: Optional[str], base_url: Optional[str], timeout: float) -> FetchResult:
+    base_url = base_url.rstrip('/') if base_url is not None else f'https://{API_HOSTS[region]}'
+    headers = {'Battlenet-Namespace': region}
+    if access_token is not None:
+        headers['Authorization'] = f'Bearer {access_token}'
+
+    try:
+        with urlopen(Request(f'{base_url}/data/wow/token/index', headers=headers), timeout=timeout) as response:
+            json = loads(response.read())
+        return FetchResult(
+            region,
+            price=cast(int, json['price']) // 10_000,
+            last_updated=cast(int, json['last_updated_timestamp']) / 1000
+        )
+    except HTTPError as e:
+        return FetchResult(region, status=e.code, error=f'HTTP {e.code} {e.reason}')
+    except URLError as e:
+        return FetchResult(region, error=str(e.reason))
+    except (OSError, KeyError, TypeError, JSONDecodeError) as e:
+        return FetchResult(region, error=f'Invalid response: {e}')
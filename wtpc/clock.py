@@ -0,0 +1,170 @@
+import time
+from heapq import heappop, heappush
+from datetime import datetime
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+from PySide6.QtCore import Qt, Signal, QTimer, QObject
+
+class Clock(ABC):
+    """
+    The source of time for code that schedules work, so it can run against simulated time as well as real time.
+
+    `time` is the Unix time used for timestamps, `monotonic` is used to measure intervals and `create_timer` creates
+    timers with the same API as `QTimer` that fire on this clock.
+    """
+    @abstractmethod
+    def time(self) -> float:
+        """
+        Returns the current Unix time in seconds.
+        """
+
+    @abstractmethod
+    def monotonic(self) -> float:
+        """
+        Returns a time in seconds that never goes backwards, for measuring intervals.
+        """
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.time())
+
+    @abstractmethod
+    def create_timer(self, parent: Optional[QObject] = None) -> QTimer:
+        """
+        Creates a stopped timer that fires on this clock.
+        """
+
+    @abstractmethod
+    def call_later(self, seconds: float, callback: Callable[[], None]) -> None:
+        """
+        Calls `callback` once after `seconds` on this clock.
+        """
+
+class SystemClock(Clock):
+    def time(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def create_timer(self, parent: Optional[QObject] = None) -> QTimer:
+        return QTimer(parent)
+
+    def call_later(self, seconds: float, callback: Callable[[], None]) -> None:
+        QTimer.singleShot(int(seconds * 1000), callback)
+
+class SimulatedTimer(QObject):
+    """
+    A timer that fires when its `SimulatedClock` is advanced past its deadline rather than from the event loop.
+    """
+    timeout = Signal()
+
+    def __init__(self, clock: 'SimulatedClock', parent: Optional[QObject] = None):
+        super().__init__(parent)
+
+        self.clock = clock
+
+        self._interval = 0
+        self._single_shot = False
+        self._deadline: Optional[float] = None
+        # Stopping or restarting the timer invalidates the entries already scheduled on the clock
+        self._generation = 0
+
+    def interval(self) -> int:
+        return self._interval
+
+    def setInterval(self, msec: int) -> None:
+        self._interval = msec
+        if self.isActive():
+            self.start()
+
+    def isSingleShot(self) -> bool:
+        return self._single_shot
+
+    def setSingleShot(self, single_shot: bool) -> None:
+        self._single_shot = single_shot
+
+    def setTimerType(self, timer_type: Qt.TimerType) -> None:
+        pass
+
+    def isActive(self) -> bool:
+        return self._deadline is not None
+
+    def remainingTime(self) -> int:
+        if self._deadline is None:
+            return -1
+
+        return max(0, round((self._deadline - self.clock.monotonic()) * 1000))
+
+    def start(self, msec: Optional[int] = None) -> None:
+        if msec is not None:
+            self._interval = msec
+
+        self._generation += 1
+        self._deadline = self.clock.monotonic() + self._interval / 1000
+        self.clock._schedule(self._deadline, self._fire, self._generation)
+
+    def stop(self) -> None:
+        self._generation += 1
+        self._deadline = None
+
+    def _fire(self, generation: int):
+        if generation != self._generation:
+            return
+
+        if self._single_shot:
+            self._deadline = None
+        else:
+            self._deadline += max(self._interval, 1) / 1000
+            self.clock._schedule(self._deadline, self._fire, generation)
+
+        self.timeout.emit()
+
+class SimulatedClock(Clock):
+    """
+    A clock that only moves when `advance` is called, running every timer and callback that falls due in order, so
+    days of scheduling can be replayed in moments and every replay runs the same way.
+    """
+    def __init__(self, start: float = 1_700_000_000.0):
+        self._start = start
+        self._elapsed = 0.0
+        self._sequence = 0
+        self._queue: list[tuple[float, int, Callable, tuple]] = []
+
+    def time(self) -> float:
+        return self._start + self._elapsed
+
+    def monotonic(self) -> float:
+        return self._elapsed
+
+    def create_timer(self, parent: Optional[QObject] = None) -> SimulatedTimer:
+        return SimulatedTimer(self, parent)
+
+    def call_later(self, seconds: float, callback: Callable[[], None]) -> None:
+        self._schedule(self._elapsed + seconds, callback)
+
+    def advance(self, seconds: float) -> int:
+        """
+        Moves the clock forward by `seconds`, returning how many timers and callbacks were run.
+        """
+        target = self._elapsed + seconds
+        queue = self._queue
+        runs = 0
+        while queue and queue[0][0] <= target:
+            deadline, _, callback, args = heappop(queue)
+            self._elapsed = max(self._elapsed, deadline)
+            callback(*args)
+            runs += 1
+
+        self._elapsed = target
+
+        return runs
+
+    def _schedule(self, deadline: float, callback: Callable, *args):
+        # The sequence number keeps callbacks with the same deadline in the order they were scheduled
+        self._sequence += 1
+        heappush(self._queue, (deadline, self._sequence, callback, args))
+
+system_clock = SystemClock()
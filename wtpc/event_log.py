@@ -0,0 +1,150 @@
+from time import time
+from json import dumps
+from pathlib import Path
+from datetime import datetime
+from collections import deque
+from typing import Any, Optional
+from wtpc import EVENT_LOG_DUMP_DIR
+from threading import Thread, Condition, current_thread
+
+EVENT_LOG_CAPACITY = 2048
+LOG_FILE_MAX_BYTES = 1024 * 1024
+LOG_FILE_BACKUPS = 3
+
+class EventLog:
+    """
+    Keeps the most recent structured events, such as failed requests, in a fixed-size ring buffer.
+
+    Each event is formatted into a JSON Lines record once when it is recorded and kept as a string, so recording only
+    costs the formatting and dumping the log is a join. Nothing is written to disk while recording. Once `stream_to`
+    is called, a background thread also appends every record to a file, which is rotated when it grows past
+    `max_bytes`.
+    """
+    def __init__(self, capacity: int = EVENT_LOG_CAPACITY):
+        self.records: deque[str] = deque(maxlen=capacity)
+
+        self._pending: list[str] = []
+        self._condition = Condition()
+        self._thread: Optional[Thread] = None
+        self._is_stopping = False
+
+    def record(self, level: str, event: str, **fields: Any) -> None:
+        line = dumps(
+            {'time': round(time(), 3), 'level': level, 'event': event, **fields},
+            separators=(',', ':'),
+            default=str
+        )
+        self.records.append(line)
+
+        if self._thread is not None:
+            with self._condition:
+                # The writer may have given up on the file since
+                if self._thread is not None:
+                    self._pending.append(line)
+                    self._condition.notify()
+
+    def info(self, event: str, **fields: Any) -> None:
+        self.record('info', event, **fields)
+
+    def warning(self, event: str, **fields: Any) -> None:
+        self.record('warning', event, **fields)
+
+    def error(self, event: str, **fields: Any) -> None:
+        self.record('error', event, **fields)
+
+    def dump(self) -> str:
+        """
+        Returns the records in the ring buffer as JSON Lines, oldest first.
+        """
+        return ''.join(line + '\n' for line in list(self.records))
+
+    def dump_to(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.dump(), encoding='utf-8')
+
+    def stream_to(self, path: Path, *, max_bytes: int = LOG_FILE_MAX_BYTES, backups: int = LOG_FILE_BACKUPS) -> None:
+        """
+        Starts appending every new record to `path` from a background thread. When the file grows past `max_bytes`
+        it is renamed to `path.1`, shifting older files up to `path.{backups}`, and a new file is started.
+        """
+        self.close()
+
+        with self._condition:
+            self._is_stopping = False
+            self._thread = Thread(target=self._run, args=(path, max_bytes, backups), name='wtpc-event-log', daemon=True)
+            self._thread.start()
+
+    def close(self, timeout: Optional[float] = 1.0) -> None:
+        """
+        Stops streaming to the file after writing the records that are still pending.
+        """
+        with self._condition:
+            thread = self._thread
+            self._is_stopping = True
+            self._condition.notify()
+
+        if thread is not None:
+            thread.join(timeout)
+
+        with self._condition:
+            self._thread = None
+
+    def _run(self, path: Path, max_bytes: int, backups: int):
+        try:
+            self._write(path, max_bytes, backups)
+        except OSError as e:
+            # Stop streaming rather than keep collecting records nothing will write
+            with self._condition:
+                if self._thread is current_thread():
+                    self._pending.clear()
+                    self._thread = None
+
+            self.error('log_file_failed', path=str(path), error=str(e))
+
+    def _write(self, path: Path, max_bytes: int, backups: int):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        file = path.open('a', encoding='utf-8')
+        try:
+            while True:
+                with self._condition:
+                    while not self._pending and not self._is_stopping:
+                        self._condition.wait()
+
+                    lines, self._pending = self._pending, []
+                    is_stopping = self._is_stopping
+
+                if lines:
+                    file.write(''.join(line + '\n' for line in lines))
+                    file.flush()
+
+                    if file.tell() >= max_bytes:
+                        file.close()
+                        self._rotate(path, backups)
+                        file = path.open('a', encoding='utf-8')
+
+                if is_stopping:
+                    return
+        finally:
+            file.close()
+
+    def _rotate(self, path: Path, backups: int):
+        for i in range(backups - 1, 0, -1):
+            older = path.with_name(f'{path.name}.{i}')
+            if older.exists():
+                older.replace(path.with_name(f'{path.name}.{i + 1}'))
+
+        if backups > 0:
+            path.replace(path.with_name(f'{path.name}.1'))
+        else:
+            path.unlink()
+
+event_log = EventLog()
+
+def dump_event_log() -> Path:
+    """
+    Writes the app's event log to a new timestamped file in the event log dump directory, returning its path.
+    """
+    path = EVENT_LOG_DUMP_DIR / f'event_log-{datetime.now():%Y%m%d-%H%M%S}.jsonl'
+    event_log.dump_to(path)
+
+    return path
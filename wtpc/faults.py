@@ -0,0 +1,166 @@
+from json import dumps
+from random import Random
+from wtpc.clock import Clock
+from collections import Counter
+from typing import Callable, Optional
+from PySide6.QtCore import Slot, QObject
+from wtpc.transport import Request, Response, Transport
+
+STORM_DURATION = 5 * 60
+
+HTML_BODY = b'<!DOCTYPE html><html><head><title>503 Service Temporarily Unavailable</title></head></html>'
+
+DEFAULT_FAULTS = {
+    'latency': 0.02,
+    'reset': 0.02,
+    'no-status': 0.01,
+    '401-storm': 0.001,
+    '429': 0.01,
+    'html': 0.01,
+    'truncated': 0.01,
+    'missing-price': 0.01,
+}
+PRICE_REQUEST_FAULTS = ('401-storm', 'missing-price')
+
+class FaultInjectingTransport(Transport):
+    """
+    Wraps another transport and makes a random share of its requests misbehave the ways real APIs and networks do.
+
+    `faults` maps the name of each fault to the probability of it affecting a request:
+
+    - `latency`: the response is delayed by 5 to 30 seconds
+    - `reset`: the connection is reset, so there's no response
+    - `no-status`: a response arrives without an HTTP status
+    - `401-storm`: every price request is rejected with a 401 for `STORM_DURATION` seconds, even with a new token
+    - `429`: the request is rate limited with a `Retry-After` of up to two minutes
+    - `html`: a successful response has an HTML error page as its body
+    - `truncated`: a successful response has its body cut off halfway
+    - `missing-price`: a successful price response has no `price`
+
+    Faults are drawn from `seed`, so a run with the same requests sees the same faults.
+    """
+    def __init__(
+            self,
+            inner: Transport,
+            clock: Clock,
+            faults: dict[str, float],
+            *,
+            latency: float = 0.05,
+            seed: int = 0,
+            parent: Optional[QObject] = None
+    ):
+        super().__init__(parent)
+
+        unknown_faults = faults.keys() - DEFAULT_FAULTS.keys()
+        if unknown_faults:
+            raise ValueError(f'Unknown faults: {", ".join(sorted(unknown_faults))}')
+
+        self.inner = inner
+        self.inner.finished.connect(self._on_inner_finished)
+
+        self.clock = clock
+        self.faults = faults
+        self.latency = latency
+        self.random = Random(seed)
+
+        self.sent = 0
+        self.injected: Counter[str] = Counter()
+
+        self._storm_until = 0.0
+        self._corruptions: dict[Request, Callable[[Response], Response]] = {}
+
+    def send(self, request: Request) -> None:
+        self.sent += 1
+
+        is_price_request = 'Battlenet-Namespace' in request.headers
+        now = self.clock.monotonic()
+        if is_price_request and now < self._storm_until:
+            self._respond_later(self._rejected(request, 401, {}))
+            return
+
+        fault = self._draw_fault()
+        # Faults of price requests leave OAuth requests alone, and aren't counted as injected for them
+        if fault in PRICE_REQUEST_FAULTS and not is_price_request:
+            fault = None
+        if fault is not None:
+            self.injected[fault] += 1
+
+        match fault:
+            case 'reset':
+                self._respond_later(Response(request, None, error='Connection reset by peer'))
+            case 'no-status':
+                self._respond_later(Response(request, None, body=b'{}'))
+            case '401-storm':
+                self._storm_until = now + STORM_DURATION
+                self._respond_later(self._rejected(request, 401, {}))
+            case '429':
+                retry_after = str(self.random.randint(1, 120))
+                self._respond_later(self._rejected(request, 429, {'retry-after': retry_after}))
+            case 'latency':
+                delay = self.random.uniform(5.0, 30.0)
+                self.clock.call_later(delay, lambda: self.inner.send(request))
+            case 'html':
+                self._corruptions[request] = lambda r: Response(r.request, r.status, headers=r.headers, body=HTML_BODY)
+                self.inner.send(request)
+            case 'truncated':
+                self._corruptions[request] = lambda r: Response(
+                    r.request,
+                    r.status,
+                    headers=r.headers,
+                    body=r.body[:len(r.body) // 2]
+                )
+                self.inner.send(request)
+            case 'missing-price':
+                self._corruptions[request] = lambda r: Response(
+                    r.request,
+                    r.status,
+                    headers=r.headers,
+                    body=r.body.replace(b'"price"', b'"cost"')
+                )
+                self.inner.send(request)
+            case _:
+                self.inner.send(request)
+
+    #region Signal Handlers
+    @Slot(object)
+    def _on_inner_finished(self, response: Response):
+        corrupt = self._corruptions.pop(response.request, None)
+        if corrupt is not None and response.status == 200:
+            response = corrupt(response)
+
+        self.finished.emit(response)
+    #endregion
+
+    def _draw_fault(self) -> Optional[str]:
+        roll = self.random.random()
+        for fault, probability in self.faults.items():
+            if roll < probability:
+                return fault
+            roll -= probability
+
+        return None
+
+    def _rejected(self, request: Request, status: int, headers: dict[str, str]) -> Response:
+        body = dumps({'code': status, 'type': 'Rejected', 'detail': 'Injected fault'}).encode('utf-8')
+
+        return Response(request, status, headers=headers, body=body, error=f'Injected HTTP {status}')
+
+    def _respond_later(self, response: Response):
+        self.clock.call_later(self.latency, lambda: self.finished.emit(response))
+
+def parse_faults(specs: list[str]) -> dict[str, float]:
+    """
+    Parses fault specifications such as `reset=0.05` into probabilities by fault. A fault without a probability uses
+    its default probability, and `all` enables every fault with its default probability.
+    """
+    faults = {}
+    for spec in specs:
+        name, _, probability = spec.strip().lower().partition('=')
+        if name == 'all':
+            faults.update(DEFAULT_FAULTS)
+        elif name not in DEFAULT_FAULTS:
+            raise ValueError(f'Unknown fault: {name}')
+        else:
+            faults[name] = float(probability) if probability else DEFAULT_FAULTS[name]
+
+    return faults
@@ -6,6 +6,58 @@
 from PySide6 import QtCore
 
 qt_resource_data = b"\
+\x00\x00\x02Z\
+\x89\
+PNG\x0d\x0a\x1a\x0a\x00\x00\x00\x0dIHDR\x00\
+\x00\x00\x10\x00\x00\x00\x10\x08\x06\x00\x00\x00\x1f\xf3\xffa\
+\x00\x00\x00\x09pHYs\x00\x00\x0e\xc4\x00\x00\x0e\xc4\
+\x01\x95+\x0e\x1b\x00\x00\x02\x0cIDAT8\x8d\xcd\
+\x92MHTa\x14\x86\x9f\xef\xde\xf9I\xe7:1B\
+\xa1\x8b0\x22K\x0dqaP\x8c\x92\xd5\x22\x92\xa2r\
+a\xe4\xdfbh\xca\x22\x88ZT\x10E\xb8\x12\xb4\x82\
+J04\xc2E\xcd,f\x82\xe8\x87\x16\x89\x04\x9a\x12\
+\xa2\xa56\x92\x22\x92L\xe9B3q\xeeUqn\xf7\
+k\x91\x86V\x84\xd2\xa6wy\xe0y\xe0\x9c\xf7\xc0?\
+F\xac\x168\xe6u\x1fP\xb0\x9a\x808\xc2\xf2\xafJ\
+P\xba\xc3\x9d\xeeL\x10o\xcfWnsYRRS\
+\xd77\xa1\xac\x14.\xce\xc2\x81*\x03\xc5\x876\xba\xd2\
+7\xb9\xd1\x12\xed\x00\xf3\xb6\x95\x0a\x1c\x1eWUN\x96\
+g\xfb\x9e\xbcTL\xd3\xa2\xf1\xc1\x00\x12q\xe57\xc1\
+\xc2\x8e\xf5\x80C\x0aq#\xf8:V[\x9e\xaf\xedN\
+\xd2\x1c\x97|%\xe9\x00\x84\x9f\x8d\x10\x1d5B\xc1v\
+\xbdi\x99\xa04?17\xd1.\x1e\x9d\xf1g;3\
+6\xaf\xe5\xdc\xd575%^mN\x0aq\xf1x\xd9\
+\x16\xa1\xb9\xecD\x06\xbe\xd2\xdc6\xfa\x09E\xad\x04\xa4\
+\xba\x08Wx\xb5\xf5\x08\xb5\xa5\xb2bkrv\xa6\x07\
+\x80\xec\xccd\xbaz&\x0aw\xedLq\xef\xcdKE\
+7\xe2\xdc\xbc\x1b\x91\xb3\xb3\xdf\x0e\x07\xdbc\x1f`\xa1\
+\xc6\x93\xb9\xd8u\xa7\xf6\xf2\xe0\xbe\x0d\x05E\x85i\x00\
+\xc4M\x0b\xbbm\xf9\x8do\xdf\x8b\xf0\xee\xfddu\xb0\
+\xc3\xb8\xbc8S\x00t\xa7v='\xcbSpd\x7f\
+\x1aR\xc2\xad\x86~.Tu\xf2yl\xe6'\xdc\xd2\
+6FOd\xaa3i\xde\xb8\xb6T\xaa\x94x]\xe5\
+)\xeb\x12\xce\x9e\xa8\xc8@\x08x\xfcb\x84\x9e\xfe\xc9\
+W1\xdd\xf4\xd5\xd6\xf7YC\xc3\xd3D\x06\xa7\x08=\
+\xf9h(R\x946t\x11_*\xb0)B\xd4\x9e\xf6\
+e\x90\xb0F\xa5\xbb\xf7\x0b\xcf\x9b\xa3Q\xd3\xc6\xd1P\
+kl\xbc\xcc\xab\xe9\xd5wz\xeb@\xce\x229\x15\xe8\
+0\x86~m\xcd&%\x8aa\x98\x0c\x0dOs?0\
+8'\x85U\x14j\x9d\x19\x07x\xd8\xae\x87\x81\xf0\x9f\
+?\xe3G\xc4B\xef\x8d\x80*\x15\xe1\x0f\xb6\xc5\x9e\xfe\
+\x0d\xf8\xff\xf2\x1dn\xc6\xbf\x85\xa0g\xc6\xa2\x00\x00\x00\
+\x00IEND\xaeB`\x82\
+\x00\x00\x00\x96\
+\x89\
+PNG\x0d\x0a\x1a\x0a\x00\x00\x00\x0dIHDR\x00\
+\x00\x00\x10\x00\x00\x00\x10\x08\x06\x00\x00\x00\x1f\xf3\xffa\
+\x00\x00\x00\x09pHYs\x00\x00\x0e\xc4\x00\x00\x0e\xc4\
+\x01\x95+\x0e\x1b\x00\x00\x00HIDAT8\x8dc\
+`\xa0\x1002000DY\xf1\xfc'G\xf3\xb2\
+c_\x18Y`\x9c\xb9\xfd6p\x89\xe4\xc2#(|\
+l \xb9\xf0\x08\x03\x03\x03\x03\x03\x1396#\x03\x8a\
+\xbd@\xa9\x03F\x03q4\x10\x19\x18\x18\x06C \x02\
+\x00Z\x08*\x19\xe4\x05\xef\xe6\x00\x00\x00\x00IEN\
+D\xaeB`\x82\
 \x00\x00\x027\
 \x89\
 PNG\x0d\x0a\x1a\x0a\x00\x00\x00\x0dIHDR\x00\
@@ -1482,6 +1534,14 @@ qt_resource_name = b"\
 \x07\x03}\xc3\
 \x00i\
 \x00m\x00a\x00g\x00e\x00s\
+\x00\x09\
+\x08\x97\x84\x87\
+\x00c\
+\x00h\x00a\x00r\x00t\x00.\x00p\x00n\x00g\
+\x00\x0d\
+\x0d\x94\x84G\
+\x00d\
+\x00a\x00s\x00h\x00b\x00o\x00a\x00r\x00d\x00.\x00p\x00n\x00g\
 \x00\x0d\
 \x05T9g\
 \x00b\
@@ -1508,18 +1568,22 @@ qt_resource_name = b"\
 qt_resource_struct = b"\
 \x00\x00\x00\x00\x00\x02\x00\x00\x00\x01\x00\x00\x00\x01\
 \x00\x00\x00\x00\x00\x00\x00\x00\
-\x00\x00\x00\x00\x00\x02\x00\x00\x00\x05\x00\x00\x00\x02\
+\x00\x00\x00\x00\x00\x02\x00\x00\x00\x07\x00\x00\x00\x02\
 \x00\x00\x00\x00\x00\x00\x00\x00\
-\x00\x00\x002\x00\x00\x00\x00\x00\x01\x00\x00\x02;\
-\x00\x00\x01\x921\x02/\xe3\
-\x00\x00\x00V\x00\x00\x00\x00\x00\x01\x00\x00T\xf7\
-\x00\x00\x01\x92J\x14\x5c\x81\
+\x00\x00\x00j\x00\x00\x00\x00\x00\x01\x00\x00\x053\
+\x00\x00\x01\x92K\x11\x87\x88\
+\x00\x00\x00\x8e\x00\x00\x00\x00\x00\x01\x00\x00W\xef\
+\x00\x00\x01\x92K\x11\x87\x88\
+\x00\x00\x00J\x00\x00\x00\x00\x00\x01\x00\x00\x02\xf8\
+\x00\x00\x01\x92K\x11\x87\x88\
+\x00\x00\x00\xb2\x00\x00\x00\x00\x00\x01\x00\x00Y\xd9\
+\x00\x00\x01\x92K\x11\x87\x88\
 \x00\x00\x00\x12\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\
-\x00\x00\x01\x92J\x14\xc2y\
-\x00\x00\x00z\x00\x00\x00\x00\x00\x01\x00\x00V\xe1\
-\x00\x00\x01\x92I\x96\x1f~\
-\x00\x00\x00\x96\x00\x00\x00\x00\x00\x01\x00\x00X\xed\
-\x00\x00\x01\x92J\x14\xd8\xfc\
+\x00\x00\x01\xa1UQ\x9a9\
+\x00\x00\x00*\x00\x00\x00\x00\x00\x01\x00\x00\x02^\
+\x00\x00\x01\xa1UU/\xad\
+\x00\x00\x00\xce\x00\x00\x00\x00\x00\x01\x00\x00[\xe5\
+\x00\x00\x01\x92K\x11\x87\x88\
 "
 
 def qInitResources():
@@ -0,0 +1,142 @@
+import tracemalloc
+from time import time, monotonic
+from json import dumps
+from pathlib import Path
+from threading import Thread
+from collections import Counter
+from typing import Callable, Optional
+from PySide6.QtCore import Qt, Slot, QTimer, QObject
+from wtpc.event_log import event_log
+from wtpc.resource_usage import current_rss, count_qobjects
+
+SNAPSHOT_INTERVAL = 15 * 60
+BASELINE_DELAY = 5 * 60
+TOP_ALLOCATION_SITES = 20
+# A single frame per allocation keeps tracing cheap enough to leave on for days
+TRACEBACK_FRAMES = 1
+
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+class MemoryProfiler(QObject):
+    """
+    Traces Python allocations with `tracemalloc` and periodically reports what grew since a baseline.
+
+    The baseline is taken `baseline_delay` seconds after starting, once caches and connection pools have filled up.
+    Every `interval` seconds after that, a snapshot is compared to it and a JSON Lines record is appended to `path`
+    with the resident memory, the traced memory, the allocation sites that grew the most and the number of live Qt
+    objects by class, counted from the objects `roots` returns and everything parented to them.
+
+    Snapshots are taken and compared on a background thread, so only counting the Qt objects runs on the GUI thread.
+    """
+    def __init__(
+            self,
+            path: Path,
+            roots: Callable[[], list[QObject]],
+            parent: Optional[QObject] = None,
+            *,
+            interval: float = SNAPSHOT_INTERVAL,
+            baseline_delay: float = BASELINE_DELAY
+    ):
+        super().__init__(parent)
+
+        self.path = path
+        self.roots = roots
+        self.interval = interval
+        self.baseline_delay = baseline_delay
+
+        self.snapshot_timer = QTimer(self)
+        self.snapshot_timer.setTimerType(Qt.TimerType.VeryCoarseTimer)
+        self.snapshot_timer.setSingleShot(True)
+        self.snapshot_timer.timeout.connect(self._on_snapshot_timer_timeout)
+
+        self._started_at = 0.0
+        self._is_tracing_owned = False
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._baseline_qobjects: Counter[str] = Counter()
+        self._thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEBACK_FRAMES)
+            self._is_tracing_owned = True
+
+        self._started_at = monotonic()
+        self.snapshot_timer.start(int(self.baseline_delay * 1000))
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        self.snapshot_timer.stop()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+            # A snapshot still being compared needs the baseline and tracing, so leave them to the process exiting
+            if self._thread.is_alive():
+                return
+            self._thread = None
+
+        self._baseline = None
+        if self._is_tracing_owned:
+            tracemalloc.stop()
+            self._is_tracing_owned = False
+
+    #region Signal Handlers
+    @Slot()
+    def _on_snapshot_timer_timeout(self):
+        self.snapshot_timer.start(int(self.interval * 1000))
+
+        # A slow disk could still be writing the last report
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        qobjects = Counter()
+        for root in self.roots():
+            qobjects.update(count_qobjects(root))
+
+        self._thread = Thread(target=self._snapshot, args=(qobjects,), name='wtpc-memory-profiler', daemon=True)
+        self._thread.start()
+    #endregion
+
+    def _snapshot(self, qobjects: Counter[str]):
+        snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        if self._baseline is None:
+            self._baseline = snapshot
+            self._baseline_qobjects = qobjects
+            return
+
+        stats = snapshot.compare_to(self._baseline, 'lineno')
+        top_growth = [stat for stat in stats if stat.size_diff > 0][:TOP_ALLOCATION_SITES]
+        traced, traced_peak = tracemalloc.get_traced_memory()
+        qobject_growth = qobjects.copy()
+        qobject_growth.subtract(self._baseline_qobjects)
+
+        record = {
+            'time': round(time(), 3),
+            'uptime': round(monotonic() - self._started_at, 3),
+            'rss': current_rss(),
+            'traced': traced,
+            'traced_peak': traced_peak,
+            'traced_growth': sum(stat.size_diff for stat in stats),
+            'top_growth': [
+                {
+                    'site': f'{stat.traceback[0].filename}:{stat.traceback[0].lineno}',
+                    'size_diff': stat.size_diff,
+                    'count_diff': stat.count_diff,
+                    'size': stat.size,
+                    'count': stat.count,
+                }
+                for stat in top_growth
+            ],
+            'qobjects': dict(qobjects.most_common()),
+            'qobject_growth': {name: diff for name, diff in sorted(qobject_growth.items()) if diff},
+        }
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open('a', encoding='utf-8') as f:
+                f.write(dumps(record, separators=(',', ':')) + '\n')
+        except OSError as e:
+            event_log.error('memory_profile_failed', path=str(self.path), error=str(e))
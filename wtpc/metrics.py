@@ -0,0 +1,283 @@
+from math import inf
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Any, Callable, Optional
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = tuple[str, ...]
+
+class CounterValue:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+class GaugeValue:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+class HistogramValue:
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates the `q` quantile (between 0 and 1) by interpolating linearly within the bucket it falls in, like
+        Prometheus' `histogram_quantile`. Quantiles above the highest bound are estimated as the highest bound.
+        """
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                if i == len(self.bounds):
+                    break
+
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                return lower + (self.bounds[i] - lower) * (rank - cumulative) / count
+
+            cumulative += count
+
+        return self.bounds[-1] if self.bounds else 0.0
+
+class Metric(ABC):
+    """
+    A named metric with a value per combination of label values.
+
+    Children are created the first time a combination of label values is used and cached, so hot paths can keep a
+    reference to their child and update it with a single attribute write.
+    """
+    type = ''
+
+    def __init__(self, name: str, help_: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_
+        self.label_names = label_names
+
+        self._children: dict[LabelValues, object] = {}
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._create_child()
+
+        return child
+
+    def values(self) -> dict[LabelValues, Any]:
+        """
+        Returns the current value of every combination of label values, which is a number for counters, gauges and
+        callback metrics and a `HistogramValue` for histograms.
+        """
+        return {values: child.value for values, child in self._children.items()}
+
+    def expose(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.type}']
+        for values, child in self._children.items():
+            self._expose_child(lines, values, child)
+
+        return lines
+
+    @abstractmethod
+    def _create_child(self):
+        """
+        Creates the object holding the value of one combination of label values.
+        """
+
+    def _expose_child(self, lines: list[str], values: LabelValues, child) -> None:
+        lines.append(f'{self.name}{self._format_labels(values)} {_format_value(child.value)}')
+
+    def _format_labels(self, values: LabelValues, extra: str = '') -> str:
+        pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(self.label_names, values)]
+        if extra:
+            pairs.append(extra)
+
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _create_child(self) -> CounterValue:
+        return CounterValue()
+
+    def _expose_child(self, lines: list[str], values: LabelValues, child: CounterValue) -> None:
+        lines.append(f'{self.name}_total{self._format_labels(values)} {_format_value(child.value)}')
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _create_child(self) -> GaugeValue:
+        return GaugeValue()
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(
+            self,
+            name: str,
+            help_: str,
+            label_names: tuple[str, ...] = (),
+            *,
+            buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help_, label_names)
+
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def values(self) -> dict[LabelValues, HistogramValue]:
+        return dict(self._children)
+
+    def _create_child(self) -> HistogramValue:
+        return HistogramValue(self.buckets)
+
+    def _expose_child(self, lines: list[str], values: LabelValues, child: HistogramValue) -> None:
+        # Buckets are counted individually when observing and only made cumulative here
+        cumulative = 0
+        for bound, count in zip(self.buckets + (inf,), child.counts):
+            cumulative += count
+            bucket_labels = self._format_labels(values, f'le="{_format_value(bound)}"')
+            lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+
+        labels = self._format_labels(values)
+        lines.append(f'{self.name}_sum{labels} {_format_value(child.sum)}')
+        lines.append(f'{self.name}_count{labels} {child.count}')
+
+class CallbackMetric(Metric):
+    """
+    A metric whose values are read from a function when the metrics are exposed, for values owned by other objects or
+    threads that shouldn't be mirrored on every update.
+    """
+    def __init__(
+            self,
+            name: str,
+            help_: str,
+            type_: str,
+            function: Callable[[], dict[LabelValues, float]],
+            label_names: tuple[str, ...] = ()
+    ):
+        super().__init__(name, help_, label_names)
+
+        self.type = type_
+        self.function = function
+
+    def values(self) -> dict[LabelValues, float]:
+        return self.function()
+
+    def _create_child(self):
+        raise TypeError(f'{self.name} is read from a function and has no values to update')
+
+    def expose(self) -> list[str]:
+        sample_name = f'{self.name}_total' if self.type == 'counter' else self.name
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.type}']
+        for values, value in self.function().items():
+            lines.append(f'{sample_name}{self._format_labels(values)} {_format_value(value)}')
+
+        return lines
+
+class MetricsRegistry:
+    """
+    The app's metrics, exposed in the Prometheus text format.
+
+    Metrics are only ever updated and exposed from the GUI thread, so updating one is a plain attribute write with no
+    locking. Values owned by other threads are read through callback metrics when the metrics are exposed.
+    """
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def counter(self, name: str, help_: str, label_names: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help_, label_names))
+
+    def gauge(self, name: str, help_: str, label_names: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, help_, label_names))
+
+    def histogram(
+            self,
+            name: str,
+            help_: str,
+            label_names: tuple[str, ...] = (),
+            *,
+            buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help_, label_names, buckets=buckets))
+
+    def callback(
+            self,
+            name: str,
+            help_: str,
+            type_: str,
+            function: Callable[[], dict[LabelValues, float]],
+            label_names: tuple[str, ...] = ()
+    ) -> CallbackMetric:
+        return self._register(CallbackMetric(name, help_, type_, function, label_names))
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def expose(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.expose())
+
+        return '\n'.join(lines) + '\n'
+
+    def _register(self, metric):
+        # Registering a metric again replaces it, so objects created more than once can register their callbacks
+        self._metrics[metric.name] = metric
+
+        # Metrics without labels are exposed as zero until they are first updated
+        if not metric.label_names and not isinstance(metric, CallbackMetric):
+            metric.labels()
+
+        return metric
+
+def _format_value(value: float) -> str:
+    if value == inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+
+    return repr(float(value))
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+metrics = MetricsRegistry()
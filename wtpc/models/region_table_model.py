@@ -0,0 +1,160 @@
+from time import time
+from enum import IntEnum
+from wtpc import REGIONS
+from datetime import datetime
+from typing import Any, Optional
+from PySide6.QtGui import QColor
+from PySide6.QtCore import Qt, Slot, QObject, QModelIndex, QPersistentModelIndex, QAbstractTableModel
+
+UPDATE_INTERVAL = 20 * 60
+
+class RegionColumn(IntEnum):
+    Region = 0
+    Price = 1
+    Change = 2
+    LastUpdated = 3
+    NextUpdate = 4
+    Status = 5
+
+COLUMN_HEADERS = {
+    RegionColumn.Region: 'Region',
+    RegionColumn.Price: 'Price',
+    RegionColumn.Change: 'Change',
+    RegionColumn.LastUpdated: 'Last Updated',
+    RegionColumn.NextUpdate: 'Next Update',
+    RegionColumn.Status: 'Status',
+}
+
+class RegionRow:
+    def __init__(self, region: str):
+        self.region = region
+        self.price: Optional[int] = None
+        self.change = 0
+        self.last_updated: Optional[float] = None
+        self.error: Optional[str] = None
+        self.cells = [REGIONS.get(region, region), '...', '', '', '', '']
+
+    def next_update_text(self, now: float) -> str:
+        if self.last_updated is None:
+            return ''
+
+        remaining = int(self.last_updated + UPDATE_INTERVAL - now)
+        if remaining <= 0:
+            return 'Soon™'
+
+        return f'{remaining // 60:02}:{remaining % 60:02}'
+
+class RegionTableModel(QAbstractTableModel):
+    """
+    A table of the latest price of every tracked region.
+
+    Display strings are formatted once when a region updates and cached per cell, and updates only emit `dataChanged`
+    for the cells whose text actually changed, so views never need to reset or relayout.
+    """
+    def __init__(self, regions: list[str], *, parent: Optional[QObject] = None):
+        super().__init__(parent)
+
+        self._rows = [RegionRow(region) for region in regions]
+        self._row_indices = {row.region: i for i, row in enumerate(self._rows)}
+
+    #region Overrides
+    def rowCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(RegionColumn)
+
+    def data(self, index: QModelIndex | QPersistentModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+
+        row = self._rows[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return row.cells[column]
+        elif role == Qt.ItemDataRole.TextAlignmentRole:
+            if column == RegionColumn.Region or column == RegionColumn.Status:
+                return Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        elif role == Qt.ItemDataRole.ForegroundRole:
+            if column == RegionColumn.Change and row.change != 0:
+                return QColor('#5ad17a') if row.change > 0 else QColor('#ff6b6b')
+            elif column == RegionColumn.Status and row.error is not None:
+                return QColor('#ff6b6b')
+
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return COLUMN_HEADERS[RegionColumn(section)]
+
+        return None
+    #endregion
+
+    #region Slots
+    @Slot(str, int, int)
+    def update_price(self, region: str, price: int, last_updated: int):
+        row_index, row = self._get_row(region)
+
+        if row.price is not None and row.price != price:
+            row.change = price - row.price
+        row.price = price
+        row.last_updated = last_updated
+        row.error = None
+
+        self._set_cells(row_index, {
+            RegionColumn.Price: f'{price:,}',
+            RegionColumn.Change: f'{row.change:+,}' if row.change else '',
+            RegionColumn.LastUpdated: datetime.fromtimestamp(last_updated).strftime('%Y-%m-%d %H:%M:%S'),
+            RegionColumn.NextUpdate: row.next_update_text(time()),
+            RegionColumn.Status: 'OK',
+        })
+
+    @Slot(str, str)
+    def set_error(self, region: str, error_message: str):
+        row_index, row = self._get_row(region)
+        row.error = error_message
+
+        self._set_cells(row_index, {RegionColumn.Status: error_message})
+
+    @Slot()
+    def refresh_countdowns(self):
+        """
+        Updates the next update column, emitting a single `dataChanged` spanning only the rows that changed.
+        """
+        now = time()
+        first = last = -1
+        for i, row in enumerate(self._rows):
+            text = row.next_update_text(now)
+            if row.cells[RegionColumn.NextUpdate] != text:
+                row.cells[RegionColumn.NextUpdate] = text
+                if first < 0:
+                    first = i
+                last = i
+
+        if first >= 0:
+            self.dataChanged.emit(
+                self.index(first, RegionColumn.NextUpdate),
+                self.index(last, RegionColumn.NextUpdate),
+                [Qt.ItemDataRole.DisplayRole]
+            )
+    #endregion
+
+    def _get_row(self, region: str) -> tuple[int, RegionRow]:
+        row_index = self._row_indices.get(region)
+        if row_index is None:
+            row_index = len(self._rows)
+            self.beginInsertRows(QModelIndex(), row_index, row_index)
+            self._rows.append(RegionRow(region))
+            self._row_indices[region] = row_index
+            self.endInsertRows()
+
+        return row_index, self._rows[row_index]
+
+    def _set_cells(self, row_index: int, cells: dict[RegionColumn, str]):
+        row = self._rows[row_index]
+        for column, text in cells.items():
+            if row.cells[column] != text:
+                row.cells[column] = text
+                index = self.index(row_index, column)
+                self.dataChanged.emit(index, index)
@@ -0,0 +1,198 @@
+from pathlib import Path
+from time import monotonic
+from collections import deque
+from typing import Callable, Optional
+from wtpc.metrics import metrics
+from wtpc.event_log import event_log
+from threading import Thread, Condition
+from wtpc.notifier import NotificationPriority, show_notification
+
+COALESCE_WINDOW = 2.0
+MAX_PER_MINUTE = 6
+
+class PendingNotification:
+    __slots__ = ('title', 'message', 'image_path', 'priority', 'first_submitted_at', 'last_submitted_at')
+
+    def __init__(
+            self,
+            title: str,
+            message: Optional[str],
+            image_path: Optional[Path],
+            priority: NotificationPriority,
+            submitted_at: float,
+    ):
+        self.title = title
+        self.message = message
+        self.image_path = image_path
+        self.priority = priority
+        self.first_submitted_at = submitted_at
+        self.last_submitted_at = submitted_at
+
+class NotificationDispatcher:
+    """
+    Shows notifications from a background thread so slow notification backends never block the GUI thread.
+
+    Notifications are keyed (by region, for example). A notification is held for `coalesce_window` seconds after it is
+    first submitted and any notification submitted with the same key in the meantime replaces it, so only the latest
+    one is shown. At most `max_per_minute` notifications are shown per minute, with the rest waiting (and coalescing)
+    until the limit allows them.
+    """
+    submitted_count = 0
+    coalesced_count = 0
+    shown_count = 0
+    failed_count = 0
+    total_latency = 0.0
+    max_latency = 0.0
+
+    def __init__(
+            self,
+            show: Callable[..., Optional[str]] = show_notification,
+            *,
+            coalesce_window: float = COALESCE_WINDOW,
+            max_per_minute: int = MAX_PER_MINUTE,
+    ):
+        self.show = show
+        self.coalesce_window = coalesce_window
+        self.max_per_minute = max_per_minute
+
+        self._pending: dict[str, PendingNotification] = {}
+        self._shown_times: deque[float] = deque()
+        self._condition = Condition()
+        self._thread: Optional[Thread] = None
+        self._is_stopping = False
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    @property
+    def average_latency(self) -> float:
+        """
+        The average time in seconds between a notification first being submitted and it being shown.
+        """
+        return self.total_latency / self.shown_count if self.shown_count else 0.0
+
+    def submit(
+            self,
+            key: str,
+            title: str,
+            *,
+            message: Optional[str] = None,
+            image_path: Optional[Path] = None,
+            priority: NotificationPriority = NotificationPriority.Default,
+    ) -> None:
+        now = monotonic()
+        with self._condition:
+            self.submitted_count += 1
+
+            pending = self._pending.get(key)
+            if pending is None:
+                self._pending[key] = PendingNotification(title, message, image_path, priority, now)
+            else:
+                self.coalesced_count += 1
+                pending.title = title
+                pending.message = message
+                pending.image_path = image_path
+                pending.priority = max(pending.priority, priority)
+                pending.last_submitted_at = now
+
+            if self._thread is None:
+                self._is_stopping = False
+                self._thread = Thread(target=self._run, name='wtpc-notifications', daemon=True)
+                self._thread.start()
+
+            self._condition.notify()
+
+    def stop(self, timeout: Optional[float] = 1.0) -> None:
+        """
+        Stops the background thread, discarding any notifications that haven't been shown yet.
+        """
+        with self._condition:
+            thread = self._thread
+            self._is_stopping = True
+            self._pending.clear()
+            self._condition.notify()
+
+        if thread is not None:
+            thread.join(timeout)
+
+        with self._condition:
+            self._thread = None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                key, pending = self._wait_for_next()
+                if pending is None:
+                    return
+
+                del self._pending[key]
+
+            try:
+                self.show(
+                    pending.title,
+                    message=pending.message,
+                    image_path=pending.image_path,
+                    priority=pending.priority
+                )
+            except Exception as e:
+                event_log.error('notification_failed', title=pending.title, error=repr(e))
+                with self._condition:
+                    self.failed_count += 1
+                continue
+
+            shown_at = monotonic()
+            latency = shown_at - pending.first_submitted_at
+            with self._condition:
+                self._shown_times.append(shown_at)
+                self.shown_count += 1
+                self.total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+
+    def _wait_for_next(self) -> tuple[Optional[str], Optional[PendingNotification]]:
+        """
+        Blocks until a pending notification is due and the rate limit allows showing it. Must be called while holding
+        the condition.
+        """
+        while not self._is_stopping:
+            if not self._pending:
+                self._condition.wait()
+                continue
+
+            now = monotonic()
+            while self._shown_times and self._shown_times[0] <= now - 60:
+                self._shown_times.popleft()
+
+            # Keys keep their position when coalesced, so the first key is always the longest waiting
+            key = next(iter(self._pending))
+            due_at = self._pending[key].first_submitted_at + self.coalesce_window
+            if len(self._shown_times) >= self.max_per_minute:
+                due_at = max(due_at, self._shown_times[0] + 60)
+
+            if due_at <= now:
+                return key, self._pending[key]
+
+            self._condition.wait(due_at - now)
+
+        return None, None
+
+notification_dispatcher = NotificationDispatcher()
+
+metrics.callback(
+    'wtpc_notifications',
+    'Notifications by outcome',
+    'counter',
+    lambda: {
+        ('submitted',): notification_dispatcher.submitted_count,
+        ('coalesced',): notification_dispatcher.coalesced_count,
+        ('shown',): notification_dispatcher.shown_count,
+        ('failed',): notification_dispatcher.failed_count,
+    },
+    ('outcome',)
+)
+metrics.callback(
+    'wtpc_notification_queue_depth',
+    'Notifications waiting to be shown',
+    'gauge',
+    lambda: {(): notification_dispatcher.queue_depth}
+)
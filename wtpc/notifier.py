@@ -1,67 +1,231 @@
+import sys
+from os import environ
 from uuid import uuid1
+from json import dumps
 from pathlib import Path
+from enum import IntEnum
 from typing import Optional
-from winrt.windows.data.xml.dom import XmlDocument
-from xml.etree.ElementTree import Element, tostring, SubElement
-from wtpc import APP_NAME, APP_USER_MODEL_ID, NOTIFICATION_ICON_PATH
-from winreg import REG_SZ, OpenKey, SetValueEx, CreateKeyEx, QueryValueEx, HKEY_CURRENT_USER
-from winrt.windows.ui.notifications import ToastNotification, ToastNotificationManager, ToastNotificationPriority
+from datetime import datetime
+from abc import ABC, abstractmethod
+from wtpc.toast_templates import ToastTemplate, get_toast_template
+from wtpc import APP_NAME, APP_USER_MODEL_ID, NOTIFICATION_LOG_PATH, NOTIFICATION_ICON_PATH
+
+try:
+    from winrt.windows.data.xml.dom import XmlDocument
+    from winreg import REG_SZ, OpenKey, SetValueEx, CreateKeyEx, QueryValueEx, HKEY_CURRENT_USER
+    from winrt.windows.ui.notifications import (
+        NotificationData,
+        ToastNotification,
+        ToastNotificationManager,
+        ToastNotificationPriority
+    )
+    IS_WINRT_AVAILABLE = True
+except ImportError:
+    IS_WINRT_AVAILABLE = False
 
 KEY_PATH = f'SOFTWARE\\Classes\\AppUserModelId\\{APP_USER_MODEL_ID}'
 
-def is_aumid_installed() -> bool:
-    try:
-        with OpenKey(HKEY_CURRENT_USER, KEY_PATH) as key_handle:
-            QueryValueEx(key_handle, 'DisplayName')
-            return True
-    except:
-        return False
+class NotificationPriority(IntEnum):
+    Default = 0
+    High = 1
 
-def install_aumid() -> None:
-    with CreateKeyEx(HKEY_CURRENT_USER, KEY_PATH) as key_handle:
-        SetValueEx(key_handle, 'DisplayName', 0, REG_SZ, APP_NAME)
-        SetValueEx(key_handle, 'IconBackgroundColor', 0, REG_SZ, '00C0FFFF')
-        SetValueEx(key_handle, 'IconUri', 0, REG_SZ, str(NOTIFICATION_ICON_PATH))
+class NotifierBackend(ABC):
+    """
+    A destination for the app's notifications.
+    """
+    @abstractmethod
+    def is_installed(self) -> bool:
+        """
+        Returns whether the backend is ready to show notifications.
+        """
 
-def show_notification(
-        title: str,
-        *,
-        message: Optional[str] = None,
-        image_path: Optional[Path] = None,
-        priority: ToastNotificationPriority = ToastNotificationPriority.DEFAULT,
-) -> Optional[str]:
-    if not is_aumid_installed():
-        return None
+    @abstractmethod
+    def install(self) -> None:
+        """
+        Performs any one-time setup needed before notifications can be shown.
+        """
+
+    @abstractmethod
+    def show(
+            self,
+            title: str,
+            *,
+            message: Optional[str] = None,
+            image_path: Optional[Path] = None,
+            priority: NotificationPriority = NotificationPriority.Default,
+    ) -> Optional[str]:
+        """
+        Shows a notification, returning its ID or `None` if it couldn't be shown.
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Removes the notifications shown by the app.
+        """
+
+class WinRTNotifierBackend(NotifierBackend):
+    """
+    Shows Windows toast notifications.
+
+    The notification manager, the toast notifier and the result of the registry lookup for the app's AUMID are created
+    once and reused for every notification. Each toast layout is parsed into an `XmlDocument` once and shared, with the
+    text of every toast supplied through data binding.
+    """
+    def __init__(self):
+        self._manager = None
+        self._notifier = None
+        self._is_installed: Optional[bool] = None
+        self._documents: dict[ToastTemplate, XmlDocument] = {}
+
+    def is_installed(self) -> bool:
+        if self._is_installed is None:
+            try:
+                with OpenKey(HKEY_CURRENT_USER, KEY_PATH) as key_handle:
+                    QueryValueEx(key_handle, 'DisplayName')
+                    self._is_installed = True
+            except OSError:
+                self._is_installed = False
+
+        return self._is_installed
+
+    def install(self) -> None:
+        with CreateKeyEx(HKEY_CURRENT_USER, KEY_PATH) as key_handle:
+            SetValueEx(key_handle, 'DisplayName', 0, REG_SZ, APP_NAME)
+            SetValueEx(key_handle, 'IconBackgroundColor', 0, REG_SZ, '00C0FFFF')
+            SetValueEx(key_handle, 'IconUri', 0, REG_SZ, str(NOTIFICATION_ICON_PATH))
+
+        self._is_installed = True
+
+    def show(
+            self,
+            title: str,
+            *,
+            message: Optional[str] = None,
+            image_path: Optional[Path] = None,
+            priority: NotificationPriority = NotificationPriority.Default,
+    ) -> Optional[str]:
+        if not self.is_installed():
+            return None
+
+        if image_path is not None and not image_path.exists():
+            image_path = None
+
+        template = get_toast_template(has_message=message is not None, image_path=image_path)
+
+        data = NotificationData()
+        data.values.insert('title', title)
+        if message is not None:
+            data.values.insert('message', message)
+
+        id_ = f'wtpc-toast-{uuid1()}'
+        toast = ToastNotification(self._get_document(template))
+        toast.data = data
+        toast.tag = id_
+        toast.priority = ToastNotificationPriority.HIGH \
+            if priority == NotificationPriority.High \
+            else ToastNotificationPriority.DEFAULT
+
+        self._get_notifier().show(toast)
 
-    manager = ToastNotificationManager.get_default()
-    notifier = manager.create_toast_notifier(APP_USER_MODEL_ID)
+        return id_
 
-    toast_xml = Element('toast', {'launch': 'default'})
-    visual_xml = SubElement(toast_xml, 'visual')
-    binding_xml = SubElement(visual_xml, 'binding', {'template': 'ToastGeneric'})
+    def clear(self) -> None:
+        self._get_manager().history.clear(APP_USER_MODEL_ID)
 
-    title_xml = SubElement(binding_xml, 'text')
-    title_xml.text = title
+    def _get_document(self, template: ToastTemplate) -> 'XmlDocument':
+        doc = self._documents.get(template)
+        if doc is None:
+            doc = XmlDocument()
+            doc.load_xml(template.binding_xml)
+            self._documents[template] = doc
 
-    if message is not None:
-        message_xml = SubElement(binding_xml, 'text')
-        message_xml.text = message
+        return doc
 
-    if image_path is not None and image_path.exists():
-        SubElement(binding_xml, 'image', {'placement': 'hero', 'src': str(image_path)})
+    def _get_manager(self):
+        if self._manager is None:
+            self._manager = ToastNotificationManager.get_default()
 
-    doc = XmlDocument()
-    doc.load_xml(tostring(toast_xml, encoding='unicode'))
+        return self._manager
 
-    id_ = f'wtpc-toast-{uuid1()}'
-    toast = ToastNotification(doc)
-    toast.tag = id_
-    toast.priority = priority
+    def _get_notifier(self):
+        if self._notifier is None:
+            self._notifier = self._get_manager().create_toast_notifier(APP_USER_MODEL_ID)
 
-    notifier.show(toast)
+        return self._notifier
 
-    return id_
+class FileNotifierBackend(NotifierBackend):
+    """
+    A stand-in for platforms without toast notifications that appends each notification to a JSON Lines file.
+
+    It also keeps a count of the notifications it has shown, so headless runs, tests and benchmarks can exercise the
+    notification path.
+    """
+    shown_count = 0
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def is_installed(self) -> bool:
+        return True
+
+    def install(self) -> None:
+        pass
+
+    def show(
+            self,
+            title: str,
+            *,
+            message: Optional[str] = None,
+            image_path: Optional[Path] = None,
+            priority: NotificationPriority = NotificationPriority.Default,
+    ) -> Optional[str]:
+        id_ = f'wtpc-toast-{uuid1()}'
+        template = get_toast_template(has_message=message is not None, image_path=image_path)
+        record = {
+            'id': id_,
+            'time': datetime.now().isoformat(),
+            'priority': priority.name,
+            'xml': template.render(title, message),
+        }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open('a', encoding='utf-8') as f:
+            f.write(dumps(record) + '\n')
+
+        self.shown_count += 1
+
+        return id_
+
+    def clear(self) -> None:
+        pass
+
+def create_notifier_backend() -> NotifierBackend:
+    """
+    Creates the WinRT backend on Windows and the file backend everywhere else. Setting the `WTPC_NOTIFIER` environment
+    variable to `file` forces the file backend.
+    """
+    if environ.get('WTPC_NOTIFIER') != 'file' and sys.platform == 'win32' and IS_WINRT_AVAILABLE:
+        return WinRTNotifierBackend()
+
+    return FileNotifierBackend(NOTIFICATION_LOG_PATH)
+
+notifier_backend = create_notifier_backend()
+
+def is_aumid_installed() -> bool:
+    return notifier_backend.is_installed()
+
+def install_aumid() -> None:
+    notifier_backend.install()
+
+def show_notification(
+        title: str,
+        *,
+        message: Optional[str] = None,
+        image_path: Optional[Path] = None,
+        priority: NotificationPriority = NotificationPriority.Default,
+) -> Optional[str]:
+    return notifier_backend.show(title, message=message, image_path=image_path, priority=priority)
 
 def clear_notifications() -> None:
-    manager = ToastNotificationManager.get_default()
-    manager.history.clear(APP_USER_MODEL_ID)
+    notifier_backend.clear()
@@ -0,0 +1,58 @@
+from wtpc.metrics import metrics
+from PySide6.QtGui import QPixmap, QPixmapCache
+
+CACHE_LIMIT_KB = 16 * 1024
+
+class PixmapCache:
+    """
+    An app-wide cache of decoded images keyed by their resource path.
+
+    Pixmaps are stored in `QPixmapCache`, so every widget asking for the same image receives an implicitly shared
+    copy of the same pixel data and each image is only decoded once for as long as it stays within the byte budget.
+    """
+    hits = 0
+    misses = 0
+
+    def __init__(self, limit_kb: int = CACHE_LIMIT_KB):
+        self.limit_kb = limit_kb
+        self._limit_applied = False
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+
+        return self.hits / lookups
+
+    def get(self, path: str) -> QPixmap:
+        if not self._limit_applied:
+            # QPixmapCache needs a QGuiApplication, so the limit can't be applied at import time.
+            QPixmapCache.setCacheLimit(max(QPixmapCache.cacheLimit(), self.limit_kb))
+            self._limit_applied = True
+
+        pixmap = QPixmap()
+        if QPixmapCache.find(path, pixmap):
+            self.hits += 1
+            return pixmap
+
+        self.misses += 1
+
+        pixmap = QPixmap(path)
+        if not pixmap.isNull():
+            QPixmapCache.insert(path, pixmap)
+
+        return pixmap
+
+    def clear(self) -> None:
+        QPixmapCache.clear()
+
+pixmap_cache = PixmapCache()
+
+metrics.callback(
+    'wtpc_pixmap_cache_lookups',
+    'Pixmap cache lookups by result',
+    'counter',
+    lambda: {('hit',): pixmap_cache.hits, ('miss',): pixmap_cache.misses},
+    ('result',)
+)
@@ -0,0 +1,68 @@
+from typing import Callable
+from wtpc.event_log import event_log
+from PySide6.QtCore import Slot, QObject
+from wtpc.price_history import price_history
+from wtpc import REGIONS, NOTIFICATION_HERO_PATH
+from wtpc.price_check_worker import PriceCheckWorker
+from wtpc.settings import user_settings, UserSettingsKeys
+from wtpc.alert_rules import DEFAULT_ALERT_RULES, AlertRule, AlertEngine, parse_rule
+from wtpc.notification_dispatcher import notification_dispatcher
+
+class PriceAlerter(QObject):
+    """
+    Evaluates the alert rules from the settings against every new sample of each tracked region and sends a toast
+    notification when any of them fire, whether or not a window is open.
+
+    Rules are warmed up from the stored price history the first time a region is seen, and alerts from that first
+    sample are suppressed so launching the app doesn't notify. Notifications are handed to the notification
+    dispatcher, so showing them never blocks the GUI thread.
+    """
+    def __init__(self, worker: PriceCheckWorker):
+        super().__init__(worker)
+
+        self.worker = worker
+        self.worker.region_price_updated.connect(self._on_region_price_updated)
+
+        self._rule_specs: list[str] = []
+        self._engine = AlertEngine([])
+
+    #region Signal Handlers
+    @Slot(str, int, int)
+    def _on_region_price_updated(self, region: str, price: int, last_updated: int):
+        # Regions fetched on demand, such as by the proxy, aren't tracked
+        if region not in self.worker.get_regions():
+            return
+
+        rule_specs = user_settings.value(UserSettingsKeys.ALERT_RULES, DEFAULT_ALERT_RULES, list)
+        if rule_specs != self._rule_specs:
+            self._rule_specs = rule_specs
+            self._engine = AlertEngine(self._parse_rules(rule_specs))
+
+        is_first_sample = not self._engine.has_seen(region)
+        if is_first_sample:
+            self._engine.warm_up(region, price_history.series(region), last_updated)
+
+        messages = self._engine.evaluate(region, last_updated, price)
+        should_notify = user_settings.value(UserSettingsKeys.SEND_NOTIFICATIONS, False, bool)
+
+        if should_notify and messages and not is_first_sample:
+            self._send_notification(region, messages)
+    #endregion
+
+    def _parse_rules(self, rule_specs: list[str]) -> list[Callable[[], AlertRule]]:
+        rule_factories = []
+        for spec in rule_specs:
+            try:
+                rule_factories.append(parse_rule(spec))
+            except ValueError as e:
+                event_log.warning('invalid_alert_rule', rule=spec, error=str(e))
+
+        return rule_factories
+
+    def _send_notification(self, region: str, messages: list[str]) -> None:
+        notification_dispatcher.submit(
+            region,
+            messages[0],
+            message='\n'.join([REGIONS.get(region, region)] + messages[1:]),
+            image_path=NOTIFICATION_HERO_PATH
+        )
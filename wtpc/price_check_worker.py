@@ -1,107 +1,327 @@
+from time import time
+from wtpc import API_HOSTS
+from pathlib import Path
 from base64 import b64encode
+from wtpc.metrics import metrics
+from wtpc.event_log import event_log
 from typing import cast, Optional
 from datetime import datetime, timedelta
-from PySide6.QtNetwork import QNetworkReply, QNetworkRequest, QNetworkAccessManager
+from wtpc.clock import Clock, system_clock
+from wtpc.recording import RecordingTransport
+from wtpc.price_history import price_history, PriceHistory
+from wtpc.transport import Request, Response, Transport, QtTransport
 from wtpc.settings import app_settings, user_settings, AppSettingsKeys, UserSettingsKeys
-from PySide6.QtCore import Slot, QUrl, Signal, QTimer, QObject, QByteArray, QJsonDocument
+from PySide6.QtCore import Slot, QUrl, Signal, QObject, QSettings, QByteArray, QJsonDocument
 
-OAUTH_URL = QUrl('https://oauth.battle.net/token')
+OAUTH_URL = 'https://oauth.battle.net/token'
 
 TIMER_INTERVAL = 2_000
 
+BACKOFF_BASE = 4.0
+BACKOFF_MAX = 5 * 60.0
+RETRY_AFTER_MAX = 60 * 60.0
+
+request_counter = metrics.counter(
+    'wtpc_upstream_requests',
+    'Requests sent to Battle.net by endpoint and response status',
+    ('endpoint', 'status')
+)
+oauth_refresh_counter = metrics.counter('wtpc_oauth_refreshes', 'Access token refreshes requested')
+poll_latency_histogram = metrics.histogram(
+    'wtpc_poll_cycle_seconds',
+    'Time from sending the price requests of a poll cycle to receiving the last response'
+)
+price_gauge = metrics.gauge('wtpc_token_price_gold', 'The latest WoW Token price in gold by region', ('region',))
+last_update_gauge = metrics.gauge(
+    'wtpc_last_update_timestamp_seconds',
+    'Unix time of the last successful price update'
+)
+consecutive_failures_gauge = metrics.gauge('wtpc_consecutive_failures', 'Failed requests since the last success')
+backoff_gauge = metrics.gauge('wtpc_backoff_seconds', 'The delay before polling is retried after failures')
+transferred_bytes_counter = metrics.counter(
+    'wtpc_upstream_bytes',
+    'Bytes of request and response bodies exchanged with Battle.net by direction',
+    ('direction',)
+)
+
+def _get_seconds_since_last_update() -> dict[tuple[str, ...], float]:
+    last_update = last_update_gauge.labels().value
+    return {(): time() - last_update} if last_update else {}
+
+metrics.callback(
+    'wtpc_seconds_since_last_update',
+    'Seconds since the last successful price update',
+    'gauge',
+    _get_seconds_since_last_update
+)
+
 class PriceCheckWorker(QObject):
     error = Signal(str)
     price_updated = Signal(int, int)
+    region_error = Signal(str, str)
+    region_price_updated = Signal(str, int, int)
+
+    _is_refreshing_token = False
+    _is_token_rejected = False
+
+    latest_price: Optional[tuple[int, int]] = None
+    """The price and last updated timestamp most recently emitted through `price_updated`."""
 
-    def __init__(self):
+    consecutive_failures = 0
+    backoff_until = 0.0
+
+    _poll_started_at = 0.0
+
+    def __init__(
+            self,
+            *,
+            base_url: Optional[str] = None,
+            clock: Clock = system_clock,
+            transport: Optional[Transport] = None,
+            history: PriceHistory = price_history,
+            settings: tuple[QSettings, QSettings] = (app_settings, user_settings),
+            capture: Optional[Path] = None
+    ):
+        """
+        `base_url` replaces the regional Battle.net API hosts, for example with the address of another instance running
+        in proxy mode. Requests to it are sent without an access token.
+
+        The remaining arguments replace the real time, network, price history and app and user settings, which lets
+        simulations run the worker against a fake API in simulated time without touching the user's data.
+
+        With `capture`, every request and response is also recorded to that path for `ReplayTransport` to replay.
+        """
         super().__init__()
 
-        self.network_manager = QNetworkAccessManager()
-        self.network_manager.finished.connect(self._on_network_manager_finished)
+        self.base_url = base_url
+        self.clock = clock
+        self.history = history
+        self.app_settings, self.user_settings = settings
+
+        self._queued_regions: set[str] = set()
+        self._pending_regions: set[str] = set()
 
-        self.timer = QTimer()
+        self.transport = transport if transport is not None else QtTransport(self)
+        if capture is not None:
+            self.transport = RecordingTransport(self.transport, capture, self.clock, self)
+        self.transport.finished.connect(self._on_transport_finished)
+
+        self.timer = self.clock.create_timer()
         self.timer.setInterval(TIMER_INTERVAL)
         self.timer.setSingleShot(False)
         self.timer.timeout.connect(self._on_timer_timeout)
         self.timer.start()
 
     #region Signal Handlers
-    @Slot(QNetworkReply)
-    def _on_network_manager_finished(self, reply: QNetworkReply):
-        reply.deleteLater()
+    @Slot(object)
+    def _on_transport_finished(self, response: Response):
+        url = response.request.url
+        region = response.request.headers.get('Battlenet-Namespace', '')
+        # There's no status at all when the connection failed or the response couldn't be parsed
+        status_code = response.status
+        status_label = str(status_code) if status_code is not None else 'none'
+        is_oauth = url == OAUTH_URL
+
+        transferred_bytes_counter.labels('sent').inc(len(response.request.body))
+        transferred_bytes_counter.labels('received').inc(len(response.body))
+
+        if is_oauth:
+            self._is_refreshing_token = False
+            request_counter.labels('oauth', status_label).inc()
+        else:
+            request_counter.labels('token', status_label).inc()
+            self._on_region_reply(region)
 
-        url = reply.url()
-        status_code = int(reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute))
         if status_code == 200:
-            json = QJsonDocument.fromJson(reply.readAll()).object()
-            if url == OAUTH_URL:
-                access_token = cast(str, json['access_token'])
-                expires_in = cast(int, json['expires_in'])
+            json = QJsonDocument.fromJson(QByteArray(response.body)).object()
+            try:
+                if is_oauth:
+                    access_token = str(json['access_token'])
+                    expires_in = int(json['expires_in'])
+                else:
+                    last_updated_timestamp = int(json['last_updated_timestamp']) / 1000
+                    price = int(json['price']) // 10_000
+            except (KeyError, TypeError, ValueError):
+                self._on_request_failed(region, f'Invalid response from {url}', response)
+                return
 
-                app_settings.setValue(AppSettingsKeys.ACCESS_TOKEN, access_token)
-                app_settings.setValue(AppSettingsKeys.ACCESS_TOKEN_EXPIRES, datetime.now() + timedelta(seconds=expires_in))
+            if is_oauth:
+                self.app_settings.setValue(AppSettingsKeys.ACCESS_TOKEN, access_token)
+                self.app_settings.setValue(
+                    AppSettingsKeys.ACCESS_TOKEN_EXPIRES,
+                    self.clock.now() + timedelta(seconds=expires_in)
+                )
+                event_log.info('access_token_received', expires_in=expires_in)
 
                 self.check_price()
             else:
-                last_updated_timestamp = cast(int, json['last_updated_timestamp']) / 1000
-                price = cast(int, json['price']) // 10_000
+                if self.history.append(region, last_updated_timestamp, price):
+                    event_log.info('price_updated', region=region, price=price, last_updated=last_updated_timestamp)
+
+                price_gauge.labels(region).set(price)
+                last_update_gauge.set(self.clock.time())
+                self._is_token_rejected = False
 
-                self.price_updated.emit(price, last_updated_timestamp)
-        elif status_code == 401:
+                self.region_price_updated.emit(region, price, last_updated_timestamp)
+                if region == self._get_primary_region():
+                    self._reset_backoff()
+                    self.latest_price = (price, last_updated_timestamp)
+                    self.price_updated.emit(price, last_updated_timestamp)
+        elif status_code == 401 and not is_oauth and self.base_url is None and not self._is_token_rejected:
+            # Get a new token right away, but until a price is received again, further rejections are failures
+            self._is_token_rejected = True
+            event_log.warning('access_token_rejected', region=region)
             self._get_access_token()
         else:
-            print(status_code)
-            self.error.emit(reply.errorString())
+            if status_code == 401 and not is_oauth and self.base_url is None:
+                # Drop the token so the next poll after the backoff gets a new one
+                self.app_settings.remove(AppSettingsKeys.ACCESS_TOKEN)
+
+            self._on_request_failed(region, response.error or f'HTTP {status_label} from {url}', response)
 
     @Slot()
     def _on_timer_timeout(self):
+        if self.clock.monotonic() < self.backoff_until:
+            return
+
         self.check_price()
     #endregion
 
     def check_price(self):
-        now = datetime.now()
-        access_token = cast(Optional[str], app_settings.value(AppSettingsKeys.ACCESS_TOKEN, None))
-        access_token_expires = cast(Optional[datetime], app_settings.value(AppSettingsKeys.ACCESS_TOKEN_EXPIRES, None))
-        is_token_expired = access_token_expires is None or access_token_expires < now
+        if self._needs_access_token():
+            self._get_access_token()
+        else:
+            regions = self.get_regions()
+            self._poll_started_at = self.clock.monotonic()
+            self._pending_regions = set(regions)
+            for region in regions:
+                self._get_token_price(region)
 
-        if access_token is None or is_token_expired:
+            for region in self._queued_regions.difference(regions):
+                self._get_token_price(region)
+            self._queued_regions.clear()
+
+    def check_region(self, region: str):
+        """
+        Requests the price of a single region outside the regular polling, such as a region that isn't tracked. The
+        result is emitted through `region_price_updated` or `region_error`.
+        """
+        if self._needs_access_token():
+            self._queued_regions.add(region)
             self._get_access_token()
         else:
-            self._get_token_price()
+            self._get_token_price(region)
+
+    def get_regions(self) -> list[str]:
+        """
+        Returns the regions to poll, starting with the region selected in the settings.
+        """
+        primary_region = self._get_primary_region()
+        tracked_regions = cast(list[str], self.user_settings.value(UserSettingsKeys.TRACKED_REGIONS, [], list))
+
+        return [primary_region] + [r for r in tracked_regions if r != primary_region]
+
+    def _get_primary_region(self) -> str:
+        return self.user_settings.value(UserSettingsKeys.REGION, 'dynamic-us')
+
+    def _needs_access_token(self) -> bool:
+        if self.base_url is not None:
+            return False
+
+        now = self.clock.now()
+        access_token = cast(Optional[str], self.app_settings.value(AppSettingsKeys.ACCESS_TOKEN, None))
+        access_token_expires = cast(
+            Optional[datetime],
+            self.app_settings.value(AppSettingsKeys.ACCESS_TOKEN_EXPIRES, None)
+        )
+        is_token_expired = access_token_expires is None or access_token_expires < now
+
+        return access_token is None or is_token_expired
+
+    def _on_region_reply(self, region: str):
+        pending_regions = self._pending_regions
+        if region not in pending_regions:
+            return
+
+        pending_regions.discard(region)
+        if not pending_regions:
+            poll_latency_histogram.observe(self.clock.monotonic() - self._poll_started_at)
+
+    def _on_request_failed(self, region: str, error_message: str, response: Response):
+        # Only the primary region and token requests back off polling, so a failing tracked region or a one-off lookup
+        # doesn't hold up the price the app shows
+        is_primary = not region or region == self._get_primary_region()
+        delay = self._back_off(self._get_retry_after(response)) if is_primary else None
+        event_log.warning(
+            'request_failed',
+            region=region,
+            url=response.request.url,
+            status=response.status,
+            error=error_message,
+            consecutive_failures=self.consecutive_failures,
+            backoff=delay
+        )
+        if region:
+            self.region_error.emit(region, error_message)
+        if is_primary:
+            self.error.emit(error_message)
+
+    def _get_retry_after(self, response: Response) -> float:
+        retry_after = response.headers.get('retry-after', '').strip()
+        if response.status in (429, 503) and retry_after.isdigit():
+            return min(float(retry_after), RETRY_AFTER_MAX)
+
+        return 0.0
+
+    def _reset_backoff(self):
+        if self.consecutive_failures:
+            self.consecutive_failures = 0
+            self.backoff_until = 0.0
+            consecutive_failures_gauge.set(0)
+            backoff_gauge.set(0)
+
+    def _back_off(self, retry_after: float = 0.0) -> float:
+        """
+        Delays the next poll exponentially with every consecutive failure, up to `BACKOFF_MAX` seconds, or for as long
+        as the server asked with `Retry-After` if that's longer. Returns the delay in seconds.
+        """
+        self.consecutive_failures += 1
+        delay = max(min(BACKOFF_BASE * 2 ** min(self.consecutive_failures - 1, 16), BACKOFF_MAX), retry_after)
+        self.backoff_until = self.clock.monotonic() + delay
+
+        consecutive_failures_gauge.set(self.consecutive_failures)
+        backoff_gauge.set(delay)
+
+        return delay
 
     def _get_access_token(self):
-        client_id = user_settings.value(UserSettingsKeys.CLIENT_ID)
-        client_secret = user_settings.value(UserSettingsKeys.CLIENT_SECRET)
-        auth = b64encode(bytes(f'{client_id}:{client_secret}'.encode('utf-8'))).decode('utf-8')
+        if self._is_refreshing_token:
+            return
 
-        req = QNetworkRequest(OAUTH_URL)
-        req.setHeader(QNetworkRequest.KnownHeaders.ContentTypeHeader, 'application/x-www-form-urlencoded')
-        req.setRawHeader(b'Authorization', f'Basic {auth}'.encode('utf-8'))
+        self._is_refreshing_token = True
+        oauth_refresh_counter.inc()
 
-        form = QByteArray()
-        form.append(b'grant_type=client_credentials')
+        client_id = self.user_settings.value(UserSettingsKeys.CLIENT_ID)
+        client_secret = self.user_settings.value(UserSettingsKeys.CLIENT_SECRET)
+        auth = b64encode(bytes(f'{client_id}:{client_secret}'.encode('utf-8'))).decode('utf-8')
 
-        self.network_manager.post(req, form)
+        self.transport.send(Request('POST', OAUTH_URL, {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'Authorization': f'Basic {auth}',
+        }, b'grant_type=client_credentials'))
 
-    def _get_token_price(self):
-        access_token = app_settings.value(AppSettingsKeys.ACCESS_TOKEN, None)
-        region = user_settings.value(UserSettingsKeys.REGION, None)
+    def _get_token_price(self, region: str):
+        access_token = self.app_settings.value(AppSettingsKeys.ACCESS_TOKEN, None)
 
-        host: QUrl
-        match region:
-            case 'dynamic-eu':
-                host = QUrl('https://eu.api.blizzard.com')
-            case 'dynamic-kr':
-                host = QUrl('https://kr.api.blizzard.com')
-            case 'dynamic-tw':
-                host = QUrl('https://tw.api.blizzard.com')
-            case _:
-                host = QUrl('https://us.api.blizzard.com')
+        if self.base_url is not None:
+            host = QUrl(self.base_url)
+        else:
+            host = QUrl(f'https://{API_HOSTS.get(region, API_HOSTS["dynamic-us"])}')
 
-        host.setPath('/data/wow/token/index')
+        host.setPath(host.path().rstrip('/') + '/data/wow/token/index')
 
-        req = QNetworkRequest(host)
-        req.setRawHeader(b'Battlenet-Namespace', f'{region}'.encode('utf-8'))
-        req.setRawHeader(b'Authorization', f'Bearer {access_token}'.encode('utf-8'))
+        headers = {'Battlenet-Namespace': region}
+        if self.base_url is None:
+            headers['Authorization'] = f'Bearer {access_token}'
 
-        self.network_manager.get(req)
+        self.transport.send(Request('GET', host.toString(), headers))
@@ -0,0 +1,103 @@
+from array import array
+from pathlib import Path
+from wtpc import PRICE_HISTORY_FILE_PATH
+from PySide6.QtCore import Signal, QObject
+from bisect import bisect_left, bisect_right
+
+class PriceSeries:
+    """
+    The samples of a single region, kept as parallel sequences sorted by timestamp.
+
+    Prices are kept in a list rather than an array so that scanning a slice of them doesn't box every element.
+    """
+    def __init__(self):
+        self.timestamps = array('d')
+        self.prices: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def last_timestamp(self) -> float:
+        return self.timestamps[-1] if self.timestamps else float('-inf')
+
+    def index_range(self, start: float, end: float) -> tuple[int, int]:
+        """
+        Returns the `[first, last)` indices of the samples whose timestamps fall within `start` and `end` inclusive.
+        """
+        return bisect_left(self.timestamps, start), bisect_right(self.timestamps, end)
+
+class PriceHistory(QObject):
+    """
+    Stores every distinct price sample per region and appends new ones to a CSV file in the data directory.
+    """
+    sample_added = Signal(str, float, int)
+
+    def __init__(self, path: Path):
+        super().__init__()
+
+        self.path = path
+
+        self._series: dict[str, PriceSeries] = {}
+        self._loaded = False
+
+    def regions(self) -> list[str]:
+        self._load()
+
+        return sorted(self._series)
+
+    def series(self, region: str) -> PriceSeries:
+        """
+        Returns the samples of a region. A region without samples gets an empty series that isn't kept, so looking up
+        regions doesn't add them to `regions`.
+        """
+        self._load()
+
+        series = self._series.get(region)
+        return series if series is not None else PriceSeries()
+
+    def append(self, region: str, timestamp: float, price: int) -> bool:
+        """
+        Records a sample, returning `False` if it isn't newer than the last recorded sample for the region.
+        """
+        self._load()
+
+        series = self._series.setdefault(region, PriceSeries())
+        if timestamp <= series.last_timestamp:
+            return False
+
+        series.timestamps.append(timestamp)
+        series.prices.append(price)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open('a', encoding='utf-8') as f:
+            f.write(f'{region},{timestamp},{price}\n')
+
+        self.sample_added.emit(region, timestamp, price)
+
+        return True
+
+    def _load(self):
+        if self._loaded:
+            return
+
+        self._loaded = True
+
+        if not self.path.exists():
+            return
+
+        with self.path.open('r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    region, timestamp, price = line.rstrip('\n').split(',')
+                    timestamp = float(timestamp)
+                    price = int(price)
+                except ValueError:
+                    continue
+
+                series = self._series.setdefault(region, PriceSeries())
+                if timestamp > series.last_timestamp:
+                    series.timestamps.append(timestamp)
+                    series.prices.append(price)
+
+price_history = PriceHistory(PRICE_HISTORY_FILE_PATH)
@@ -0,0 +1,227 @@
+import gzip
+from pathlib import Path
+from json import dumps, loads
+from collections import Counter, deque
+from typing import Any, Optional, TextIO
+from base64 import b64decode, b64encode
+from wtpc.clock import Clock
+from PySide6.QtCore import Slot, QUrl, QObject
+from wtpc.transport import Request, Response, Transport
+
+REDACTED = 'redacted'
+FLUSH_INTERVAL = 60.0
+
+# Credentials are never written to a recording
+REDACTED_HEADERS = ('authorization',)
+REDACTED_FIELDS = ('access_token',)
+
+class Exchange:
+    """
+    A recorded request and its response. `started_at` is when the request was sent, in seconds since the recording
+    started, and `duration` is how long the response took.
+    """
+    __slots__ = ('started_at', 'duration', 'response')
+
+    def __init__(self, started_at: float, duration: float, response: Response):
+        self.started_at = started_at
+        self.duration = duration
+        self.response = response
+
+    @property
+    def key(self) -> tuple[str, str, str]:
+        return _get_key(self.response.request)
+
+    def to_record(self) -> dict[str, Any]:
+        request = self.response.request
+        response = self.response
+
+        return {
+            'started_at': round(self.started_at, 6),
+            'duration': round(self.duration, 6),
+            'request': {
+                'method': request.method,
+                'url': request.url,
+                'headers': {
+                    name: REDACTED if name.lower() in REDACTED_HEADERS else value
+                    for name, value in request.headers.items()
+                },
+                **_encode_body(request.body),
+            },
+            'response': {
+                'status': response.status,
+                'headers': response.headers,
+                'error': response.error,
+                **_encode_body(_redact_body(response.body)),
+            },
+        }
+
+    @classmethod
+    def from_record(cls, record: dict[str, Any]) -> 'Exchange':
+        request = record['request']
+        response = record['response']
+
+        return cls(record['started_at'], record['duration'], Response(
+            Request(request['method'], request['url'], request['headers'], _decode_body(request)),
+            response['status'],
+            headers=response['headers'],
+            body=_decode_body(response),
+            error=response['error']
+        ))
+
+class RecordingTransport(Transport):
+    """
+    Wraps another transport and appends every request and response that goes through it to a gzip-compressed JSON
+    Lines archive at `path`, with the time each request was sent and how long its response took.
+
+    Authorization headers and access tokens are replaced with `REDACTED`. The archive is only complete once `close` is
+    called, though `load_exchanges` also reads the exchanges of an archive that wasn't.
+    """
+    def __init__(self, inner: Transport, path: Path, clock: Clock, parent: Optional[QObject] = None):
+        super().__init__(parent)
+
+        self.inner = inner
+        self.inner.finished.connect(self._on_inner_finished)
+
+        self.clock = clock
+        self.started_at = clock.monotonic()
+        self.recorded = 0
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: Optional[TextIO] = gzip.open(path, 'at', encoding='utf-8')
+        self._sent_at: dict[Request, float] = {}
+        self._flushed_at = self.started_at
+
+    @property
+    def sent(self) -> int:
+        return self.inner.sent
+
+    def send(self, request: Request) -> None:
+        self._sent_at[request] = self.clock.monotonic()
+        self.inner.send(request)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    #region Signal Handlers
+    @Slot(object)
+    def _on_inner_finished(self, response: Response):
+        sent_at = self._sent_at.pop(response.request, None)
+        if sent_at is not None and self._file is not None:
+            exchange = Exchange(sent_at - self.started_at, self.clock.monotonic() - sent_at, response)
+            self._file.write(dumps(exchange.to_record(), separators=(',', ':')) + '\n')
+
+            # Flushing now and then keeps most of the recording readable if the app never gets to close the archive,
+            # without hurting the compression like flushing every exchange would
+            now = self.clock.monotonic()
+            if now - self._flushed_at >= FLUSH_INTERVAL:
+                self._file.flush()
+                self._flushed_at = now
+            self.recorded += 1
+
+        self.finished.emit(response)
+    #endregion
+
+class ReplayTransport(Transport):
+    """
+    Answers requests with the responses from a recording instead of the network.
+
+    Requests are matched to recorded ones by method, path and region, and each match is answered with the next of its
+    recorded responses in order, starting over once they run out. Responses arrive after their recorded duration
+    divided by `speed`, so `1.0` replays at the recorded speed and `math.inf` answers as soon as the event loop runs.
+    Requests without a recorded match fail without a status.
+    """
+    def __init__(
+            self,
+            exchanges: list[Exchange],
+            clock: Clock,
+            *,
+            speed: float = 1.0,
+            parent: Optional[QObject] = None
+    ):
+        super().__init__(parent)
+
+        self.clock = clock
+        self.speed = speed
+
+        self.sent = 0
+        self.requests: Counter[tuple[str, Optional[int]]] = Counter()
+
+        self._exchanges: dict[tuple[str, str, str], deque[Exchange]] = {}
+        for exchange in exchanges:
+            self._exchanges.setdefault(exchange.key, deque()).append(exchange)
+
+    def send(self, request: Request) -> None:
+        self.sent += 1
+
+        endpoint = 'token' if 'Battlenet-Namespace' in request.headers else 'oauth'
+        exchanges = self._exchanges.get(_get_key(request))
+        if not exchanges:
+            self.requests[endpoint, None] += 1
+            response = Response(request, None, error=f'No recorded response for {request.method} {request.url}')
+            self.clock.call_later(0, lambda: self.finished.emit(response))
+            return
+
+        exchange = exchanges[0]
+        exchanges.rotate(-1)
+
+        recorded = exchange.response
+        self.requests[endpoint, recorded.status] += 1
+        response = Response(
+            request,
+            recorded.status,
+            headers=recorded.headers,
+            body=recorded.body,
+            error=recorded.error
+        )
+        self.clock.call_later(exchange.duration / self.speed, lambda: self.finished.emit(response))
+
+def load_exchanges(path: Path) -> list[Exchange]:
+    """
+    Reads the exchanges recorded by a `RecordingTransport`, in the order they were recorded. An archive that ends
+    early, such as when the recording app crashed, is read up to its last complete exchange. Raises `ValueError` if a
+    record isn't an exchange.
+    """
+    exchanges = []
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        try:
+            for line in f:
+                exchanges.append(Exchange.from_record(loads(line)))
+        except (EOFError, ValueError):
+            pass
+        except (KeyError, TypeError) as e:
+            raise ValueError(f'{path} has an invalid exchange after {len(exchanges)} valid ones: {e!r}') from e
+
+    return exchanges
+
+def _get_key(request: Request) -> tuple[str, str, str]:
+    return request.method, QUrl(request.url).path(), request.headers.get('Battlenet-Namespace', '')
+
+def _encode_body(body: bytes) -> dict[str, str]:
+    try:
+        return {'body': body.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'body_base64': b64encode(body).decode('ascii')}
+
+def _decode_body(record: dict[str, Any]) -> bytes:
+    if 'body_base64' in record:
+        return b64decode(record['body_base64'])
+
+    return record.get('body', '').encode('utf-8')
+
+def _redact_body(body: bytes) -> bytes:
+    if not any(f'"{name}"'.encode('utf-8') in body for name in REDACTED_FIELDS):
+        return body
+
+    try:
+        json = loads(body)
+    except ValueError:
+        return body
+
+    if isinstance(json, dict):
+        for name in REDACTED_FIELDS:
+            if name in json:
+                json[name] = REDACTED
+
+    return dumps(json, separators=(',', ':')).encode('utf-8')
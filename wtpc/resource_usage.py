@@ -0,0 +1,91 @@
+import sys
+from typing import Optional
+from collections import Counter
+from wtpc.metrics import metrics
+from PySide6.QtCore import SIGNAL, QEvent, QObject, QMetaMethod
+
+def current_rss() -> Optional[int]:
+    """
+    Returns the resident set size of the current process in bytes, or `None` if it can't be determined.
+    """
+    if sys.platform == 'win32':
+        return _current_rss_windows()
+
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+
+    from os import sysconf
+    return resident_pages * sysconf('SC_PAGE_SIZE')
+
+def _current_rss_windows() -> Optional[int]:
+    from ctypes import byref, sizeof, windll, POINTER, c_size_t, wintypes, Structure
+
+    class ProcessMemoryCounters(Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD),
+            ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', c_size_t),
+            ('WorkingSetSize', c_size_t),
+            ('QuotaPeakPagedPoolUsage', c_size_t),
+            ('QuotaPagedPoolUsage', c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', c_size_t),
+            ('QuotaNonPagedPoolUsage', c_size_t),
+            ('PagefileUsage', c_size_t),
+            ('PeakPagefileUsage', c_size_t),
+        ]
+
+    counters = ProcessMemoryCounters()
+    counters.cb = sizeof(counters)
+    get_current_process = windll.kernel32.GetCurrentProcess
+    get_current_process.restype = wintypes.HANDLE
+    get_process_memory_info = windll.psapi.GetProcessMemoryInfo
+    get_process_memory_info.argtypes = [wintypes.HANDLE, POINTER(ProcessMemoryCounters), wintypes.DWORD]
+
+    if not get_process_memory_info(get_current_process(), byref(counters), counters.cb):
+        return None
+
+    return counters.WorkingSetSize
+
+def count_qobjects(root: QObject) -> Counter[str]:
+    """
+    Counts `root` and every object parented to it, directly or not, by their Qt class name.
+    """
+    counts = Counter({root.metaObject().className(): 1})
+    counts.update(child.metaObject().className() for child in root.findChildren(QObject))
+
+    return counts
+
+def count_connections(root: QObject) -> int:
+    """
+    Counts the receivers connected to every signal of `root` and every object parented to it.
+    """
+    connections = 0
+    for obj in [root, *root.findChildren(QObject)]:
+        meta_object = obj.metaObject()
+        for i in range(meta_object.methodCount()):
+            method = meta_object.method(i)
+            if method.methodType() == QMetaMethod.MethodType.Signal:
+                connections += obj.receivers(SIGNAL(method.methodSignature().data().decode('utf-8')))
+
+    return connections
+
+class WakeupCounter(QObject):
+    """
+    Counts the timer events delivered to every object in the application while installed as an event filter on it.
+    """
+    timer_events = 0
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if event.type() == QEvent.Type.Timer:
+            self.timer_events += 1
+
+        return False
+
+def _get_resident_memory() -> dict[tuple[str, ...], float]:
+    rss = current_rss()
+    return {(): rss} if rss is not None else {}
+
+metrics.callback('wtpc_resident_memory_bytes', 'The resident set size of the process', 'gauge', _get_resident_memory)
@@ -0,0 +1,177 @@
+from re import Match
+from json import dumps
+from time import time, monotonic
+from collections import deque
+from typing import Optional
+from wtpc.metrics import metrics
+from PySide6.QtCore import Qt, Slot, QTimer, QObject
+from wtpc.price_check_worker import PriceCheckWorker
+from wtpc.server.http_server import HttpServer, HttpRequest, HttpConnection
+
+MAX_REPLAY_EVENTS = 256
+MAX_BUFFERED_BYTES = 64 * 1024
+MAX_STALL_SECONDS = 60.0
+HEARTBEAT_INTERVAL = 15_000
+RETRY_INTERVAL = 5_000
+
+STREAM_HEAD = (
+    b'HTTP/1.1 200 OK\r\n'
+    b'Content-Type: text/event-stream\r\n'
+    b'Cache-Control: no-store\r\n'
+    b'Connection: keep-alive\r\n'
+    b'\r\n'
+    + f'retry: {RETRY_INTERVAL}\n\n'.encode('utf-8')
+)
+HEARTBEAT = b': keep-alive\n\n'
+
+subscriber_gauge = metrics.gauge('wtpc_event_subscribers', 'Clients subscribed to the price event stream')
+conflated_event_counter = metrics.counter(
+    'wtpc_events_conflated',
+    'Price events replaced by a newer event while waiting for a slow subscriber'
+)
+dropped_subscriber_counter = metrics.counter(
+    'wtpc_event_subscribers_dropped',
+    'Subscribers disconnected for not reading events'
+)
+
+class Subscriber(QObject):
+    """
+    A client of the event stream.
+
+    Events are written straight to the client's socket until more than `MAX_BUFFERED_BYTES` are waiting to be sent.
+    From then on only the latest event of each region is kept and the pending events are flushed once the client
+    catches up, and a client that doesn't catch up within `MAX_STALL_SECONDS` is disconnected.
+    """
+    def __init__(self, connection: HttpConnection):
+        super().__init__(connection)
+
+        self.connection = connection
+        self.connection.socket.bytesWritten.connect(self._on_bytes_written)
+
+        self.pending: dict[str, bytes] = {}
+        self.pending_since = 0.0
+
+    @property
+    def is_stalled(self) -> bool:
+        return bool(self.pending) and monotonic() - self.pending_since > MAX_STALL_SECONDS
+
+    def send(self, region: str, event: bytes) -> None:
+        if not self.pending and self.connection.bytes_to_write <= MAX_BUFFERED_BYTES:
+            self.connection.write(event)
+            return
+
+        if not self.pending:
+            self.pending_since = monotonic()
+        elif region in self.pending:
+            conflated_event_counter.inc()
+
+        # Keep the region's position so regions are flushed in the order they first fell behind
+        self.pending[region] = event
+
+    #region Signal Handlers
+    @Slot(int)
+    def _on_bytes_written(self, _):
+        if not self.pending or self.connection.bytes_to_write > MAX_BUFFERED_BYTES:
+            return
+
+        self.connection.write(b''.join(self.pending.values()))
+        self.pending.clear()
+    #endregion
+
+class EventStream(QObject):
+    """
+    Pushes every price change to the clients subscribed to `/events` as server-sent events.
+
+    Each event is serialized once and written to every subscriber. Event IDs keep increasing across restarts, and
+    clients reconnecting with a `Last-Event-ID` header (or a `last_event_id` query parameter) are sent the events they
+    missed if they are still buffered, or the latest event of every region otherwise.
+    """
+    def __init__(self, server: HttpServer, worker: PriceCheckWorker):
+        super().__init__(server)
+
+        self.server = server
+        self.server.route(r'/events', self._subscribe, name='/events', methods=('GET',))
+
+        self.worker = worker
+        self.worker.region_price_updated.connect(self._on_region_price_updated)
+
+        self.heartbeat_timer = QTimer(self)
+        self.heartbeat_timer.setTimerType(Qt.TimerType.VeryCoarseTimer)
+        self.heartbeat_timer.setInterval(HEARTBEAT_INTERVAL)
+        self.heartbeat_timer.timeout.connect(self._on_heartbeat_timer_timeout)
+
+        # Millisecond timestamps keep IDs increasing across restarts so reconnecting clients never skip new events
+        self._last_id = int(time() * 1000)
+        self._events: deque[tuple[int, str, bytes]] = deque(maxlen=MAX_REPLAY_EVENTS)
+        self._latest_events: dict[str, bytes] = {}
+        self._latest_prices: dict[str, tuple[int, int]] = {}
+        self._subscribers: set[Subscriber] = set()
+
+    #region Signal Handlers
+    @Slot(str, int, int)
+    def _on_region_price_updated(self, region: str, price: int, last_updated: int):
+        # Every poll reports the price, so only changes become events and the replay buffer isn't filled with repeats
+        if self._latest_prices.get(region) == (price, last_updated):
+            return
+
+        self._latest_prices[region] = (price, last_updated)
+        self._last_id += 1
+
+        data = dumps({'region': region, 'price': price, 'last_updated': last_updated}, separators=(',', ':'))
+        event = f'id: {self._last_id}\nevent: price\ndata: {data}\n\n'.encode('utf-8')
+
+        self._events.append((self._last_id, region, event))
+        self._latest_events[region] = event
+
+        for subscriber in self._subscribers:
+            subscriber.send(region, event)
+
+    @Slot()
+    def _on_heartbeat_timer_timeout(self):
+        for subscriber in list(self._subscribers):
+            if subscriber.is_stalled:
+                # A graceful close would wait for the buffered events to drain, which a stalled client never does
+                self._remove_subscriber(subscriber)
+                dropped_subscriber_counter.inc()
+                subscriber.connection.abort()
+            elif not subscriber.pending:
+                subscriber.connection.write(HEARTBEAT)
+    #endregion
+
+    #region Handlers
+    def _subscribe(self, request: HttpRequest, match: Match) -> None:
+        connection = request.connection
+        connection.write(STREAM_HEAD)
+
+        last_event_id = self._parse_event_id(
+            request.headers.get('last-event-id', request.query.get('last_event_id'))
+        )
+        connection.write(b''.join(self._get_missed_events(last_event_id)))
+
+        subscriber = Subscriber(connection)
+        subscriber.destroyed.connect(lambda: self._remove_subscriber(subscriber))
+        connection.socket.disconnected.connect(lambda: self._remove_subscriber(subscriber))
+
+        self._subscribers.add(subscriber)
+        subscriber_gauge.set(len(self._subscribers))
+        self.heartbeat_timer.start()
+    #endregion
+
+    def _get_missed_events(self, last_event_id: Optional[int]) -> list[bytes]:
+        events = self._events
+        if last_event_id is not None and events and events[0][0] <= last_event_id + 1:
+            return [event for id_, _, event in events if id_ > last_event_id]
+
+        return list(self._latest_events.values())
+
+    def _parse_event_id(self, value: Optional[str]) -> Optional[int]:
+        return int(value) if value is not None and value.isdigit() else None
+
+    def _remove_subscriber(self, subscriber: Subscriber):
+        if subscriber not in self._subscribers:
+            return
+
+        self._subscribers.discard(subscriber)
+        subscriber_gauge.set(len(self._subscribers))
+        if not self._subscribers:
+            self.heartbeat_timer.stop()
@@ -0,0 +1,335 @@
+import re
+from json import dumps
+from zlib import crc32
+from typing import Callable, Optional
+from wtpc.metrics import metrics
+from wtpc.event_log import event_log
+from PySide6.QtCore import Slot, QObject
+from urllib.parse import unquote, parse_qsl, urlsplit
+from PySide6.QtNetwork import QTcpSocket, QTcpServer, QHostAddress
+
+MAX_REQUEST_SIZE = 16 * 1024
+
+STATUS_REASONS = {
+    200: 'OK',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Content Too Large',
+    500: 'Internal Server Error',
+    502: 'Bad Gateway',
+    503: 'Service Unavailable',
+    504: 'Gateway Timeout',
+}
+
+class HttpRequest:
+    __slots__ = ('method', 'path', 'query', 'version', 'headers', 'connection')
+
+    def __init__(
+            self,
+            method: str,
+            path: str,
+            query: dict[str, str],
+            version: str,
+            headers: dict[str, str],
+            connection: 'HttpConnection'
+    ):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.version = version
+        self.headers = headers
+        self.connection = connection
+
+    @property
+    def keep_alive(self) -> bool:
+        return self.version == 'HTTP/1.1' and self.headers.get('connection', '').lower() != 'close'
+
+    def defer(self) -> None:
+        """
+        Marks the request as answered later through `HttpConnection.resume`. The handler should return `None`.
+        """
+        self.connection.defer(self)
+
+class HttpResponse:
+    """
+    A response serialized into bytes once when it is created, so serving it any number of times only costs a write.
+
+    Responses with an ETag also serialize a `304 Not Modified` variant that is served to clients whose `If-None-Match`
+    header matches it.
+    """
+    def __init__(
+            self,
+            status: int,
+            body: bytes = b'',
+            *,
+            content_type: str = 'application/json',
+            headers: Optional[dict[str, str]] = None,
+            use_etag: bool = True
+    ):
+        self.status = status
+        self.body = body
+        self.etag = f'"{crc32(body):08x}-{len(body):x}"' if use_etag and status == 200 else None
+
+        head_headers = {'Content-Type': content_type, 'Content-Length': str(len(body))}
+        if self.etag is not None:
+            head_headers['ETag'] = self.etag
+        if headers:
+            head_headers.update(headers)
+
+        self.head = self._serialize_head(status, head_headers)
+        self.data = self.head + body
+
+        self.not_modified_data = b''
+        if self.etag is not None:
+            not_modified_headers = {'ETag': self.etag}
+            if headers:
+                not_modified_headers.update(headers)
+            self.not_modified_data = self._serialize_head(304, not_modified_headers)
+
+    @classmethod
+    def error(cls, status: int, message: Optional[str] = None) -> 'HttpResponse':
+        """
+        Returns an error response with `message`, or the status's reason without one. Only responses without a message
+        are cached, since messages can contain anything a client sent.
+        """
+        if message is not None:
+            return cls._create_error(status, message)
+
+        response = _error_responses.get(status)
+        if response is None:
+            response = _error_responses[status] = cls._create_error(status, STATUS_REASONS.get(status, 'Error'))
+
+        return response
+
+    def matches(self, request: HttpRequest) -> bool:
+        """
+        Returns whether the request's `If-None-Match` header matches the response's ETag.
+        """
+        if_none_match = request.headers.get('if-none-match')
+        if self.etag is None or if_none_match is None:
+            return False
+
+        return if_none_match.strip() == '*' or self.etag in (tag.strip() for tag in if_none_match.split(','))
+
+    @classmethod
+    def _create_error(cls, status: int, message: str) -> 'HttpResponse':
+        body = dumps({'error': message}, separators=(',', ':'))
+        return cls(status, body.encode('utf-8'), use_etag=False, headers={'Cache-Control': 'no-store'})
+
+    @staticmethod
+    def _serialize_head(status: int, headers: dict[str, str]) -> bytes:
+        lines = [f'HTTP/1.1 {status} {STATUS_REASONS.get(status, "Unknown")}']
+        lines.extend(f'{name}: {value}' for name, value in headers.items())
+        lines.append('\r\n')
+
+        return '\r\n'.join(lines).encode('latin-1')
+
+_error_responses: dict[int, HttpResponse] = {}
+
+Handler = Callable[[HttpRequest, re.Match], Optional[HttpResponse]]
+
+http_request_counter = metrics.counter(
+    'wtpc_http_requests',
+    'Requests served by the local HTTP server by route and response status',
+    ('route', 'status')
+)
+
+class HttpConnection(QObject):
+    """
+    Reads requests from a client socket and writes their responses, keeping the connection open between requests.
+
+    A handler that returns `None` instead of a response takes over the connection, for example to stream events to it,
+    and no further requests are read from it, unless it deferred the request, in which case reading resumes once the
+    response is passed to `resume`.
+    """
+    def __init__(self, server: 'HttpServer', socket: QTcpSocket):
+        super().__init__(socket)
+
+        self.server = server
+        self.socket = socket
+        self.socket.readyRead.connect(self._on_ready_read)
+        self.socket.disconnected.connect(self.socket.deleteLater)
+
+        self.is_detached = False
+
+        self._buffer = b''
+        self._deferred_request: Optional[HttpRequest] = None
+
+    @property
+    def bytes_to_write(self) -> int:
+        return self.socket.bytesToWrite()
+
+    def write(self, data: bytes) -> None:
+        if self.socket.state() == QTcpSocket.SocketState.ConnectedState:
+            self.socket.write(data)
+
+    def close(self) -> None:
+        self.socket.disconnectFromHost()
+
+    def abort(self) -> None:
+        """
+        Closes the connection without waiting for the client to read what is still buffered for it.
+        """
+        self.socket.abort()
+
+    def defer(self, request: HttpRequest) -> None:
+        self._deferred_request = request
+
+    def resume(self, response: HttpResponse) -> None:
+        """
+        Answers the deferred request and continues with any requests the client sent in the meantime.
+        """
+        request = self._deferred_request
+        if request is None:
+            return
+
+        self._deferred_request = None
+        self._respond(response, keep_alive=request.keep_alive, request=request)
+        self._process_buffer()
+
+    #region Signal Handlers
+    @Slot()
+    def _on_ready_read(self):
+        if self.is_detached:
+            # The connection belongs to a handler now, so anything else the client sends is ignored
+            self.socket.readAll()
+            return
+
+        self._buffer += self.socket.readAll().data()
+        if self._deferred_request is None:
+            self._process_buffer()
+    #endregion
+
+    def _process_buffer(self):
+        while not self.is_detached:
+            head_end = self._buffer.find(b'\r\n\r\n')
+            if head_end < 0:
+                if len(self._buffer) > MAX_REQUEST_SIZE:
+                    self._respond(HttpResponse.error(413), keep_alive=False)
+                return
+
+            request = self._parse_request(self._buffer[:head_end].decode('latin-1'))
+            if request is None:
+                self._respond(HttpResponse.error(400), keep_alive=False)
+                return
+
+            # Request bodies aren't used by any endpoint, but they still need to be skipped
+            content_length = request.headers.get('content-length', '0')
+            if not content_length.isdigit() or int(content_length) > MAX_REQUEST_SIZE:
+                self._respond(HttpResponse.error(413), keep_alive=False)
+                return
+
+            request_end = head_end + 4 + int(content_length)
+            if len(self._buffer) < request_end:
+                return
+
+            self._buffer = self._buffer[request_end:]
+
+            response = self.server.handle(request)
+            if response is None:
+                if self._deferred_request is None:
+                    self.is_detached = True
+                    self._buffer = b''
+                return
+
+            self._respond(response, keep_alive=request.keep_alive, request=request)
+
+    def _respond(self, response: HttpResponse, *, keep_alive: bool, request: Optional[HttpRequest] = None) -> None:
+        if request is not None and response.matches(request):
+            self.write(response.not_modified_data)
+        elif request is not None and request.method == 'HEAD':
+            self.write(response.head)
+        else:
+            self.write(response.data)
+
+        if not keep_alive:
+            self._buffer = b''
+            self.is_detached = True
+            self.close()
+
+    def _parse_request(self, head: str) -> Optional[HttpRequest]:
+        request_line, *header_lines = head.split('\r\n')
+        try:
+            method, target, version = request_line.split(' ')
+        except ValueError:
+            return None
+
+        if not version.startswith('HTTP/1.'):
+            return None
+
+        headers = {}
+        for line in header_lines:
+            name, sep, value = line.partition(':')
+            if not sep:
+                return None
+            headers[name.strip().lower()] = value.strip()
+
+        url = urlsplit(target)
+
+        return HttpRequest(method, unquote(url.path), dict(parse_qsl(url.query)), version, headers, self)
+
+class HttpServer(QTcpServer):
+    """
+    A minimal HTTP/1.1 server running on the GUI thread's event loop.
+
+    Handlers are registered per path pattern and return `HttpResponse` objects, which are expected to be cached and
+    reused between requests wherever possible.
+    """
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+
+        self._routes: list[tuple[re.Pattern, str, tuple[str, ...], Handler]] = []
+
+        self.newConnection.connect(self._on_new_connection)
+
+    def route(
+            self,
+            pattern: str,
+            handler: Handler,
+            *,
+            name: Optional[str] = None,
+            methods: tuple[str, ...] = ('GET', 'HEAD')
+    ) -> None:
+        """
+        Registers a handler for the paths that fully match the regular expression `pattern`. The route's `name` labels
+        its requests in the metrics and defaults to the pattern.
+        """
+        self._routes.append((re.compile(pattern), name or pattern, methods, handler))
+
+    def start(self, host: str, port: int) -> bool:
+        return self.listen(QHostAddress(host), port)
+
+    def handle(self, request: HttpRequest) -> Optional[HttpResponse]:
+        route, response = self._dispatch(request)
+
+        # Deferred and streaming requests have no response yet and are counted as successful
+        status = response.status if response is not None else 200
+        http_request_counter.labels(route, str(status)).inc()
+
+        return response
+
+    def _dispatch(self, request: HttpRequest) -> tuple[str, Optional[HttpResponse]]:
+        for pattern, name, methods, handler in self._routes:
+            match = pattern.fullmatch(request.path)
+            if match is None:
+                continue
+
+            if request.method not in methods:
+                return name, HttpResponse.error(405)
+
+            try:
+                return name, handler(request, match)
+            except Exception as e:
+                event_log.error('http_handler_failed', route=name, method=request.method, error=repr(e))
+                return name, HttpResponse.error(500)
+
+        return 'unmatched', HttpResponse.error(404)
+
+    #region Signal Handlers
+    @Slot()
+    def _on_new_connection(self):
+        while self.hasPendingConnections():
+            HttpConnection(self, self.nextPendingConnection())
+    #endregion
@@ -0,0 +1,28 @@
+from re import Match
+from PySide6.QtCore import QObject
+from wtpc.event_log import event_log
+from wtpc.server.http_server import HttpServer, HttpRequest, HttpResponse
+
+CONTENT_TYPE = 'application/x-ndjson; charset=utf-8'
+
+class LogApi(QObject):
+    """
+    Serves the records in the event log at `/log` as JSON Lines, oldest first, so the log of a running instance can be
+    collected without restarting it.
+    """
+    def __init__(self, server: HttpServer):
+        super().__init__(server)
+
+        self.server = server
+        self.server.route(r'/log', self._get_log)
+
+    #region Handlers
+    def _get_log(self, request: HttpRequest, match: Match) -> HttpResponse:
+        return HttpResponse(
+            200,
+            event_log.dump().encode('utf-8'),
+            content_type=CONTENT_TYPE,
+            headers={'Cache-Control': 'no-store'},
+            use_etag=False
+        )
+    #endregion
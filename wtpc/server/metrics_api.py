@@ -0,0 +1,29 @@
+from re import Match
+from wtpc.metrics import metrics
+from PySide6.QtCore import QObject
+from wtpc.server.http_server import HttpServer, HttpRequest, HttpResponse
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+class MetricsApi(QObject):
+    """
+    Serves the app's metrics at `/metrics` in the Prometheus text format, which OpenMetrics scrapers also accept.
+
+    The metrics are only rendered when scraped, so updating them costs nothing but the update itself.
+    """
+    def __init__(self, server: HttpServer):
+        super().__init__(server)
+
+        self.server = server
+        self.server.route(r'/metrics', self._get_metrics)
+
+    #region Handlers
+    def _get_metrics(self, request: HttpRequest, match: Match) -> HttpResponse:
+        return HttpResponse(
+            200,
+            metrics.expose().encode('utf-8'),
+            content_type=CONTENT_TYPE,
+            headers={'Cache-Control': 'no-store'},
+            use_etag=False
+        )
+    #endregion
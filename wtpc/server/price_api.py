@@ -0,0 +1,115 @@
+from re import Match
+from json import dumps
+from typing import Optional
+from collections import OrderedDict
+from PySide6.QtCore import Slot, QObject
+from wtpc import REGIONS
+from wtpc.price_history import price_history
+from wtpc.price_check_worker import PriceCheckWorker
+from wtpc.server.http_server import HttpServer, HttpRequest, HttpResponse
+
+MAX_CACHED_HISTORY_RESPONSES = 64
+
+HistoryKey = tuple[str, Optional[float], Optional[float]]
+
+class PriceApi(QObject):
+    """
+    Serves the latest price and the price history of every region over HTTP.
+
+    Responses are serialized once when a region updates and served from a cache until the next update, so any number
+    of local clients cost no upstream requests. `/price/{region}` responses are rebuilt whenever the worker emits a new
+    price and `/history/{region}` responses are cached per requested range until the region gets a new sample.
+    """
+    def __init__(self, server: HttpServer, worker: PriceCheckWorker):
+        super().__init__(server)
+
+        self.server = server
+        self.server.route(r'/price/([\w-]+)', self._get_price, name='/price/{region}')
+        self.server.route(r'/history/([\w-]+)', self._get_history, name='/history/{region}')
+
+        self.worker = worker
+        self.worker.region_price_updated.connect(self._on_region_price_updated)
+
+        price_history.sample_added.connect(self._on_sample_added)
+
+        self._latest_prices: dict[str, tuple[int, float]] = {}
+        self._price_responses: dict[str, HttpResponse] = {}
+        self._history_responses: OrderedDict[HistoryKey, HttpResponse] = OrderedDict()
+
+    #region Signal Handlers
+    @Slot(str, int, int)
+    def _on_region_price_updated(self, region: str, price: int, last_updated: int):
+        # Every poll reports the price, but it only needs serializing when it changed
+        if self._latest_prices.get(region) == (price, last_updated):
+            return
+
+        self._latest_prices[region] = (price, last_updated)
+        self._price_responses[region] = self._serialize_price(region, price, last_updated)
+
+    @Slot(str, float, int)
+    def _on_sample_added(self, region: str, timestamp: float, price: int):
+        for key in [key for key in self._history_responses if key[0] == region]:
+            del self._history_responses[key]
+    #endregion
+
+    #region Handlers
+    def _get_price(self, request: HttpRequest, match: Match) -> HttpResponse:
+        region = self._normalize_region(match[1])
+        if region not in REGIONS:
+            return HttpResponse.error(404)
+
+        response = self._price_responses.get(region)
+        if response is None:
+            # Serve the last stored sample until the worker polls the region
+            series = price_history.series(region)
+            if not series:
+                return HttpResponse.error(404, f'No price for region {region}')
+
+            response = self._serialize_price(region, series.prices[-1], series.timestamps[-1])
+            self._price_responses[region] = response
+
+        return response
+
+    def _get_history(self, request: HttpRequest, match: Match) -> HttpResponse:
+        region = self._normalize_region(match[1])
+        if region not in REGIONS:
+            return HttpResponse.error(404)
+
+        try:
+            start = float(request.query['from']) if 'from' in request.query else None
+            end = float(request.query['to']) if 'to' in request.query else None
+        except ValueError:
+            return HttpResponse.error(400, 'from and to must be Unix timestamps')
+
+        key = (region, start, end)
+        response = self._history_responses.get(key)
+        if response is not None:
+            self._history_responses.move_to_end(key)
+            return response
+
+        series = price_history.series(region)
+        first, last = series.index_range(
+            start if start is not None else float('-inf'),
+            end if end is not None else float('inf')
+        )
+        body = dumps({
+            'region': region,
+            'samples': list(zip(series.timestamps[first:last], series.prices[first:last])),
+        }, separators=(',', ':'))
+
+        response = HttpResponse(200, body.encode('utf-8'), headers={'Cache-Control': 'no-cache'})
+
+        self._history_responses[key] = response
+        if len(self._history_responses) > MAX_CACHED_HISTORY_RESPONSES:
+            self._history_responses.popitem(last=False)
+
+        return response
+    #endregion
+
+    def _normalize_region(self, region: str) -> str:
+        region = region.lower()
+        return region if region.startswith('dynamic-') else f'dynamic-{region}'
+
+    def _serialize_price(self, region: str, price: int, last_updated: float) -> HttpResponse:
+        body = dumps({'region': region, 'price': price, 'last_updated': last_updated}, separators=(',', ':'))
+        return HttpResponse(200, body.encode('utf-8'), headers={'Cache-Control': 'no-cache'})
@@ -0,0 +1,148 @@
+from re import Match
+from json import dumps
+from wtpc import REGIONS, API_HOSTS
+from time import monotonic
+from typing import Optional
+from shiboken6 import isValid
+from wtpc.metrics import metrics
+from email.utils import formatdate
+from PySide6.QtCore import Slot, QTimer, QObject
+from wtpc.price_check_worker import PriceCheckWorker
+from wtpc.server.http_server import HttpServer, HttpRequest, HttpResponse
+
+CACHE_TTL = 60
+UPSTREAM_TIMEOUT = 15_000
+
+proxy_request_counter = metrics.counter(
+    'wtpc_proxy_requests',
+    'Token index requests served in proxy mode by cache result',
+    ('result',)
+)
+
+class ProxyEntry:
+    __slots__ = ('body', 'last_modified', 'received_at', 'response', 'response_age')
+
+    def __init__(self, body: bytes, last_modified: str, received_at: float):
+        self.body = body
+        self.last_modified = last_modified
+        self.received_at = received_at
+        self.response: Optional[HttpResponse] = None
+        self.response_age = -1
+
+    @property
+    def age(self) -> int:
+        return int(monotonic() - self.received_at)
+
+    def get_response(self) -> HttpResponse:
+        # Only the Age and Date headers change between requests, so the response is rebuilt at most once per second
+        age = self.age
+        if self.response is None or self.response_age != age:
+            self.response = HttpResponse(200, self.body, headers={
+                'Cache-Control': f'public, max-age={CACHE_TTL}',
+                'Age': str(age),
+                'Date': formatdate(usegmt=True),
+                'Last-Modified': self.last_modified,
+            })
+            self.response_age = age
+
+        return self.response
+
+class TokenProxy(QObject):
+    """
+    Serves a Battle.net compatible `/data/wow/token/index` so other instances can point their worker's base URL here
+    instead of each polling Battle.net with their own credentials.
+
+    Every price the worker receives is cached and served for `CACHE_TTL` seconds. Requests for a region without a
+    fresh cached price are held until the worker fetches it, and requests that arrive while a fetch is in flight wait
+    for the same fetch, so simultaneous misses cost a single upstream request.
+    """
+    def __init__(self, server: HttpServer, worker: PriceCheckWorker):
+        super().__init__(server)
+
+        self.server = server
+        self.server.route(r'/data/wow/token/index', self._get_token_index, name='/data/wow/token/index')
+
+        self.worker = worker
+        self.worker.region_price_updated.connect(self._on_region_price_updated)
+        self.worker.region_error.connect(self._on_region_error)
+
+        self._entries: dict[str, ProxyEntry] = {}
+        self._waiters: dict[str, list[HttpRequest]] = {}
+        self._fetch_timers: dict[str, QTimer] = {}
+
+    #region Signal Handlers
+    @Slot(str, int, int)
+    def _on_region_price_updated(self, region: str, price: int, last_updated: int):
+        body = dumps({
+            '_links': {'self': {'href': f'https://{API_HOSTS[region]}/data/wow/token/?namespace={region}'}},
+            'last_updated_timestamp': int(last_updated * 1000),
+            'price': price * 10_000,
+        }, separators=(',', ':'))
+
+        entry = ProxyEntry(body.encode('utf-8'), formatdate(last_updated, usegmt=True), monotonic())
+        self._entries[region] = entry
+
+        self._answer_waiters(region, entry.get_response())
+
+    @Slot(str, str)
+    def _on_region_error(self, region: str, error_message: str):
+        self._answer_waiters(region, HttpResponse.error(502, error_message))
+    #endregion
+
+    #region Handlers
+    def _get_token_index(self, request: HttpRequest, match: Match) -> Optional[HttpResponse]:
+        region = request.headers.get('battlenet-namespace', request.query.get('namespace'))
+        if region is None:
+            return HttpResponse.error(400, 'Missing namespace')
+        if region not in REGIONS:
+            return HttpResponse.error(404, f'Unknown namespace {region}')
+
+        entry = self._entries.get(region)
+        if entry is not None and entry.age < CACHE_TTL:
+            proxy_request_counter.labels('hit').inc()
+            return entry.get_response()
+
+        if self.worker.clock.monotonic() < self.worker.backoff_until:
+            # Don't add to the upstream failures, serve whatever is cached instead
+            if entry is not None:
+                proxy_request_counter.labels('stale').inc()
+                return entry.get_response()
+
+            proxy_request_counter.labels('unavailable').inc()
+            return HttpResponse.error(503, 'Upstream is backing off')
+
+        request.defer()
+
+        waiters = self._waiters.setdefault(region, [])
+        waiters.append(request)
+        if len(waiters) > 1:
+            proxy_request_counter.labels('collapsed').inc()
+            return None
+
+        proxy_request_counter.labels('miss').inc()
+        self._get_fetch_timer(region).start()
+        self.worker.check_region(region)
+
+        return None
+    #endregion
+
+    def _answer_waiters(self, region: str, response: HttpResponse):
+        timer = self._fetch_timers.get(region)
+        if timer is not None:
+            timer.stop()
+
+        for request in self._waiters.pop(region, []):
+            # The client may have disconnected while waiting
+            if isValid(request.connection):
+                request.connection.resume(response)
+
+    def _get_fetch_timer(self, region: str) -> QTimer:
+        timer = self._fetch_timers.get(region)
+        if timer is None:
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.setInterval(UPSTREAM_TIMEOUT)
+            timer.timeout.connect(lambda: self._answer_waiters(region, HttpResponse.error(504)))
+            self._fetch_timers[region] = timer
+
+        return timer
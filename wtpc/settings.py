@@ -14,3 +14,6 @@ class UserSettingsKeys(StrEnum):
     CLIENT_SECRET = auto()
     REGION = auto()
     SEND_NOTIFICATIONS = auto()
+    TRACKED_REGIONS = auto()
+    ALERT_RULES = auto()
+    WEBHOOK_URLS = auto()
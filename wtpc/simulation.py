@@ -0,0 +1,457 @@
+import sys
+from re import Match
+from json import dumps
+from pathlib import Path
+from random import Random
+from http import HTTPStatus
+from typing import Optional
+from time import perf_counter
+from collections import Counter
+from argparse import ArgumentParser
+from tempfile import TemporaryDirectory
+from traceback import format_exception
+from wtpc.settings import UserSettingsKeys
+from wtpc.clock import Clock, SimulatedClock
+from wtpc.price_history import PriceHistory
+from wtpc.alert_rules import parse_duration
+from wtpc.cli import ExitCode, parse_regions
+from wtpc import APP_NAME, REGIONS, API_HOSTS
+from wtpc.faults import FaultInjectingTransport, parse_faults
+from wtpc.recording import Exchange, ReplayTransport, load_exchanges
+from wtpc.transport import Request, Response, Transport, QtTransport
+from wtpc.server.http_server import HttpServer, HttpRequest, HttpResponse
+from wtpc.price_check_worker import OAUTH_URL, TIMER_INTERVAL, PriceCheckWorker
+from PySide6.QtCore import Slot, QEvent, QObject, QSettings, QEventLoop, QCoreApplication
+
+UPDATE_INTERVAL = 20 * 60
+TOKEN_LIFETIME = 24 * 60 * 60
+MAX_VALID_TOKENS = 16
+
+class FakeBattleNetApi(Transport):
+    """
+    Answers requests the way the Battle.net OAuth and WoW Token APIs do, without a network.
+
+    Prices change every `update_interval` seconds of the clock's time and are derived from `seed`, so every run with
+    the same seed sees the same prices. Access tokens expire after `token_lifetime` seconds, and during `outages`,
+    given as `(start, end)` seconds of the clock's monotonic time, every request fails with a 503. Without
+    `require_token`, prices are served without an access token, like an instance in proxy mode does.
+    """
+    def __init__(
+            self,
+            clock: Clock,
+            *,
+            latency: float = 0.05,
+            update_interval: float = UPDATE_INTERVAL,
+            token_lifetime: float = TOKEN_LIFETIME,
+            outages: tuple[tuple[float, float], ...] = (),
+            seed: int = 0,
+            require_token: bool = True,
+            parent: Optional[QObject] = None
+    ):
+        super().__init__(parent)
+
+        self.clock = clock
+        self.latency = latency
+        self.update_interval = update_interval
+        self.token_lifetime = token_lifetime
+        self.outages = outages
+        self.seed = seed
+        self.require_token = require_token
+
+        self.sent = 0
+        self.requests: Counter[tuple[str, int]] = Counter()
+
+        self._tokens: dict[str, float] = {}
+        self._issued_tokens = 0
+        self._prices: dict[str, tuple[int, int]] = {}
+
+    def send(self, request: Request) -> None:
+        self.sent += 1
+
+        response = self.respond(request)
+        self.clock.call_later(self.latency, lambda: self.finished.emit(response))
+
+    def price_at(self, region: str, timestamp: float) -> tuple[int, int]:
+        """
+        Returns the price in gold and the Unix time it was last updated at `timestamp`.
+        """
+        cycle = int(timestamp // self.update_interval)
+        cached = self._prices.get(region)
+        if cached is None or cached[0] != cycle:
+            price = Random(f'{self.seed}:{region}:{cycle}').randrange(150_000, 350_000, 5)
+            cached = self._prices[region] = (cycle, price)
+
+        return cached[1], int(cycle * self.update_interval)
+
+    def respond(self, request: Request) -> Response:
+        is_oauth = request.url == OAUTH_URL
+        endpoint = 'oauth' if is_oauth else 'token'
+
+        now = self.clock.monotonic()
+        if any(start <= now < end for start, end in self.outages):
+            response = self._error(request, 503)
+        elif is_oauth:
+            response = self._issue_token(request)
+        else:
+            response = self._get_token_index(request)
+
+        self.requests[endpoint, response.status] += 1
+
+        return response
+
+    def _issue_token(self, request: Request) -> Response:
+        if not request.headers.get('Authorization', '').startswith('Basic '):
+            return self._error(request, 401)
+
+        now = self.clock.time()
+
+        # Forget expired tokens, and the oldest valid ones, so weeks of refreshes don't pile up
+        self._tokens = {token: expires for token, expires in self._tokens.items() if expires > now}
+        while len(self._tokens) >= MAX_VALID_TOKENS:
+            del self._tokens[next(iter(self._tokens))]
+
+        self._issued_tokens += 1
+        access_token = f'simulated-{self._issued_tokens}'
+        self._tokens[access_token] = now + self.token_lifetime
+
+        return self._json(request, {
+            'access_token': access_token,
+            'token_type': 'bearer',
+            'expires_in': int(self.token_lifetime),
+        })
+
+    def _get_token_index(self, request: Request) -> Response:
+        region = request.headers.get('Battlenet-Namespace')
+        if region not in REGIONS:
+            return self._error(request, 404)
+
+        access_token = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if self.require_token and self._tokens.get(access_token, 0.0) <= self.clock.time():
+            return self._error(request, 401)
+
+        price, last_updated = self.price_at(region, self.clock.time())
+
+        return self._json(request, {
+            '_links': {'self': {'href': f'https://{API_HOSTS[region]}/data/wow/token/?namespace={region}'}},
+            'last_updated_timestamp': last_updated * 1000,
+            'price': price * 10_000,
+        })
+
+    def _json(self, request: Request, body: dict) -> Response:
+        return Response(
+            request,
+            200,
+            headers={'content-type': 'application/json;charset=UTF-8'},
+            body=dumps(body, separators=(',', ':')).encode('utf-8')
+        )
+
+    def _error(self, request: Request, status: int) -> Response:
+        reason = HTTPStatus(status).phrase
+
+        return Response(
+            request,
+            status,
+            body=dumps({'code': status, 'type': reason}).encode('utf-8'),
+            error=f'Error transferring {request.url} - server replied: {reason}'
+        )
+
+class SimulationResult:
+    __slots__ = (
+        'simulated_seconds',
+        'elapsed',
+        'requests',
+        'faults',
+        'max_requests_per_minute',
+        'price_updates',
+        'new_prices',
+        'errors',
+        'max_consecutive_failures',
+        'max_update_lag',
+        'exceptions',
+    )
+
+    def __init__(self):
+        self.simulated_seconds = 0.0
+        self.elapsed = 0.0
+        self.requests: dict[str, int] = {}
+        self.faults: dict[str, int] = {}
+        self.max_requests_per_minute = 0
+        self.price_updates = 0
+        self.new_prices = 0
+        self.errors = 0
+        self.max_consecutive_failures = 0
+        self.max_update_lag = 0.0
+        self.exceptions: list[str] = []
+
+    def to_dict(self) -> dict:
+        return {
+            'simulated_seconds': self.simulated_seconds,
+            'elapsed': round(self.elapsed, 4),
+            'speedup': round(self.simulated_seconds / self.elapsed) if self.elapsed else None,
+            'requests': self.requests,
+            'faults': self.faults,
+            'max_requests_per_minute': self.max_requests_per_minute,
+            'price_updates': self.price_updates,
+            'new_prices': self.new_prices,
+            'errors': self.errors,
+            'max_consecutive_failures': self.max_consecutive_failures,
+            'max_update_lag': self.max_update_lag,
+            'exceptions': self.exceptions,
+        }
+
+class Simulation(QObject):
+    """
+    Runs a `PriceCheckWorker` against a `FakeBattleNetApi` on a `SimulatedClock`, with its settings and price history
+    kept in `directory` rather than the user's data directory. With `faults`, requests go through a
+    `FaultInjectingTransport` in front of the fake API.
+
+    With `network`, the fake API is served over loopback HTTP and the worker polls it in proxy mode through a
+    `QtTransport`, so every poll also goes through Qt's network stack. The event loop is then run between polls until
+    every reply has finished and been deleted, which makes simulated time pass far slower.
+
+    With `replay`, the worker is answered with recorded responses from a `ReplayTransport` instead of the fake API,
+    their durations divided by `replay_speed`.
+
+    Everything but `elapsed` in the result depends only on the arguments, so runs can be compared with each other to
+    catch changes in the worker's behavior as well as its speed.
+    """
+    def __init__(
+            self,
+            directory: Path,
+            *,
+            regions: tuple[str, ...] = ('dynamic-us',),
+            latency: float = 0.05,
+            outages: tuple[tuple[float, float], ...] = (),
+            seed: int = 0,
+            faults: Optional[dict[str, float]] = None,
+            network: bool = False,
+            replay: Optional[list[Exchange]] = None,
+            replay_speed: float = 1.0
+    ):
+        super().__init__()
+
+        self.clock = SimulatedClock()
+        self.api = FakeBattleNetApi(
+            self.clock,
+            latency=latency,
+            outages=outages,
+            seed=seed,
+            require_token=not network,
+            parent=self
+        )
+
+        base_url = None
+        self.network_transport: Optional[QtTransport] = None
+        if network:
+            self.server = HttpServer(self)
+            self.server.route(r'/data/wow/token/index', self._serve_token_index, name='/data/wow/token/index')
+            self.server.start('127.0.0.1', 0)
+            base_url = f'http://127.0.0.1:{self.server.serverPort()}'
+            self.network_transport = QtTransport(self)
+
+        self.transport: Transport = self.network_transport or self.api
+        if replay is not None:
+            self.transport = ReplayTransport(replay, self.clock, speed=replay_speed, parent=self)
+        if faults:
+            self.transport = FaultInjectingTransport(
+                self.transport,
+                self.clock,
+                faults,
+                latency=latency,
+                seed=seed,
+                parent=self
+            )
+
+        app_settings = QSettings(str(directory / 'app.settings'), QSettings.Format.IniFormat)
+        user_settings = QSettings(str(directory / 'user.settings'), QSettings.Format.IniFormat)
+        user_settings.setValue(UserSettingsKeys.CLIENT_ID, 'simulated')
+        user_settings.setValue(UserSettingsKeys.CLIENT_SECRET, 'simulated')
+        user_settings.setValue(UserSettingsKeys.REGION, regions[0])
+        user_settings.setValue(UserSettingsKeys.TRACKED_REGIONS, list(regions[1:]))
+
+        self.worker = PriceCheckWorker(
+            base_url=base_url,
+            clock=self.clock,
+            transport=self.transport,
+            history=PriceHistory(directory / 'price_history.csv'),
+            settings=(app_settings, user_settings)
+        )
+        self.worker.setParent(self)
+        self.worker.region_price_updated.connect(self._on_region_price_updated)
+        self.worker.error.connect(self._on_worker_error)
+
+        self.result = SimulationResult()
+
+        self._last_updated: dict[str, int] = {}
+
+    def run(self, seconds: float) -> SimulationResult:
+        result = self.result
+        started_at = perf_counter()
+
+        # Exceptions raised in slots are reported to the excepthook instead of reaching the code that emitted the signal
+        excepthook = sys.excepthook
+        sys.excepthook = lambda *exc_info: result.exceptions.append(''.join(format_exception(*exc_info)))
+        try:
+            if not result.simulated_seconds:
+                self.worker.check_price()
+
+            # Advance a minute at a time so the request rate and failure streak can be sampled along the way
+            remaining = seconds
+            while remaining > 0:
+                step = min(remaining, 60.0)
+                sent = self.transport.sent
+                self._advance(step)
+                remaining -= step
+                result.max_requests_per_minute = max(result.max_requests_per_minute, self.transport.sent - sent)
+                result.max_consecutive_failures = max(result.max_consecutive_failures, self.worker.consecutive_failures)
+        finally:
+            sys.excepthook = excepthook
+
+        result.simulated_seconds += seconds
+        result.elapsed += perf_counter() - started_at
+        requests = self.api.requests
+        if isinstance(self.transport, ReplayTransport):
+            requests = self.transport.requests
+        result.requests = {
+            f'{endpoint} {status}': count for (endpoint, status), count in sorted(requests.items(), key=str)
+        }
+        if isinstance(self.transport, FaultInjectingTransport):
+            result.faults = dict(sorted(self.transport.injected.items()))
+
+        return result
+
+    def _advance(self, seconds: float):
+        if self.network_transport is None:
+            self.clock.advance(seconds)
+            return
+
+        # Let the replies of each poll finish before the next poll, as they would in real time
+        poll_interval = TIMER_INTERVAL / 1000
+        while seconds > 0:
+            self.clock.advance(min(seconds, poll_interval))
+            seconds -= poll_interval
+
+            while self.network_transport.in_flight:
+                QCoreApplication.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents)
+
+            # Delete the finished replies like returning to the event loop does
+            QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+
+    #region Handlers
+    def _serve_token_index(self, request: HttpRequest, match: Match) -> HttpResponse:
+        response = self.api.respond(Request(request.method, request.path, {
+            'Battlenet-Namespace': request.headers.get('battlenet-namespace', request.query.get('namespace', '')),
+        }))
+
+        return HttpResponse(response.status, response.body, use_etag=False)
+    #endregion
+
+    #region Signal Handlers
+    @Slot(str, int, int)
+    def _on_region_price_updated(self, region: str, price: int, last_updated: int):
+        result = self.result
+        result.price_updates += 1
+
+        if self._last_updated.get(region) != last_updated:
+            self._last_updated[region] = last_updated
+            result.new_prices += 1
+            result.max_update_lag = max(result.max_update_lag, round(self.clock.time() - last_updated, 3))
+
+    @Slot(str)
+    def _on_worker_error(self, error_message: str):
+        self.result.errors += 1
+    #endregion
+
+def simulate(args: list[str]) -> int:
+    """
+    Runs the worker against a fake Battle.net API in simulated time, prints the result and returns the process exit
+    code.
+    """
+    parser = ArgumentParser(
+        prog=f'{APP_NAME} simulate',
+        description='Replay polling against a fake Battle.net API in simulated time'
+    )
+    parser.add_argument('--duration', default='7d', help='how much time to simulate, such as 12h or 14d')
+    parser.add_argument('--region', default='us', help='comma-separated regions to poll, the first being the primary')
+    parser.add_argument('--latency', default='0.05s', help='the response time of the fake API')
+    parser.add_argument(
+        '--outage',
+        action='append',
+        default=[],
+        metavar='AT:DURATION',
+        help='make every request fail for DURATION starting AT into the simulation, such as 2d:3h (repeatable)'
+    )
+    parser.add_argument(
+        '--fault',
+        action='append',
+        default=[],
+        metavar='NAME[=PROBABILITY]',
+        help='inject a fault into requests, such as reset=0.05, or all for every fault (repeatable)'
+    )
+    parser.add_argument('--seed', type=int, default=0, help='the seed of the simulated prices and faults')
+    parser.add_argument(
+        '--replay',
+        type=Path,
+        metavar='PATH',
+        help='answer with the responses recorded to PATH by the app\'s --capture instead of the fake API'
+    )
+    parser.add_argument(
+        '--replay-speed',
+        type=float,
+        default=1.0,
+        metavar='FACTOR',
+        help='how many times faster than recorded replayed responses arrive (default: %(default)s)'
+    )
+    parser.add_argument('--format', choices=('text', 'json'), default='text', help='the output format')
+
+    options = parser.parse_args(args)
+
+    regions = parse_regions(options.region)
+    if regions is None:
+        parser.print_usage(sys.stderr)
+        print(f'{parser.prog}: error: unknown region in {options.region}', file=sys.stderr)
+        return ExitCode.Usage
+
+    try:
+        duration = parse_duration(options.duration)
+        latency = parse_duration(options.latency)
+        outages = tuple(_parse_outage(outage) for outage in options.outage)
+        faults = parse_faults(options.fault)
+        if options.replay_speed <= 0:
+            raise ValueError('--replay-speed must be above 0')
+        replay = load_exchanges(options.replay) if options.replay is not None else None
+    except (OSError, ValueError) as e:
+        parser.print_usage(sys.stderr)
+        print(f'{parser.prog}: error: {e}', file=sys.stderr)
+        return ExitCode.Usage
+
+    app = QCoreApplication.instance() or QCoreApplication([APP_NAME])
+
+    with TemporaryDirectory(prefix=f'{APP_NAME}-simulation-') as directory:
+        simulation = Simulation(
+            Path(directory),
+            regions=tuple(regions),
+            latency=latency,
+            outages=outages,
+            seed=options.seed,
+            faults=faults,
+            replay=replay,
+            replay_speed=options.replay_speed
+        )
+        result = simulation.run(duration)
+        simulation.deleteLater()
+        app.processEvents()
+
+    if options.format == 'json':
+        print(dumps(result.to_dict()))
+    else:
+        for name, value in result.to_dict().items():
+            print(f'{name}: {value}')
+
+    return ExitCode.Success
+
+def _parse_outage(value: str) -> tuple[float, float]:
+    at, _, duration = value.partition(':')
+    start = parse_duration(at)
+
+    return start, start + parse_duration(duration)
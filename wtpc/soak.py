@@ -0,0 +1,241 @@
+import gc
+import sys
+import tracemalloc
+from json import dumps
+from pathlib import Path
+from argparse import ArgumentParser
+from tempfile import TemporaryDirectory
+from wtpc import APP_NAME
+from wtpc.event_log import event_log
+from wtpc.simulation import Simulation
+from wtpc.alert_rules import parse_duration
+from wtpc.cli import ExitCode, parse_regions
+from PySide6.QtCore import QCoreApplication
+from wtpc.price_check_worker import TIMER_INTERVAL
+from wtpc.faults import DEFAULT_FAULTS, parse_faults
+from wtpc.resource_usage import current_rss, count_qobjects, count_connections
+
+WARM_UP_SHARE = 0.1
+MAX_RATE_FACTOR = 1.5
+
+# How much each sampled series may grow after warming up before growth in every sample counts as a leak
+LEAK_TOLERANCES = {
+    'traced_memory': 64 * 1024,
+    'qobjects': 0,
+    'connections': 0,
+    'rss': 4 * 1024 * 1024,
+}
+
+class SoakSample:
+    __slots__ = ('simulated_seconds', 'traced_memory', 'qobjects', 'qobject_classes', 'connections', 'rss')
+
+    def __init__(
+            self,
+            simulated_seconds: float,
+            traced_memory: int,
+            qobject_classes: dict[str, int],
+            connections: int,
+            rss: int
+    ):
+        self.simulated_seconds = simulated_seconds
+        self.traced_memory = traced_memory
+        self.qobjects = sum(qobject_classes.values())
+        self.qobject_classes = qobject_classes
+        self.connections = connections
+        self.rss = rss
+
+    @classmethod
+    def take(cls, simulation: Simulation) -> 'SoakSample':
+        gc.collect()
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+        traced_memory = sum(stat.size for stat in snapshot.statistics('filename'))
+
+        # The price history is meant to grow, so its samples don't count towards the traced memory
+        for region in simulation.worker.history.regions():
+            series = simulation.worker.history.series(region)
+            traced_memory -= sys.getsizeof(series.timestamps) + sys.getsizeof(series.prices)
+            traced_memory -= sum(map(sys.getsizeof, series.prices))
+
+        # So is the event log until it's full
+        traced_memory -= sys.getsizeof(event_log.records) + sum(map(sys.getsizeof, event_log.records))
+
+        return cls(
+            simulation.result.simulated_seconds,
+            traced_memory,
+            dict(count_qobjects(simulation)),
+            count_connections(simulation),
+            current_rss() or 0
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            'simulated_seconds': self.simulated_seconds,
+            'traced_memory': self.traced_memory,
+            'qobjects': self.qobjects,
+            'qobject_classes': self.qobject_classes,
+            'connections': self.connections,
+            'rss': self.rss,
+        }
+
+class SoakCheck:
+    __slots__ = ('name', 'passed', 'detail')
+
+    def __init__(self, name: str, passed: bool, detail: str):
+        self.name = name
+        self.passed = passed
+        self.detail = detail
+
+def soak(args: list[str]) -> int:
+    """
+    Runs the worker against a misbehaving fake Battle.net API in simulated time and checks that it holds up: no
+    exception escapes a slot, requests are never sent much faster than normal polling would, and memory stops growing
+    once warmed up. Returns `ExitCode.CheckFailed` if any check fails.
+
+    After warming up, the traced memory, live Qt objects, signal connections and resident memory are sampled at even
+    intervals, and a series that grows from every sample to the next by more than its tolerance overall is reported as
+    a leak.
+    """
+    parser = ArgumentParser(
+        prog=f'{APP_NAME} soak',
+        description='Check that polling holds up against injected faults in simulated time'
+    )
+    length = parser.add_mutually_exclusive_group()
+    length.add_argument('--duration', default='2d', help='how much time to simulate, such as 12h or 14d')
+    length.add_argument('--cycles', type=int, help='how many poll cycles to simulate instead of a duration')
+    parser.add_argument(
+        '--region',
+        default='us,eu',
+        help='comma-separated regions to poll, the first being the primary'
+    )
+    parser.add_argument(
+        '--fault',
+        action='append',
+        default=[],
+        metavar='NAME[=PROBABILITY]',
+        help='a fault to inject, such as reset=0.05 (repeatable, default: every fault)'
+    )
+    parser.add_argument('--seed', type=int, default=0, help='the seed of the simulated prices and faults')
+    parser.add_argument(
+        '--network',
+        action='store_true',
+        help='poll the fake API over loopback HTTP so replies go through Qt\'s network stack (much slower)'
+    )
+    parser.add_argument(
+        '--samples',
+        type=int,
+        default=10,
+        help='how many times to sample memory and objects after warming up (default: %(default)s)'
+    )
+    parser.add_argument(
+        '--max-memory-growth',
+        type=int,
+        default=256,
+        metavar='KIB',
+        help='the traced memory allowed to be gained after warming up (default: %(default)s)'
+    )
+    parser.add_argument('--format', choices=('text', 'json'), default='text', help='the output format')
+
+    options = parser.parse_args(args)
+
+    regions = parse_regions(options.region)
+    if regions is None:
+        parser.print_usage(sys.stderr)
+        print(f'{parser.prog}: error: unknown region in {options.region}', file=sys.stderr)
+        return ExitCode.Usage
+
+    if options.samples < 1:
+        parser.print_usage(sys.stderr)
+        print(f'{parser.prog}: error: --samples must be at least 1', file=sys.stderr)
+        return ExitCode.Usage
+
+    try:
+        duration = options.cycles * TIMER_INTERVAL / 1000 if options.cycles else parse_duration(options.duration)
+        faults = parse_faults(options.fault) if options.fault else dict(DEFAULT_FAULTS)
+    except ValueError as e:
+        parser.print_usage(sys.stderr)
+        print(f'{parser.prog}: error: {e}', file=sys.stderr)
+        return ExitCode.Usage
+
+    app = QCoreApplication.instance() or QCoreApplication([APP_NAME])
+
+    samples: list[SoakSample] = []
+    tracemalloc.start()
+    try:
+        with TemporaryDirectory(prefix=f'{APP_NAME}-soak-') as directory:
+            simulation = Simulation(
+                Path(directory),
+                regions=tuple(regions),
+                seed=options.seed,
+                faults=faults,
+                network=options.network
+            )
+
+            # Caches, metric labels and connection pools fill up early on, so only growth after that counts
+            warm_up = duration * WARM_UP_SHARE
+            simulation.run(warm_up)
+            samples.append(SoakSample.take(simulation))
+
+            for _ in range(options.samples):
+                simulation.run((duration - warm_up) / options.samples)
+                samples.append(SoakSample.take(simulation))
+
+            result = simulation.result
+
+            simulation.deleteLater()
+            app.processEvents()
+    finally:
+        tracemalloc.stop()
+
+    first, last = samples[0], samples[-1]
+    max_memory_growth = options.max_memory_growth * 1024
+    max_requests_per_minute = int(60_000 / TIMER_INTERVAL * len(regions) * MAX_RATE_FACTOR)
+    checks = [
+        SoakCheck(
+            'exceptions',
+            not result.exceptions,
+            f'{len(result.exceptions)} exception(s) escaped a slot'
+        ),
+        SoakCheck(
+            'request_rate',
+            result.max_requests_per_minute <= max_requests_per_minute,
+            f'at most {result.max_requests_per_minute} requests per minute (limit {max_requests_per_minute})'
+        ),
+        SoakCheck(
+            'memory',
+            last.traced_memory - first.traced_memory <= max_memory_growth,
+            f'{(last.traced_memory - first.traced_memory) / 1024:+.1f} KiB traced after warming up '
+            f'(limit {options.max_memory_growth} KiB)'
+        ),
+    ]
+    for series, tolerance in LEAK_TOLERANCES.items():
+        values = [getattr(sample, series) for sample in samples]
+        is_steady = all(b >= a for a, b in zip(values, values[1:]))
+        if values[-1] == values[0]:
+            trend = f'stayed at {values[0]:,}'
+        else:
+            trend = f'{"grew steadily" if is_steady else "fluctuated"} from {values[0]:,} to {values[-1]:,}'
+        checks.append(SoakCheck(
+            f'{series}_leak',
+            not is_steady or values[-1] - values[0] <= tolerance,
+            f'{trend} (tolerance {tolerance:,})'
+        ))
+
+    if options.format == 'json':
+        print(dumps({
+            'result': result.to_dict(),
+            'samples': [sample.to_dict() for sample in samples],
+            'checks': {check.name: {'passed': check.passed, 'detail': check.detail} for check in checks},
+        }))
+    else:
+        for name, value in result.to_dict().items():
+            if name != 'exceptions':
+                print(f'{name}: {value}')
+        for sample in samples:
+            print(' '.join(f'{name}={value}' for name, value in sample.to_dict().items() if name != 'qobject_classes'))
+        for exception in result.exceptions[:3]:
+            print(exception, file=sys.stderr)
+        for check in checks:
+            print(f'{"PASS" if check.passed else "FAIL"} {check.name}: {check.detail}')
+
+    return ExitCode.Success if all(check.passed for check in checks) else ExitCode.CheckFailed
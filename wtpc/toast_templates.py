@@ -0,0 +1,64 @@
+from pathlib import Path
+from typing import Optional
+from xml.sax.saxutils import escape
+from xml.etree.ElementTree import Element, tostring, SubElement
+
+TITLE_PLACEHOLDER = '\x00title\x00'
+MESSAGE_PLACEHOLDER = '\x00message\x00'
+
+class ToastTemplate:
+    """
+    A toast layout compiled once into XML.
+
+    `binding_xml` uses WinRT data binding expressions (`{title}` and `{message}`) so a single parsed `XmlDocument` can
+    be shared by every toast with this layout, and `render` substitutes escaped text into the precompiled XML for
+    backends that need the full document.
+    """
+    def __init__(self, has_message: bool, image_src: Optional[str]):
+        self.has_message = has_message
+        self.image_src = image_src
+
+        toast_xml = Element('toast', {'launch': 'default'})
+        visual_xml = SubElement(toast_xml, 'visual')
+        binding_xml = SubElement(visual_xml, 'binding', {'template': 'ToastGeneric'})
+
+        title_xml = SubElement(binding_xml, 'text')
+        title_xml.text = TITLE_PLACEHOLDER
+
+        if has_message:
+            message_xml = SubElement(binding_xml, 'text')
+            message_xml.text = MESSAGE_PLACEHOLDER
+
+        if image_src is not None:
+            SubElement(binding_xml, 'image', {'placement': 'hero', 'src': image_src})
+
+        xml = tostring(toast_xml, encoding='unicode')
+
+        self.binding_xml = xml.replace(TITLE_PLACEHOLDER, '{title}').replace(MESSAGE_PLACEHOLDER, '{message}')
+
+        self._prefix, rest = xml.split(TITLE_PLACEHOLDER)
+        if has_message:
+            self._middle, self._suffix = rest.split(MESSAGE_PLACEHOLDER)
+        else:
+            self._middle, self._suffix = rest, ''
+
+    def render(self, title: str, message: Optional[str] = None) -> str:
+        if self.has_message:
+            return self._prefix + escape(title) + self._middle + escape(message or '') + self._suffix
+
+        return self._prefix + escape(title) + self._middle
+
+_templates: dict[tuple[bool, Optional[str]], ToastTemplate] = {}
+
+def get_toast_template(*, has_message: bool, image_path: Optional[Path] = None) -> ToastTemplate:
+    """
+    Returns the compiled template for a layout, compiling it on first use.
+    """
+    key = (has_message, str(image_path) if image_path is not None else None)
+
+    template = _templates.get(key)
+    if template is None:
+        template = ToastTemplate(*key)
+        _templates[key] = template
+
+    return template
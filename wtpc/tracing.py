@@ -0,0 +1,197 @@
+from os import urandom
+from pathlib import Path
+from json import dumps
+from time import time_ns
+from collections import deque
+from typing import Any, Optional, TextIO
+from wtpc.metrics import metrics
+from PySide6.QtCore import SLOT, Slot, SIGNAL, QObject
+from PySide6.QtNetwork import QNetworkReply, QNetworkRequest
+
+MAX_COLLECTED_SPANS = 1024
+
+PHASE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+request_phase_histogram = metrics.histogram(
+    'wtpc_request_phase_seconds',
+    'Time spent in each phase of the requests sent to Battle.net',
+    ('phase',),
+    buckets=PHASE_BUCKETS
+)
+
+class Span:
+    """
+    A timed operation, recorded in the shape of an OpenTelemetry span.
+    """
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_span_id', 'start_ns', 'end_ns', 'attributes')
+
+    def __init__(
+            self,
+            name: str,
+            trace_id: str,
+            start_ns: int,
+            end_ns: int,
+            *,
+            parent_span_id: Optional[str] = None,
+            attributes: Optional[dict[str, Any]] = None
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.start_ns = start_ns
+        self.end_ns = end_ns
+        self.attributes = attributes or {}
+
+    @property
+    def duration(self) -> float:
+        return (self.end_ns - self.start_ns) / 1_000_000_000
+
+    def to_record(self) -> dict[str, Any]:
+        return {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_span_id or '',
+            'name': self.name,
+            'startTimeUnixNano': self.start_ns,
+            'endTimeUnixNano': self.end_ns,
+            'attributes': self.attributes,
+        }
+
+class SpanCollector:
+    """
+    Keeps the most recent spans in memory and, once `export_to` is called, appends every finished trace to a JSON Lines
+    file with one span record per line.
+    """
+    def __init__(self, max_spans: int = MAX_COLLECTED_SPANS):
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+
+        self._file: Optional[TextIO] = None
+
+    def export_to(self, path: Path) -> None:
+        self.close()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = path.open('a', encoding='utf-8')
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def collect(self, spans: list[Span]) -> None:
+        self.spans.extend(spans)
+
+        if self._file is not None:
+            self._file.write(''.join(dumps(span.to_record()) + '\n' for span in spans))
+            self._file.flush()
+
+class RequestTrace(QObject):
+    """
+    Timestamps the progress of a network reply from its signals and records it as a span for the whole request with
+    a child span for each phase when the reply finishes:
+
+    - `queue`: waiting before a new connection is opened
+    - `connect`: opening the connection, which covers the DNS lookup, the TCP handshake and, for HTTPS, the TLS
+      handshake, as Qt doesn't signal the boundaries between them (without TLS it also covers writing the request)
+    - `send`: writing the request
+    - `ttfb`: waiting for the response headers
+    - `download`: reading the response body
+
+    Requests sent over a reused keep-alive connection have no `queue` or `connect` phase, and their `send` phase
+    includes any time spent waiting for the connection.
+
+    The trace is parented to the reply, so it lives exactly as long as the reply.
+    """
+    def __init__(self, name: str, reply: QNetworkReply, attributes: dict[str, Any], collector: SpanCollector):
+        super().__init__(reply)
+
+        self.name = name
+        self.reply = reply
+        self.attributes = attributes
+        self.collector = collector
+
+        self.started_at = time_ns()
+        self.connecting_at = 0
+        self.encrypted_at = 0
+        self.sent_at = 0
+        self.headers_at = 0
+
+        # Connecting through the signatures keeps the connections in Qt. Connecting the signal instances keeps every
+        # reply's wrapper alive after the reply is deleted
+        QObject.connect(reply, SIGNAL('socketStartedConnecting()'), self, SLOT('_on_socket_started_connecting()'))
+        QObject.connect(reply, SIGNAL('encrypted()'), self, SLOT('_on_encrypted()'))
+        QObject.connect(reply, SIGNAL('requestSent()'), self, SLOT('_on_request_sent()'))
+        QObject.connect(reply, SIGNAL('metaDataChanged()'), self, SLOT('_on_meta_data_changed()'))
+        QObject.connect(reply, SIGNAL('finished()'), self, SLOT('_on_finished()'))
+
+    #region Signal Handlers
+    @Slot()
+    def _on_socket_started_connecting(self):
+        if not self.connecting_at:
+            self.connecting_at = time_ns()
+
+    @Slot()
+    def _on_encrypted(self):
+        self.encrypted_at = time_ns()
+
+    @Slot()
+    def _on_request_sent(self):
+        self.sent_at = time_ns()
+
+    @Slot()
+    def _on_meta_data_changed(self):
+        if not self.headers_at:
+            self.headers_at = time_ns()
+
+    @Slot()
+    def _on_finished(self):
+        finished_at = time_ns()
+        reply = self.reply
+
+        status_code = reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+        attributes = self.attributes
+        attributes['http.response.status_code'] = status_code
+        attributes['network.connection.reused'] = bool(self.sent_at) and not self.connecting_at
+        if reply.error() != QNetworkReply.NetworkError.NoError:
+            attributes['error.type'] = reply.error().name
+
+        trace_id = urandom(16).hex()
+        root = Span(self.name, trace_id, self.started_at, finished_at, attributes=attributes)
+        spans = [root]
+
+        # Each phase ends where the next one starts
+        observed = []
+        if self.connecting_at:
+            observed.append(('queue', self.started_at))
+            observed.append(('connect', self.connecting_at))
+            if self.encrypted_at:
+                observed.append(('send', self.encrypted_at))
+        elif self.sent_at:
+            observed.append(('send', self.started_at))
+        else:
+            # Failed before a connection was even opened, such as when the host name doesn't resolve
+            observed.append(('queue', self.started_at))
+        if self.sent_at:
+            observed.append(('ttfb', self.sent_at))
+        if self.headers_at:
+            observed.append(('download', self.headers_at))
+
+        for i, (phase, start) in enumerate(observed):
+            end = observed[i + 1][1] if i + 1 < len(observed) else finished_at
+            span = Span(phase, trace_id, start, end, parent_span_id=root.span_id)
+            spans.append(span)
+            request_phase_histogram.labels(phase).observe(span.duration)
+
+        request_phase_histogram.labels('total').observe(root.duration)
+
+        self.collector.collect(spans)
+    #endregion
+
+span_collector = SpanCollector()
+
+def trace_reply(name: str, reply: QNetworkReply, attributes: dict[str, Any]) -> RequestTrace:
+    """
+    Records the timings of a reply into the app's span collector once it finishes.
+    """
+    return RequestTrace(name, reply, attributes, span_collector)
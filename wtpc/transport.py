@@ -0,0 +1,103 @@
+from typing import Optional
+from wtpc.tracing import trace_reply
+from PySide6.QtCore import Slot, QUrl, Signal, QObject, QByteArray
+from PySide6.QtNetwork import QNetworkReply, QNetworkRequest, QNetworkAccessManager
+
+class Request:
+    __slots__ = ('method', 'url', 'headers', 'body')
+
+    def __init__(self, method: str, url: str, headers: Optional[dict[str, str]] = None, body: bytes = b''):
+        self.method = method
+        self.url = url
+        self.headers = headers or {}
+        self.body = body
+
+class Response:
+    """
+    The outcome of a `Request`. `status` is `None` when no HTTP response was received at all, in which case `error`
+    describes what went wrong. Header names are lowercase.
+    """
+    __slots__ = ('request', 'status', 'headers', 'body', 'error')
+
+    def __init__(
+            self,
+            request: Request,
+            status: Optional[int],
+            *,
+            headers: Optional[dict[str, str]] = None,
+            body: bytes = b'',
+            error: str = ''
+    ):
+        self.request = request
+        self.status = status
+        self.headers = headers or {}
+        self.body = body
+        self.error = error
+
+class Transport(QObject):
+    """
+    Sends requests and emits their responses through `finished`, in whatever order they complete.
+    """
+    finished = Signal(object)
+
+    def send(self, request: Request) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """
+        Releases anything the transport keeps open, such as files.
+        """
+
+class QtTransport(Transport):
+    """
+    Sends requests over the network with a `QNetworkAccessManager`, tracing each of them.
+    """
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+
+        self.network_manager = QNetworkAccessManager(self)
+        self.network_manager.finished.connect(self._on_network_manager_finished)
+
+        self.sent = 0
+
+        self._requests: dict[QNetworkReply, Request] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._requests)
+
+    def send(self, request: Request) -> None:
+        self.sent += 1
+
+        url = QUrl(request.url)
+        req = QNetworkRequest(url)
+        for name, value in request.headers.items():
+            req.setRawHeader(name.encode('utf-8'), value.encode('utf-8'))
+
+        if request.method == 'POST':
+            reply = self.network_manager.post(req, QByteArray(request.body))
+        else:
+            reply = self.network_manager.get(req)
+
+        self._requests[reply] = request
+
+        attributes = {'http.request.method': request.method, 'url.full': request.url}
+        if 'Battlenet-Namespace' in request.headers:
+            attributes['wtpc.region'] = request.headers['Battlenet-Namespace']
+        trace_reply(f'{request.method} {url.path()}', reply, attributes)
+
+    #region Signal Handlers
+    @Slot(QNetworkReply)
+    def _on_network_manager_finished(self, reply: QNetworkReply):
+        reply.deleteLater()
+
+        request = self._requests.pop(reply)
+        status = reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+        headers = {
+            name.data().decode('latin-1').lower(): value.data().decode('latin-1')
+            for name, value in reply.rawHeaderPairs()
+        }
+        error = reply.errorString() if reply.error() != QNetworkReply.NetworkError.NoError else ''
+
+        self.finished.emit(Response(request, status, headers=headers, body=reply.readAll().data(), error=error))
+    #endregion
@@ -0,0 +1,155 @@
+import sys
+from typing import Optional
+from wtpc import APP_DISPLAY_NAME
+from importlib import import_module
+from datetime import datetime, timedelta
+from PySide6.QtCore import Qt, Slot, QTimer
+from wtpc.pixmap_cache import pixmap_cache
+from wtpc.event_log import dump_event_log
+from wtpc.windows.main_window import MainWindow
+from PySide6.QtGui import QIcon, QFontDatabase
+from wtpc.price_check_worker import PriceCheckWorker
+from PySide6.QtWidgets import QMenu, QApplication, QSystemTrayIcon
+
+WINDOW_RESOURCE_MODULES = ('wtpc.fonts', 'wtpc.images')
+
+_are_window_resources_registered = False
+
+def register_window_resources() -> None:
+    """
+    Registers the fonts and images that are only needed while a window is open.
+    """
+    global _are_window_resources_registered
+    if _are_window_resources_registered:
+        return
+
+    for module_name in WINDOW_RESOURCE_MODULES:
+        # Importing a resource module registers its data, so only re-register modules that were imported before
+        is_imported = module_name in sys.modules
+        module = import_module(module_name)
+        if is_imported:
+            module.qInitResources()
+
+    _are_window_resources_registered = True
+
+def unregister_window_resources() -> None:
+    """
+    Drops the cached pixmaps and unregisters the resources registered by `register_window_resources`.
+    """
+    global _are_window_resources_registered
+    if not _are_window_resources_registered:
+        return
+
+    pixmap_cache.clear()
+    for module_name in WINDOW_RESOURCE_MODULES:
+        import_module(module_name).qCleanupResources()
+
+    _are_window_resources_registered = False
+
+class TrayIcon(QSystemTrayIcon):
+    """
+    Shows the current price and time until the next update in the tray, only creating the main window while it is
+    open.
+    """
+    _main_window: Optional[MainWindow] = None
+    _main_window_font_id = -1
+
+    def __init__(self, worker: PriceCheckWorker):
+        super().__init__(QIcon(':icons/icon.ico'))
+
+        self.worker = worker
+        self.worker.price_updated.connect(self._on_token_price_updated)
+        self.worker.error.connect(self._on_worker_error)
+
+        self.activated.connect(self._on_activated)
+
+        # Tooltip countdown timer setup, second precision is all it needs so let the OS batch its wakeups
+        self.tooltip_timer = QTimer(self)
+        self.tooltip_timer.setTimerType(Qt.TimerType.VeryCoarseTimer)
+        self.tooltip_timer.setInterval(1_000)
+        self.tooltip_timer.setSingleShot(False)
+        self.tooltip_timer.timeout.connect(self._update_tooltip)
+        self.tooltip_timer.start()
+
+        self.menu = QMenu()
+        self.menu.addAction('&Open', self.open_main_window)
+        self.menu.addAction('Save &Event Log', self._save_event_log)
+        self.menu.addSeparator()
+        self.menu.addAction('&Quit', QApplication.quit)
+        self.setContextMenu(self.menu)
+
+        self._error_message = ''
+        self._update_tooltip()
+
+    #region Signal Handlers
+    @Slot(int, int)
+    def _on_token_price_updated(self, price: int, last_updated: int):
+        self._error_message = ''
+        self._update_tooltip()
+
+    @Slot(str)
+    def _on_worker_error(self, error_message: str):
+        self._error_message = error_message
+        self._update_tooltip()
+
+    @Slot(QSystemTrayIcon.ActivationReason)
+    def _on_activated(self, reason: QSystemTrayIcon.ActivationReason):
+        if reason in (QSystemTrayIcon.ActivationReason.Trigger, QSystemTrayIcon.ActivationReason.DoubleClick):
+            self.open_main_window()
+
+    @Slot()
+    def _on_main_window_destroyed(self):
+        QFontDatabase.removeApplicationFont(self._main_window_font_id)
+
+        self._main_window = None
+        self._main_window_font_id = -1
+
+        unregister_window_resources()
+    #endregion
+
+    @Slot()
+    def open_main_window(self):
+        if self._main_window is None:
+            register_window_resources()
+
+            self._main_window = MainWindow(self.worker)
+            self._main_window.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+            self._main_window.destroyed.connect(self._on_main_window_destroyed)
+            self._main_window_font_id = self._main_window.font_id
+
+        self._main_window.show()
+        self._main_window.raise_()
+        self._main_window.activateWindow()
+
+    @Slot()
+    def _save_event_log(self):
+        try:
+            path = dump_event_log()
+        except OSError as e:
+            self.showMessage('Event Log', f'Could not save the event log: {e}', QSystemTrayIcon.MessageIcon.Warning)
+            return
+
+        self.showMessage('Event Log', f'Saved the event log to {path}', QSystemTrayIcon.MessageIcon.Information)
+
+    @Slot()
+    def _update_tooltip(self):
+        lines = [APP_DISPLAY_NAME]
+
+        latest_price = self.worker.latest_price
+        if latest_price is None:
+            lines.append('Loading...')
+        else:
+            price, last_updated = latest_price
+            lines.append(f'Current Price: {price:,}')
+
+            remaining = datetime.fromtimestamp(last_updated) + timedelta(minutes=20) - self.worker.clock.now()
+            remaining_seconds = int(remaining.total_seconds())
+            if remaining_seconds <= 0:
+                lines.append('Next Update: Soon™')
+            else:
+                lines.append(f'Next Update: {remaining_seconds // 60:02}:{remaining_seconds % 60:02}')
+
+        if self._error_message:
+            lines.append(self._error_message)
+
+        self.setToolTip('\n'.join(lines))
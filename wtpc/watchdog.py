@@ -0,0 +1,150 @@
+import sys
+from time import time, monotonic
+from collections import deque
+from typing import Any, Optional
+from traceback import format_stack
+from wtpc.metrics import metrics
+from wtpc.event_log import event_log
+from threading import Thread, Condition, get_ident
+from PySide6.QtCore import Qt, Slot, QTimer, QObject
+
+HEARTBEAT_INTERVAL = 200
+STALL_THRESHOLD = 0.25
+MAX_RECORDED_STALLS = 64
+# Heartbeats further apart than this are the system sleeping rather than the event loop stalling
+MAX_STALL_SECONDS = 60.0
+
+LAG_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+event_loop_lag_histogram = metrics.histogram(
+    'wtpc_event_loop_lag_seconds',
+    'How late the event loop ran each heartbeat of the stall watchdog',
+    buckets=LAG_BUCKETS
+)
+stall_counter = metrics.counter(
+    'wtpc_event_loop_stalls',
+    'Times the event loop was blocked for longer than the stall threshold'
+)
+
+class Stall:
+    __slots__ = ('started_at', 'duration', 'stack')
+
+    def __init__(self, started_at: float, duration: float, stack: list[str]):
+        self.started_at = started_at
+        self.duration = duration
+        self.stack = stack
+
+    def to_dict(self) -> dict[str, Any]:
+        return {'started_at': self.started_at, 'duration': self.duration, 'stack': ''.join(self.stack)}
+
+class StallWatchdog(QObject):
+    """
+    Detects the GUI thread being blocked long enough for the app to visibly freeze, and records what it was doing.
+
+    A heartbeat timer on the GUI thread records how late each beat ran into `wtpc_event_loop_lag_seconds`. A
+    background thread wakes once a beat is `threshold` seconds overdue and, if the GUI thread still hasn't run it,
+    captures the GUI thread's Python stack with `sys._current_frames`. When the event loop catches up, the stall is
+    counted and kept in `stalls` along with that stack.
+
+    The watchdog must be created on the GUI thread.
+    """
+    def __init__(
+            self,
+            parent: Optional[QObject] = None,
+            *,
+            threshold: float = STALL_THRESHOLD,
+            interval: int = HEARTBEAT_INTERVAL
+    ):
+        super().__init__(parent)
+
+        self.threshold = threshold
+        self.interval = interval
+        self.stalls: deque[Stall] = deque(maxlen=MAX_RECORDED_STALLS)
+
+        self.heartbeat_timer = QTimer(self)
+        self.heartbeat_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.heartbeat_timer.setInterval(interval)
+        self.heartbeat_timer.timeout.connect(self._on_heartbeat_timer_timeout)
+
+        self._gui_thread_id = get_ident()
+        self._last_beat = 0.0
+        self._stack: Optional[list[str]] = None
+        self._condition = Condition()
+        self._thread: Optional[Thread] = None
+        self._is_stopping = False
+
+    def start(self) -> None:
+        with self._condition:
+            self._last_beat = monotonic()
+            self._stack = None
+            self._is_stopping = False
+
+        self.heartbeat_timer.start()
+
+        if self._thread is None:
+            self._thread = Thread(target=self._run, name='wtpc-watchdog', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 1.0) -> None:
+        self.heartbeat_timer.stop()
+
+        with self._condition:
+            thread = self._thread
+            self._is_stopping = True
+            self._condition.notify()
+
+        if thread is not None:
+            thread.join(timeout)
+
+        self._thread = None
+
+    #region Signal Handlers
+    @Slot()
+    def _on_heartbeat_timer_timeout(self):
+        now = monotonic()
+        with self._condition:
+            lag = now - self._last_beat - self.interval / 1000
+            self._last_beat = now
+            stack, self._stack = self._stack, None
+
+        if lag > MAX_STALL_SECONDS:
+            return
+
+        lag = max(lag, 0.0)
+        event_loop_lag_histogram.observe(lag)
+
+        if lag >= self.threshold:
+            stall_counter.inc()
+            stall = Stall(time() - lag, lag, stack or [])
+            self.stalls.append(stall)
+            event_log.warning('event_loop_stalled', duration=round(lag, 3), stack=''.join(stall.stack))
+    #endregion
+
+    def _run(self):
+        with self._condition:
+            while not self._is_stopping:
+                # Once the stack of a stall has been captured, there's nothing to do until the event loop catches up
+                if self._stack is not None:
+                    self._condition.wait(self.threshold)
+                    continue
+
+                last_beat = self._last_beat
+                overdue_at = last_beat + self.interval / 1000 + self.threshold
+                now = monotonic()
+                if now < overdue_at:
+                    self._condition.wait(overdue_at - now)
+                    continue
+
+                frame = sys._current_frames().get(self._gui_thread_id)
+
+                # Formatting reads source files, so the heartbeat mustn't wait on it
+                self._condition.release()
+                try:
+                    stack = format_stack(frame) if frame is not None else []
+                finally:
+                    del frame
+                    self._condition.acquire()
+
+                # The stack is stale if the event loop caught up while it was being formatted
+                if self._last_beat == last_beat:
+                    self._stack = stack
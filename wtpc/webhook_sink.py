@@ -0,0 +1,239 @@
+import os
+from pathlib import Path
+from time import monotonic
+from typing import Optional
+from collections import deque
+from json import dumps, loads
+from wtpc.metrics import metrics
+from wtpc import REGIONS, WEBHOOK_QUEUE_PATH
+from wtpc.price_check_worker import PriceCheckWorker
+from wtpc.settings import user_settings, UserSettingsKeys
+from PySide6.QtCore import Slot, QUrl, QTimer, QObject, QByteArray
+from PySide6.QtNetwork import QNetworkReply, QNetworkRequest, QNetworkAccessManager
+
+BATCH_WINDOW = 1_000
+RETRY_BASE = 2.0
+RETRY_MAX = 5 * 60.0
+MAX_ATTEMPTS = 20
+MAX_QUEUED = 100
+
+webhook_delivery_counter = metrics.counter(
+    'wtpc_webhook_deliveries',
+    'Webhook delivery attempts by result',
+    ('result',)
+)
+
+class WebhookDelivery:
+    __slots__ = ('url', 'payload', 'attempts', 'next_attempt_at')
+
+    def __init__(self, url: str, payload: bytes, attempts: int = 0):
+        self.url = url
+        self.payload = payload
+        self.attempts = attempts
+        self.next_attempt_at = 0.0
+
+class WebhookSink(QObject):
+    """
+    Posts price changes to the webhook URLs from the settings.
+
+    Changes that arrive within `BATCH_WINDOW` milliseconds of each other, such as those of every tracked region from a
+    single poll, are sent as one payload. The payload has `content` and `text` summaries so Discord and Slack webhooks
+    accept it as is, along with the changes themselves under `events`.
+
+    Each URL has its own queue that is delivered in order, one request at a time. Failed deliveries are retried with
+    exponential backoff, honoring `Retry-After`, and every queue is mirrored to a file in the data directory so a
+    restart doesn't lose undelivered changes. Requests go through one `QNetworkAccessManager`, which keeps a pool of
+    keep-alive connections per host.
+    """
+    def __init__(self, worker: PriceCheckWorker, *, queue_path: Path = WEBHOOK_QUEUE_PATH):
+        super().__init__(worker)
+
+        self.worker = worker
+        self.worker.region_price_updated.connect(self._on_region_price_updated)
+
+        self.queue_path = queue_path
+
+        self.batch_timer = QTimer(self)
+        self.batch_timer.setSingleShot(True)
+        self.batch_timer.setInterval(BATCH_WINDOW)
+        self.batch_timer.timeout.connect(self._on_batch_timer_timeout)
+
+        self.retry_timer = QTimer(self)
+        self.retry_timer.setSingleShot(True)
+        self.retry_timer.timeout.connect(self._on_retry_timer_timeout)
+
+        self._network_manager: Optional[QNetworkAccessManager] = None
+        self._last_prices: dict[str, int] = {}
+        self._batch: dict[str, dict] = {}
+        self._queues: dict[str, deque[WebhookDelivery]] = {}
+        self._in_flight: set[str] = set()
+
+        metrics.callback(
+            'wtpc_webhook_queue_depth',
+            'Webhook deliveries waiting to be sent',
+            'gauge',
+            lambda: {(): sum(len(queue) for queue in self._queues.values())}
+        )
+
+        self._load_queues()
+        for url in self._queues:
+            self._send_next(url)
+
+    #region Signal Handlers
+    @Slot(str, int, int)
+    def _on_region_price_updated(self, region: str, price: int, last_updated: int):
+        previous_price = self._last_prices.get(region)
+        self._last_prices[region] = price
+
+        # Like notifications, the first price of each region after starting isn't a change
+        if previous_price is None or previous_price == price:
+            return
+
+        self._batch[region] = {
+            'region': region,
+            'price': price,
+            'previous_price': previous_price,
+            'last_updated': last_updated,
+        }
+        if not self.batch_timer.isActive():
+            self.batch_timer.start()
+
+    @Slot()
+    def _on_batch_timer_timeout(self):
+        events = list(self._batch.values())
+        self._batch.clear()
+
+        urls = user_settings.value(UserSettingsKeys.WEBHOOK_URLS, [], list)
+        if not urls:
+            return
+
+        summary = '\n'.join(
+            f'{REGIONS.get(event["region"], event["region"])}: {event["price"]:,} '
+            f'({event["price"] - event["previous_price"]:+,})'
+            for event in events
+        )
+        payload = dumps({'content': summary, 'text': summary, 'events': events}, separators=(',', ':')).encode('utf-8')
+
+        for url in urls:
+            queue = self._queues.setdefault(url, deque())
+            queue.append(WebhookDelivery(url, payload))
+            while len(queue) > MAX_QUEUED:
+                # The delivery being sent stays at the front until its reply is handled
+                if url in self._in_flight:
+                    del queue[1]
+                else:
+                    queue.popleft()
+                webhook_delivery_counter.labels('dropped').inc()
+
+        self._save_queues()
+
+        for url in urls:
+            self._send_next(url)
+
+    @Slot()
+    def _on_retry_timer_timeout(self):
+        for url in list(self._queues):
+            self._send_next(url)
+
+    @Slot(QNetworkReply)
+    def _on_network_manager_finished(self, reply: QNetworkReply):
+        reply.deleteLater()
+
+        url = reply.request().attribute(QNetworkRequest.Attribute.User)
+        self._in_flight.discard(url)
+
+        queue = self._queues.get(url)
+        if not queue:
+            return
+
+        delivery = queue[0]
+        status_code = reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+        if status_code is not None and 200 <= status_code < 300:
+            webhook_delivery_counter.labels('delivered').inc()
+            queue.popleft()
+        elif status_code is not None and 400 <= status_code < 500 and status_code not in (408, 429):
+            # The destination rejected the payload, so retrying won't help
+            webhook_delivery_counter.labels('rejected').inc()
+            queue.popleft()
+        else:
+            delivery.attempts += 1
+            if delivery.attempts >= MAX_ATTEMPTS:
+                webhook_delivery_counter.labels('dropped').inc()
+                queue.popleft()
+            else:
+                webhook_delivery_counter.labels('retried').inc()
+                delivery.next_attempt_at = monotonic() + self._get_retry_delay(reply, delivery.attempts)
+
+        if not queue:
+            del self._queues[url]
+
+        self._save_queues()
+        self._send_next(url)
+    #endregion
+
+    def _send_next(self, url: str):
+        queue = self._queues.get(url)
+        if not queue or url in self._in_flight:
+            return
+
+        delivery = queue[0]
+        delay = delivery.next_attempt_at - monotonic()
+        if delay > 0:
+            remaining = self.retry_timer.remainingTime() if self.retry_timer.isActive() else -1
+            if remaining < 0 or delay * 1000 < remaining:
+                self.retry_timer.start(int(delay * 1000) + 1)
+            return
+
+        req = QNetworkRequest(QUrl(url))
+        req.setHeader(QNetworkRequest.KnownHeaders.ContentTypeHeader, 'application/json')
+        req.setAttribute(QNetworkRequest.Attribute.User, url)
+
+        self._in_flight.add(url)
+        self._get_network_manager().post(req, QByteArray(delivery.payload))
+
+    def _get_network_manager(self) -> QNetworkAccessManager:
+        if self._network_manager is None:
+            self._network_manager = QNetworkAccessManager(self)
+            self._network_manager.finished.connect(self._on_network_manager_finished)
+
+        return self._network_manager
+
+    def _get_retry_delay(self, reply: QNetworkReply, attempts: int) -> float:
+        retry_after = reply.rawHeader('Retry-After').data().decode('latin-1').strip()
+        if retry_after.isdigit():
+            return min(float(retry_after), RETRY_MAX)
+
+        return min(RETRY_BASE * 2 ** min(attempts - 1, 16), RETRY_MAX)
+
+    def _load_queues(self):
+        if not self.queue_path.exists():
+            return
+
+        with self.queue_path.open('r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = loads(line)
+                    delivery = WebhookDelivery(record['url'], record['payload'].encode('utf-8'), record['attempts'])
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    continue
+
+                self._queues.setdefault(delivery.url, deque()).append(delivery)
+
+    def _save_queues(self):
+        if not self._queues:
+            self.queue_path.unlink(missing_ok=True)
+            return
+
+        # Write to a temporary file first so a crash never leaves a partially written queue behind
+        temp_path = self.queue_path.with_suffix('.tmp')
+        self.queue_path.parent.mkdir(parents=True, exist_ok=True)
+        with temp_path.open('w', encoding='utf-8') as f:
+            for queue in self._queues.values():
+                for delivery in queue:
+                    f.write(dumps({
+                        'url': delivery.url,
+                        'payload': delivery.payload.decode('utf-8'),
+                        'attempts': delivery.attempts,
+                    }) + '\n')
+
+        os.replace(temp_path, self.queue_path)
@@ -0,0 +1,69 @@
+from typing import Optional
+from wtpc.pixmap_cache import pixmap_cache
+from PySide6.QtWidgets import QFrame, QWidget
+from PySide6.QtCore import Qt, QSize, QEvent, QRectF
+from PySide6.QtGui import QColor, QPixmap, QPainter, QPaintEvent, QResizeEvent
+
+class BackgroundFrame(QFrame):
+    """
+    A frame that paints a static background image without going through the style engine.
+
+    The image is decoded once, composited onto an opaque backdrop at the screen's device pixel ratio and cached, so
+    repainting a child widget only blits the matching region of the cached layer.
+    """
+    def __init__(self, image: str, *, color: QColor = QColor(0, 0, 0), parent: Optional[QWidget] = None):
+        super().__init__(parent)
+
+        self.image = pixmap_cache.get(image)
+        self.color = color
+
+        self._layer: Optional[QPixmap] = None
+
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.setAttribute(Qt.WidgetAttribute.WA_NoSystemBackground)
+
+    #region Overrides
+    def paintEvent(self, event: QPaintEvent):
+        layer = self._get_layer()
+        target = QRectF(event.rect())
+        ratio = layer.devicePixelRatio()
+        source = QRectF(target.x() * ratio, target.y() * ratio, target.width() * ratio, target.height() * ratio)
+
+        painter = QPainter(self)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        painter.drawPixmap(target, layer, source)
+        painter.end()
+
+    def resizeEvent(self, event: QResizeEvent):
+        self._layer = None
+
+        super().resizeEvent(event)
+
+    def changeEvent(self, event: QEvent):
+        if event.type() == QEvent.Type.DevicePixelRatioChange:
+            self._layer = None
+
+        super().changeEvent(event)
+    #endregion
+
+    def _get_layer(self) -> QPixmap:
+        ratio = self.devicePixelRatioF()
+        if self._layer is not None and self._layer.devicePixelRatio() == ratio:
+            return self._layer
+
+        size = self.size()
+        layer = QPixmap(QSize(round(size.width() * ratio), round(size.height() * ratio)))
+        layer.setDevicePixelRatio(ratio)
+        layer.fill(self.color)
+
+        # Draw the image at its natural logical size like `background-repeat: no-repeat` did, but let the smooth
+        # scaling happen once here rather than on every paint.
+        image_size = self.image.deviceIndependentSize()
+        painter = QPainter(layer)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        painter.drawPixmap(QRectF(0, 0, image_size.width(), image_size.height()), self.image, QRectF(self.image.rect()))
+        painter.end()
+
+        self._layer = layer
+
+        return layer
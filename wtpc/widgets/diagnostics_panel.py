@@ -0,0 +1,155 @@
+from typing import Optional
+from PySide6.QtCore import Qt, Slot, QTimer
+from PySide6.QtGui import QShowEvent, QHideEvent
+from wtpc.metrics import metrics, HistogramValue
+from PySide6.QtWidgets import QLabel, QWidget, QFormLayout
+
+REFRESH_INTERVAL = 1_000
+
+ROWS = {
+    'polls': 'Polls',
+    'request_latency': 'Request Latency',
+    'poll_latency': 'Poll Cycle Latency',
+    'transferred': 'Transferred',
+    'backoff': 'Backoff',
+    'cache_hits': 'Cache Hit Ratios',
+    'stalls': 'Event Loop',
+    'memory': 'Memory',
+}
+
+class DiagnosticsPanel(QWidget):
+    """
+    Shows the performance counters from the app's metrics registry, refreshing them once a second while visible.
+
+    The metrics are kept up to date by the code they measure, so a refresh only reads a few values and formats them,
+    and nothing is refreshed while the panel is hidden.
+    """
+    def __init__(self, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setTimerType(Qt.TimerType.VeryCoarseTimer)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL)
+        self.refresh_timer.timeout.connect(self._on_refresh_timer_timeout)
+
+        layout = QFormLayout()
+        self.value_labels: dict[str, QLabel] = {}
+        for key, title in ROWS.items():
+            label = QLabel()
+            label.setWordWrap(True)
+            label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+            self.value_labels[key] = label
+            layout.addRow(title, label)
+
+        self.setLayout(layout)
+
+        self.refresh()
+
+    #region Signal Handlers
+    @Slot()
+    def _on_refresh_timer_timeout(self):
+        self.refresh()
+    #endregion
+
+    #region Overrides
+    def showEvent(self, event: QShowEvent):
+        self.refresh()
+        self.refresh_timer.start()
+
+        super().showEvent(event)
+
+    def hideEvent(self, event: QHideEvent):
+        self.refresh_timer.stop()
+
+        super().hideEvent(event)
+    #endregion
+
+    def refresh(self) -> None:
+        for key, text in self._format_counters().items():
+            label = self.value_labels[key]
+            if label.text() != text:
+                label.setText(text)
+
+    def _format_counters(self) -> dict[str, str]:
+        requests = _values('wtpc_upstream_requests')
+        token_requests = sum(value for (endpoint, _), value in requests.items() if endpoint == 'token')
+        failed_requests = sum(
+            value for (endpoint, status), value in requests.items() if endpoint == 'token' and status != '200'
+        )
+        poll_cycles = _histogram('wtpc_poll_cycle_seconds')
+        refreshes = _value('wtpc_oauth_refreshes')
+        polls = (
+            f'{poll_cycles.count if poll_cycles else 0:,} cycles, {token_requests:,.0f} price requests '
+            f'({failed_requests:,.0f} failed), {refreshes:,.0f} token refreshes'
+        )
+
+        consecutive_failures = _value('wtpc_consecutive_failures')
+        if consecutive_failures:
+            backoff = (
+                f'Retrying after {_value("wtpc_backoff_seconds"):,.0f} s, '
+                f'{consecutive_failures:,.0f} consecutive failures'
+            )
+        else:
+            backoff = 'Not backing off'
+
+        cache_lookups = {
+            'pixmaps': (_value('wtpc_pixmap_cache_lookups', 'hit'), _value('wtpc_pixmap_cache_lookups', 'miss')),
+            'proxy': (_value('wtpc_proxy_requests', 'hit'), _value('wtpc_proxy_requests', 'miss')),
+            # Clients that already have the latest response are sent a 304 Not Modified
+            'HTTP ETags': (_sum_by_status('wtpc_http_requests', '304'), _sum_by_status('wtpc_http_requests', '200')),
+        }
+        cache_hits = [
+            f'{name} {hits / (hits + misses):.0%}' for name, (hits, misses) in cache_lookups.items() if hits + misses
+        ]
+
+        lag = _histogram('wtpc_event_loop_lag_seconds')
+        stall_count = _value('wtpc_event_loop_stalls')
+        stalls = f'{stall_count:,.0f} {"stall" if stall_count == 1 else "stalls"}'
+        if lag is not None and lag.count:
+            stalls += f', {_format_seconds(lag.quantile(0.99))} p99 lag'
+
+        rss = _value('wtpc_resident_memory_bytes')
+
+        return {
+            'polls': polls,
+            'request_latency': _format_latency(_histogram('wtpc_request_phase_seconds', 'total')),
+            'poll_latency': _format_latency(poll_cycles),
+            'transferred': (
+                f'{_format_bytes(_value("wtpc_upstream_bytes", "received"))} received, '
+                f'{_format_bytes(_value("wtpc_upstream_bytes", "sent"))} sent'
+            ),
+            'backoff': backoff,
+            'cache_hits': ', '.join(cache_hits) or 'No lookups yet',
+            'stalls': stalls,
+            'memory': f'{_format_bytes(rss)} resident' if rss else 'Unknown',
+        }
+
+def _values(name: str) -> dict[tuple[str, ...], float]:
+    metric = metrics.get(name)
+    return metric.values() if metric is not None else {}
+
+def _value(name: str, *label_values: str) -> float:
+    return _values(name).get(label_values, 0.0)
+
+def _sum_by_status(name: str, status: str) -> float:
+    return sum(value for (_, value_status), value in _values(name).items() if value_status == status)
+
+def _histogram(name: str, *label_values: str) -> Optional[HistogramValue]:
+    return _values(name).get(label_values)
+
+def _format_latency(histogram: Optional[HistogramValue]) -> str:
+    if histogram is None or not histogram.count:
+        return 'No requests yet'
+
+    return f'{_format_seconds(histogram.mean)} average, {_format_seconds(histogram.quantile(0.99))} p99'
+
+def _format_seconds(seconds: float) -> str:
+    return f'{seconds * 1000:,.0f} ms' if seconds < 1 else f'{seconds:,.2f} s'
+
+def _format_bytes(size: float) -> str:
+    for unit in ('B', 'KiB', 'MiB'):
+        if size < 1024:
+            return f'{size:,.0f} {unit}' if unit == 'B' else f'{size:,.1f} {unit}'
+        size /= 1024
+
+    return f'{size:,.1f} GiB'
@@ -0,0 +1,343 @@
+from time import time
+from wtpc import REGIONS
+from typing import Optional
+from datetime import datetime
+from bisect import bisect_right
+from PySide6.QtWidgets import QWidget
+from PySide6.QtCore import Qt, Slot, QSize, QEvent, QRectF, QPointF
+from wtpc.price_history import PriceSeries, PriceHistory
+from PySide6.QtGui import (
+    QPen,
+    QFont,
+    QColor,
+    QPixmap,
+    QPainter,
+    QPolygonF,
+    QWheelEvent,
+    QPaintEvent,
+    QMouseEvent,
+    QPainterPath,
+    QResizeEvent,
+)
+
+REGION_COLORS = {
+    'dynamic-us': QColor('#4aa3ff'),
+    'dynamic-eu': QColor('#f7c948'),
+    'dynamic-kr': QColor('#5ad17a'),
+    'dynamic-tw': QColor('#ff6b6b'),
+}
+
+MIN_VIEW_SPAN = 60 * 60
+ZOOM_FACTOR = 0.8
+MARGIN = 8
+AXIS_WIDTH = 72
+AXIS_HEIGHT = 20
+
+def decimate(series: PriceSeries, start: float, end: float, width: int) -> list[tuple[float, int]]:
+    """
+    Reduces the samples between `start` and `end` to at most two points (the minimum and maximum, in the order they
+    occurred) per pixel column of a plot `width` pixels wide.
+
+    Returns `(x, price)` pairs where `x` is in pixels relative to the left edge of the plot. The samples just outside
+    the range are included, with `x` outside `[0, width]`, so lines continue to the plot edges.
+    """
+    if width <= 0 or end <= start or len(series) == 0:
+        return []
+
+    timestamps = series.timestamps
+    prices = series.prices
+    scale = width / (end - start)
+    first, last = series.index_range(start, end)
+
+    points = []
+    if first > 0:
+        points.append(((timestamps[first - 1] - start) * scale, prices[first - 1]))
+
+    index = first
+    column = 0
+    while index < last:
+        # Skip empty columns without scanning them one by one
+        column = max(column, int((timestamps[index] - start) * scale))
+        column_end = start + (column + 1) / scale
+        next_index = bisect_right(timestamps, column_end, index, last)
+
+        if next_index - index <= 2:
+            for i in range(index, next_index):
+                points.append(((timestamps[i] - start) * scale, prices[i]))
+        else:
+            chunk = prices[index:next_index]
+            low = min(chunk)
+            high = max(chunk)
+            x = column + 0.5
+            if chunk.index(low) < chunk.index(high):
+                points.append((x, low))
+                points.append((x, high))
+            else:
+                points.append((x, high))
+                points.append((x, low))
+
+        index = next_index
+        column += 1
+
+    if last < len(series):
+        points.append(((timestamps[last] - start) * scale, prices[last]))
+
+    return points
+
+class PriceChart(QWidget):
+    """
+    A line chart of the stored price history of every region.
+
+    Samples are decimated to a min/max envelope of the visible range and turned into `QPainterPath`s that are rendered
+    into a cached layer. The layer is only rebuilt when the view is panned, zoomed or resized or when a new sample lands
+    in view, so any other repaint is a single blit.
+    """
+    def __init__(self, history: PriceHistory, *, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+
+        self.history = history
+        self.history.sample_added.connect(self._on_history_sample_added)
+
+        self._view_start = 0.0
+        self._view_end = 0.0
+        self._follow_latest = True
+        self._drag_x: Optional[float] = None
+
+        self._paths: dict[str, QPainterPath] = {}
+        self._price_range = (0, 0)
+        self._layer: Optional[QPixmap] = None
+
+        self.setMinimumSize(320, 180)
+        self.setCursor(Qt.CursorShape.OpenHandCursor)
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+
+        self.reset_view()
+
+    #region Signal Handlers
+    @Slot(str, float, int)
+    def _on_history_sample_added(self, region: str, timestamp: float, price: int):
+        if self._follow_latest and timestamp > self._view_end:
+            span = self._view_end - self._view_start
+            self._view_end = timestamp
+            self._view_start = timestamp - span
+            self._invalidate()
+        elif self._view_start <= timestamp <= self._view_end:
+            self._invalidate()
+    #endregion
+
+    #region Overrides
+    def paintEvent(self, event: QPaintEvent):
+        layer = self._get_layer()
+        target = QRectF(event.rect())
+        ratio = layer.devicePixelRatio()
+        source = QRectF(target.x() * ratio, target.y() * ratio, target.width() * ratio, target.height() * ratio)
+
+        painter = QPainter(self)
+        painter.drawPixmap(target, layer, source)
+        painter.end()
+
+    def resizeEvent(self, event: QResizeEvent):
+        self._invalidate()
+
+        super().resizeEvent(event)
+
+    def changeEvent(self, event: QEvent):
+        if event.type() == QEvent.Type.DevicePixelRatioChange:
+            self._invalidate()
+
+        super().changeEvent(event)
+
+    def wheelEvent(self, event: QWheelEvent):
+        plot = self._plot_rect()
+        steps = event.angleDelta().y() / 120
+        if steps == 0 or plot.width() <= 0:
+            return
+
+        span = self._view_end - self._view_start
+        new_span = max(MIN_VIEW_SPAN, span * (ZOOM_FACTOR ** steps))
+        anchor_ratio = min(max((event.position().x() - plot.left()) / plot.width(), 0.0), 1.0)
+        anchor = self._view_start + span * anchor_ratio
+
+        self._set_view(anchor - new_span * anchor_ratio, anchor + new_span * (1 - anchor_ratio))
+
+        event.accept()
+
+    def mousePressEvent(self, event: QMouseEvent):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._drag_x = event.position().x()
+            self.setCursor(Qt.CursorShape.ClosedHandCursor)
+
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event: QMouseEvent):
+        plot = self._plot_rect()
+        if self._drag_x is not None and plot.width() > 0:
+            x = event.position().x()
+            shift = (self._drag_x - x) * (self._view_end - self._view_start) / plot.width()
+            self._drag_x = x
+            self._set_view(self._view_start + shift, self._view_end + shift)
+
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event: QMouseEvent):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._drag_x = None
+            self.setCursor(Qt.CursorShape.OpenHandCursor)
+
+        super().mouseReleaseEvent(event)
+
+    def mouseDoubleClickEvent(self, event: QMouseEvent):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.reset_view()
+
+        super().mouseDoubleClickEvent(event)
+    #endregion
+
+    def reset_view(self):
+        """
+        Shows every stored sample.
+        """
+        starts = []
+        ends = []
+        for region in self.history.regions():
+            series = self.history.series(region)
+            if len(series):
+                starts.append(series.timestamps[0])
+                ends.append(series.timestamps[-1])
+
+        end = max(ends, default=time())
+        start = min(starts, default=end - MIN_VIEW_SPAN)
+
+        self._follow_latest = True
+        self._view_start = min(start, end - MIN_VIEW_SPAN)
+        self._view_end = end
+        self._invalidate()
+
+    def _set_view(self, start: float, end: float):
+        latest = max((self.history.series(r).last_timestamp for r in self.history.regions()), default=end)
+
+        self._follow_latest = end >= latest
+        self._view_start = start
+        self._view_end = end
+        self._invalidate()
+
+    def _invalidate(self):
+        self._layer = None
+        self.update()
+
+    def _plot_rect(self) -> QRectF:
+        return QRectF(
+            MARGIN,
+            MARGIN,
+            max(self.width() - AXIS_WIDTH - MARGIN * 2, 0),
+            max(self.height() - AXIS_HEIGHT - MARGIN * 2, 0),
+        )
+
+    def _get_layer(self) -> QPixmap:
+        ratio = self.devicePixelRatioF()
+        if self._layer is not None and self._layer.devicePixelRatio() == ratio:
+            return self._layer
+
+        self._rebuild_paths()
+
+        layer = QPixmap(QSize(round(self.width() * ratio), round(self.height() * ratio)))
+        layer.setDevicePixelRatio(ratio)
+        layer.fill(QColor('#14100c'))
+
+        painter = QPainter(layer)
+        plot = self._plot_rect()
+        painter.setPen(QPen(QColor('#3a2f22'), 1))
+        painter.drawRect(plot)
+
+        if self._paths:
+            painter.save()
+            painter.setClipRect(plot)
+            painter.translate(plot.topLeft())
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            for region, path in self._paths.items():
+                painter.setPen(QPen(REGION_COLORS.get(region, QColor('#fff')), 1))
+                painter.drawPath(path)
+            painter.restore()
+
+            self._paint_axes(painter, plot)
+            self._paint_legend(painter, plot)
+        else:
+            painter.setPen(QColor('#fff'))
+            painter.drawText(plot, Qt.AlignmentFlag.AlignCenter, 'No price history yet')
+
+        painter.end()
+
+        self._layer = layer
+
+        return layer
+
+    def _rebuild_paths(self):
+        self._paths = {}
+
+        plot = self._plot_rect()
+        width = int(plot.width())
+        height = plot.height()
+
+        envelopes = {}
+        for region in self.history.regions():
+            points = decimate(self.history.series(region), self._view_start, self._view_end, width)
+            if points:
+                envelopes[region] = points
+
+        if not envelopes:
+            return
+
+        low = min(min(p for _, p in points) for points in envelopes.values())
+        high = max(max(p for _, p in points) for points in envelopes.values())
+        if high == low:
+            low -= 1
+            high += 1
+
+        padding = (high - low) * 0.05
+        low -= padding
+        high += padding
+        self._price_range = (low, high)
+
+        y_scale = height / (high - low)
+        for region, points in envelopes.items():
+            path = QPainterPath()
+            path.addPolygon(QPolygonF([QPointF(x, height - (p - low) * y_scale) for x, p in points]))
+            self._paths[region] = path
+
+    def _paint_axes(self, painter: QPainter, plot: QRectF):
+        low, high = self._price_range
+        font = QFont(painter.font())
+        font.setPointSize(8)
+        painter.setFont(font)
+        painter.setPen(QColor('#c8b89a'))
+
+        price_x = plot.right() + 6
+        painter.drawText(QRectF(price_x, plot.top(), AXIS_WIDTH, 14), Qt.AlignmentFlag.AlignLeft, f'{int(high):,}')
+        painter.drawText(
+            QRectF(price_x, plot.bottom() - 14, AXIS_WIDTH, 14),
+            Qt.AlignmentFlag.AlignLeft,
+            f'{int(low):,}'
+        )
+
+        date_format = '%Y-%m-%d %H:%M'
+        date_y = plot.bottom() + 4
+        half_width = plot.width() / 2
+        painter.drawText(
+            QRectF(plot.left(), date_y, half_width, 14),
+            Qt.AlignmentFlag.AlignLeft,
+            datetime.fromtimestamp(self._view_start).strftime(date_format)
+        )
+        painter.drawText(
+            QRectF(plot.left() + half_width, date_y, half_width, 14),
+            Qt.AlignmentFlag.AlignRight,
+            datetime.fromtimestamp(self._view_end).strftime(date_format)
+        )
+
+    def _paint_legend(self, painter: QPainter, plot: QRectF):
+        x = plot.left() + 6
+        y = plot.top() + 4
+        for region in self._paths:
+            painter.fillRect(QRectF(x, y + 4, 8, 8), REGION_COLORS.get(region, QColor('#fff')))
+            painter.setPen(QColor('#fff'))
+            painter.drawText(QRectF(x + 12, y, 120, 16), Qt.AlignmentFlag.AlignLeft, REGIONS.get(region, region))
+            y += 16
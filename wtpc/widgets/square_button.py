@@ -1,7 +1,8 @@
 from typing import Optional
+from wtpc.pixmap_cache import pixmap_cache
 from PySide6.QtCore import Qt, Slot, Signal
 from PySide6.QtWidgets import QLabel, QWidget
-from PySide6.QtGui import QPixmap, QShortcut, QMouseEvent, QKeySequence
+from PySide6.QtGui import QShortcut, QMouseEvent, QKeySequence
 
 class SquareButton(QLabel):
     clicked = Signal()
@@ -13,10 +14,10 @@ class SquareButton(QLabel):
             self.shortcut = QShortcut(QKeySequence(shortcut), self)
             self.shortcut.activated.connect(self._on_shortcut_activated)
 
-        self.up_image = QPixmap(':images/button_up.png')
-        self.down_image = QPixmap(':images/button_down.png')
-        self.disabled_image = QPixmap(':images/button_disabled.png')
-        self.icon_image = QPixmap(icon)
+        self.up_image = pixmap_cache.get(':images/button_up.png')
+        self.down_image = pixmap_cache.get(':images/button_down.png')
+        self.disabled_image = pixmap_cache.get(':images/button_disabled.png')
+        self.icon_image = pixmap_cache.get(icon)
 
         self.button_frame = QLabel(self)
         self.button_frame.setPixmap(self.up_image)
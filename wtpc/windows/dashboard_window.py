@@ -0,0 +1,53 @@
+from PySide6.QtGui import QIcon
+from PySide6.QtCore import Qt, QTimer
+from wtpc.pixmap_cache import pixmap_cache
+from wtpc.price_check_worker import PriceCheckWorker
+from PySide6.QtWidgets import QWidget, QTableView, QHeaderView, QVBoxLayout
+from wtpc.models.region_table_model import RegionColumn, RegionTableModel
+
+class DashboardWindow(QWidget):
+    def __init__(self, worker: PriceCheckWorker):
+        super().__init__()
+
+        self.model = RegionTableModel(worker.get_regions(), parent=self)
+        worker.region_price_updated.connect(self.model.update_price)
+        worker.region_error.connect(self.model.set_error)
+
+        # Countdown refresh timer setup
+        self.countdown_timer = QTimer(self)
+        self.countdown_timer.setInterval(1_000)
+        self.countdown_timer.setSingleShot(False)
+        self.countdown_timer.timeout.connect(self.model.refresh_countdowns)
+        self.countdown_timer.start()
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self._create_table_view())
+
+        self.setLayout(layout)
+        self.setWindowTitle('Dashboard')
+        self.setWindowIcon(QIcon(pixmap_cache.get(':images/dashboard.png')))
+        self.resize(720, 200)
+
+    #region UI Setup
+    def _create_table_view(self) -> QTableView:
+        self.table_view = QTableView()
+        self.table_view.setModel(self.model)
+        self.table_view.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table_view.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.table_view.setWordWrap(False)
+
+        # Fixed section sizes keep cell updates from triggering a relayout of the view
+        vertical_header = self.table_view.verticalHeader()
+        vertical_header.setVisible(False)
+        vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+
+        horizontal_header = self.table_view.horizontalHeader()
+        horizontal_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        horizontal_header.setSectionResizeMode(RegionColumn.Status, QHeaderView.ResizeMode.Stretch)
+        horizontal_header.setDefaultAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
+        horizontal_header.resizeSection(RegionColumn.Region, 120)
+        horizontal_header.resizeSection(RegionColumn.LastUpdated, 140)
+
+        return self.table_view
+    #endregion
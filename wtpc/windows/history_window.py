@@ -0,0 +1,20 @@
+from PySide6.QtGui import QIcon
+from wtpc.pixmap_cache import pixmap_cache
+from wtpc.price_history import price_history
+from wtpc.widgets.price_chart import PriceChart
+from PySide6.QtWidgets import QWidget, QVBoxLayout
+
+class HistoryWindow(QWidget):
+    def __init__(self):
+        super().__init__()
+
+        self.chart = PriceChart(price_history)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.chart)
+
+        self.setLayout(layout)
+        self.setWindowTitle('Price History')
+        self.setWindowIcon(QIcon(pixmap_cache.get(':images/chart.png')))
+        self.resize(800, 400)
@@ -1,13 +1,16 @@
+import sys
 from random import random
 from datetime import datetime, timedelta
-from wtpc.notifier import show_notification
 from wtpc.widgets.square_button import SquareButton
 from wtpc.price_check_worker import PriceCheckWorker
-from PySide6.QtCore import Qt, Slot, QTimer, QProcess
-from PySide6.QtGui import QFont, QIcon, QFontDatabase
+from PySide6.QtCore import Qt, Slot, QProcess
+from wtpc.event_log import dump_event_log
+from PySide6.QtGui import QFont, QIcon, QShortcut, QKeySequence, QCloseEvent, QFontDatabase
+from wtpc.windows.history_window import HistoryWindow
+from wtpc.windows.dashboard_window import DashboardWindow
 from wtpc.windows.settings_window import SettingsWindow
-from wtpc import APP_DISPLAY_NAME, NOTIFICATION_HERO_PATH
-from wtpc.settings import user_settings, UserSettingsKeys
+from wtpc.widgets.background_frame import BackgroundFrame
+from wtpc import APP_DISPLAY_NAME
 from PySide6.QtWidgets import (
     QLabel,
     QFrame,
@@ -15,39 +18,38 @@ from PySide6.QtWidgets import (
     QWidget,
     QHBoxLayout,
     QVBoxLayout,
+    QMessageBox,
     QSpacerItem,
     QSizePolicy,
     QApplication
 )
 
 class MainWindow(QWidget):
-    _first_check = True
-    _last_price = 0
     _next_update = 0
+    _history_window = None
+    _dashboard_window = None
 
-    def __init__(self):
+    def __init__(self, worker: PriceCheckWorker):
         super().__init__()
 
         # Worker setup
-        self.worker = PriceCheckWorker()
+        self.worker = worker
         self.worker.error.connect(self._on_worker_error)
         self.worker.price_updated.connect(self._on_token_price_updated)
 
         # Time display timer setup
-        self.next_update_timer = QTimer()
+        self.next_update_timer = self.worker.clock.create_timer()
         self.next_update_timer.setInterval(1_000)
         self.next_update_timer.setSingleShot(False)
         self.next_update_timer.timeout.connect(self._on_next_update_timer_timeout)
 
         # Load custom font
-        self.display_font = QFontDatabase.applicationFontFamilies(
-            QFontDatabase.addApplicationFont(':fonts/frizquadrata.ttf')
-        )
+        self.font_id = QFontDatabase.addApplicationFont(':fonts/frizquadrata.ttf')
+        self.display_font = QFontDatabase.applicationFontFamilies(self.font_id)
 
         # Create the main frame in which all other widgets are parented to
-        frame = QFrame(self)
+        frame = BackgroundFrame(':images/background.webp', parent=self)
         frame.setFixedSize(960, 540)
-        frame.setStyleSheet('background-image: url(:images/background.webp);background-repeat: no-repeat')
 
         # Create the layout within the frame
         layout = QVBoxLayout(frame)
@@ -65,8 +67,13 @@ class MainWindow(QWidget):
         self.setWindowIcon(QIcon(':icons/icon.ico'))
         self.setFixedSize(frame.size())
 
-        # Call the initial price check
-        self.worker.check_price()
+        # Dump the event log to a file without needing a console or the HTTP API
+        self.dump_log_shortcut = QShortcut(QKeySequence('Ctrl+Shift+L'), self)
+        self.dump_log_shortcut.activated.connect(self._on_dump_log_shortcut_activated)
+
+        # Show the last known price if the worker already has one
+        if self.worker.latest_price is not None:
+            self._on_token_price_updated(*self.worker.latest_price)
 
         # Start next update time display timer
         self.next_update_timer.start()
@@ -82,24 +89,13 @@ class MainWindow(QWidget):
 
         self._next_update = date + timedelta(minutes=20)
 
-        has_changed = self._last_price != price
-        should_notify = user_settings.value(UserSettingsKeys.SEND_NOTIFICATIONS, False, bool)
-
         self.status.setText(f'{price:,}')
         self.timestamp.setText(f'Updated: {date}')
         self.error_label.setText('')
 
-        if should_notify and has_changed and not self._first_check:
-            self._send_notification(f'Current Price: {price:,}')
-
-        if self._first_check:
-            self._first_check = False
-
-        self._last_price = price
-
     @Slot()
     def _on_next_update_timer_timeout(self):
-        now = datetime.now()
+        now = self.worker.clock.now()
         next_update_time_remaining = self._next_update - now
         next_update_total_seconds = int(next_update_time_remaining.total_seconds())
         next_update_minutes = next_update_total_seconds // 60
@@ -111,25 +107,71 @@ class MainWindow(QWidget):
         else:
             self.setWindowTitle(f'[{next_update_minutes:02}:{next_update_seconds:02}] {APP_DISPLAY_NAME}')
 
+    @Slot()
+    def _on_dump_log_shortcut_activated(self):
+        try:
+            path = dump_event_log()
+        except OSError as e:
+            QMessageBox.warning(self, 'Event Log', f'Could not save the event log: {e}')
+            return
+
+        QMessageBox.information(self, 'Event Log', f'Saved the event log to {path}')
+
+    @Slot()
+    def _on_history_button_clicked(self):
+        if self._history_window is None:
+            self._history_window = HistoryWindow()
+
+        self._history_window.show()
+        self._history_window.raise_()
+        self._history_window.activateWindow()
+
+    @Slot()
+    def _on_dashboard_button_clicked(self):
+        if self._dashboard_window is None:
+            self._dashboard_window = DashboardWindow(self.worker)
+
+        self._dashboard_window.show()
+        self._dashboard_window.raise_()
+        self._dashboard_window.activateWindow()
+
     @Slot()
     def _on_settings_button_clicked(self):
         sw = SettingsWindow()
         if sw.exec() == QDialog.DialogCode.Accepted:
             if sw.should_restart:
-                args = QApplication.arguments()
+                # Qt only keeps the arguments the app's own options left over, so relaunch with all of them
+                args = list(sys.argv)
                 QApplication.quit()
                 QProcess.startDetached(args[0], args)
     #endregion
 
+    #region Overrides
+    def closeEvent(self, event: QCloseEvent):
+        for window in (self._history_window, self._dashboard_window):
+            if window is not None:
+                window.close()
+
+        super().closeEvent(event)
+    #endregion
+
     #region UI Setup
     def _create_header_controls(self, parent: QFrame) -> QWidget:
         widget = QWidget(parent)
         layout = QHBoxLayout()
 
+        self.history_button = SquareButton(':images/chart.png', shortcut='ALT+H')
+        self.history_button.clicked.connect(self._on_history_button_clicked)
+
+        self.dashboard_button = SquareButton(':images/dashboard.png', shortcut='ALT+D')
+        self.dashboard_button.clicked.connect(self._on_dashboard_button_clicked)
+
         self.settings_button = SquareButton(':images/options.png', shortcut='ALT+S')
         self.settings_button.clicked.connect(self._on_settings_button_clicked)
 
         layout.addSpacerItem(QSpacerItem(0, 16, QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum))
+        layout.addWidget(self.history_button)
+        layout.addWidget(self.dashboard_button)
         layout.addWidget(self.settings_button)
 
         widget.setLayout(layout)
@@ -161,5 +203,3 @@ class MainWindow(QWidget):
         return self.error_label
     #endregion
 
-    def _send_notification(self, message: str) -> None:
-        show_notification(title = message, image_path=NOTIFICATION_HERO_PATH)
@@ -1,7 +1,11 @@
 from PySide6.QtCore import Qt, Slot
+from wtpc.pixmap_cache import pixmap_cache
+from html import escape
+from wtpc.alert_rules import DEFAULT_ALERT_RULES, parse_rule
 from wtpc.widgets.groupbox import GroupBox
+from wtpc.widgets.diagnostics_panel import DiagnosticsPanel
 from PySide6.QtGui import QIcon, QCloseEvent
-from wtpc import GITHUB_URL, VERSION_STRING, APP_DISPLAY_NAME
+from wtpc import REGIONS, GITHUB_URL, VERSION_STRING, APP_DISPLAY_NAME
 from wtpc.settings import app_settings, user_settings, AppSettingsKeys, UserSettingsKeys
 from PySide6.QtWidgets import (
     QLabel,
@@ -10,6 +14,7 @@ from PySide6.QtWidgets import (
     QLineEdit,
     QCheckBox,
     QComboBox,
+    QTabWidget,
     QMessageBox,
     QVBoxLayout,
     QHBoxLayout,
@@ -27,23 +32,41 @@ class SettingsWindow(QDialog):
 
         self.is_intro = is_intro
 
-        layout = QFormLayout()
-        layout.addRow('Client ID', self._create_client_id_input())
-        layout.addRow('Client Secret', self._create_client_secret_input())
-        layout.addRow('Region', self._create_region_input())
-        layout.addRow('Access Token', self._create_access_token_display())
-        layout.addRow('Access Token Expiration', self._create_access_token_expiration_display())
-        layout.addRow(self._create_send_notifications_checkbox())
+        form_layout = QFormLayout()
+        form_layout.addRow('Client ID', self._create_client_id_input())
+        form_layout.addRow('Client Secret', self._create_client_secret_input())
+        form_layout.addRow('Region', self._create_region_input())
+        form_layout.addRow('Also Track', self._create_tracked_regions_input())
+        form_layout.addRow('Access Token', self._create_access_token_display())
+        form_layout.addRow('Access Token Expiration', self._create_access_token_expiration_display())
+        form_layout.addRow(self._create_send_notifications_checkbox())
+        form_layout.addRow('Alert Rules', self._create_alert_rules_input())
+        form_layout.addRow('Webhooks', self._create_webhook_urls_input())
 
         if is_intro:
-            layout.addRow(self._create_intro())
+            form_layout.addRow(self._create_intro())
 
-        layout.addItem(QSpacerItem(0, 0, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Expanding))
-        layout.addRow(self._create_save_button_row())
+        form_layout.addItem(QSpacerItem(0, 0, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Expanding))
+
+        form = QWidget()
+        form.setLayout(form_layout)
+
+        layout = QVBoxLayout()
+        if is_intro:
+            # There's nothing to diagnose before the app has ever run
+            form_layout.setContentsMargins(0, 0, 0, 0)
+            layout.addWidget(form)
+        else:
+            self.tabs = QTabWidget()
+            self.tabs.addTab(form, 'General')
+            self.tabs.addTab(DiagnosticsPanel(), '&Diagnostics')
+            layout.addWidget(self.tabs)
+
+        layout.addWidget(self._create_save_button_row())
 
         self.setLayout(layout)
         self.setWindowTitle('Settings')
-        self.setWindowIcon(QIcon(':images/options.png'))
+        self.setWindowIcon(QIcon(pixmap_cache.get(':images/options.png')))
         self.adjustSize()
         self.setFixedWidth(450)
         self.setFixedSize(self.size())
@@ -84,12 +107,36 @@ class SettingsWindow(QDialog):
 
     @Slot()
     def _on_save_button_clicked(self):
+        alert_rules = [spec.strip() for spec in self.alert_rules_input.text().split(',') if spec.strip()]
+        for spec in alert_rules:
+            try:
+                parse_rule(spec)
+            except ValueError as e:
+                mb = QMessageBox()
+                mb.setWindowIcon(QIcon(':icons/icon.ico'))
+                mb.setWindowTitle('Invalid Alert Rule')
+                mb.setIcon(QMessageBox.Icon.Warning)
+                mb.setText(f'The alert rule <b>{escape(spec)}</b> isn\'t valid:<br>{escape(str(e))}')
+                mb.exec()
+
+                self.alert_rules_input.setFocus()
+                return
+
         self.save_button.setDisabled(True)
 
         user_settings.setValue(UserSettingsKeys.CLIENT_ID, self.client_id_input.text().strip())
         user_settings.setValue(UserSettingsKeys.CLIENT_SECRET, self.client_secret_input.text().strip())
         user_settings.setValue(UserSettingsKeys.REGION, str(self.region_input.currentData()))
         user_settings.setValue(UserSettingsKeys.SEND_NOTIFICATIONS, self.send_notifications_checkbox.isChecked())
+        user_settings.setValue(
+            UserSettingsKeys.TRACKED_REGIONS,
+            [region for region, checkbox in self.tracked_region_checkboxes.items() if checkbox.isChecked()]
+        )
+        user_settings.setValue(
+            UserSettingsKeys.WEBHOOK_URLS,
+            [url.strip() for url in self.webhook_urls_input.text().split(',') if url.strip()]
+        )
+        user_settings.setValue(UserSettingsKeys.ALERT_RULES, alert_rules)
 
         self.accept()
     #endregion
@@ -142,13 +189,28 @@ class SettingsWindow(QDialog):
 
     def _create_region_input(self) -> QComboBox:
         self.region_input = QComboBox()
-        self.region_input.addItem('North America', 'dynamic-us')
-        self.region_input.addItem('Europe', 'dynamic-eu')
-        self.region_input.addItem('Korea', 'dynamic-kr')
-        self.region_input.addItem('Taiwan', 'dynamic-tw')
+        for region, region_name in REGIONS.items():
+            self.region_input.addItem(region_name, region)
 
         return self.region_input
 
+    def _create_tracked_regions_input(self) -> QWidget:
+        widget = QWidget()
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.tracked_region_checkboxes: dict[str, QCheckBox] = {}
+        for region, region_name in REGIONS.items():
+            checkbox = QCheckBox(region_name)
+            self.tracked_region_checkboxes[region] = checkbox
+            layout.addWidget(checkbox)
+
+        layout.addStretch()
+
+        widget.setLayout(layout)
+
+        return widget
+
     def _create_access_token_display(self) -> QLineEdit:
         self.access_token_input = QLineEdit()
         self.access_token_input.setDisabled(True)
@@ -168,6 +230,27 @@ class SettingsWindow(QDialog):
 
         return self.send_notifications_checkbox
 
+    def _create_alert_rules_input(self) -> QLineEdit:
+        self.alert_rules_input = QLineEdit()
+        self.alert_rules_input.setPlaceholderText('change, above:300000, move:5%:24h, high:7d, ma:6h:24h')
+        self.alert_rules_input.setToolTip(
+            'Comma-separated rules that trigger a notification:\n'
+            'change - the price changed\n'
+            'above:N / below:N - the price crossed N\n'
+            'move:P%:DURATION - the price moved P% within DURATION\n'
+            'high:DURATION / low:DURATION / extreme:DURATION - a new high or low over DURATION\n'
+            'ma:SHORT:LONG - the SHORT moving average crossed the LONG moving average\n\n'
+            'Durations use s, m, h or d, e.g. 30m or 7d'
+        )
+
+        return self.alert_rules_input
+
+    def _create_webhook_urls_input(self) -> QLineEdit:
+        self.webhook_urls_input = QLineEdit()
+        self.webhook_urls_input.setPlaceholderText('Comma-separated URLs to post price changes to')
+
+        return self.webhook_urls_input
+
     def _create_save_button_row(self) -> QWidget:
         widget = QWidget()
         layout = QHBoxLayout()
@@ -207,3 +290,11 @@ class SettingsWindow(QDialog):
         self.access_token_input.setText(app_settings.value(AppSettingsKeys.ACCESS_TOKEN))
         self.access_token_expiration_input.setText(str(app_settings.value(AppSettingsKeys.ACCESS_TOKEN_EXPIRES)))
         self.send_notifications_checkbox.setChecked(user_settings.value(UserSettingsKeys.SEND_NOTIFICATIONS, False, bool))
+
+        tracked_regions = user_settings.value(UserSettingsKeys.TRACKED_REGIONS, [], list)
+        for region, checkbox in self.tracked_region_checkboxes.items():
+            checkbox.setChecked(region in tracked_regions)
+
+        alert_rules = user_settings.value(UserSettingsKeys.ALERT_RULES, DEFAULT_ALERT_RULES, list)
+        self.alert_rules_input.setText(', '.join(alert_rules))
+        self.webhook_urls_input.setText(', '.join(user_settings.value(UserSettingsKeys.WEBHOOK_URLS, [], list)))